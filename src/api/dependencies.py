@@ -1,23 +1,145 @@
 
+import functools
+import os
 from typing import Annotated
 from fastapi.params import Depends
-from sqlmodel import SQLModel, Session, create_engine
+from sqlalchemy import Engine, make_url
+from sqlmodel import SQLModel, Session
+from src.api.metrics import observe_pool_checkout, register_cache
+from src.api.request_timing import TimedRepository, TimedUseCase
 from src.domain.use_cases.analyse_buildability import AnalyseBuildability
+from src.domain.use_cases.part_bitmaps import PartBitmaps
+from src.domain.use_cases.similarity_index import InventorySimilarityIndex
+from src.domain.use_cases.sketches import SketchSettings
+from src.ports.repositories.analytics_repository import AnalyticsRepository
 from src.ports.repositories.bricks_repository import BricksRepository
+from src.ports.repositories.cached_bricks_repository import CachedBricksRepository, RepositoryCache
+from src.ports.repositories.shared_catalog import SharedCatalog
 from src.ports.repositories.sql_brick_repository import SQLBrickRepository
+from src.ports.repositories.sql_change_log import ChangeLogPoller
+from src.ports.repositories.sql_slow_query_log import SlowQueryLog
+from src.ports.repositories.sqlite_read_write_engines import ReadWriteEngines, create_read_write_engines
+from src.ports.repositories.sqlite_storage_profiles import get_storage_profile
+
+DATABASE_URL = os.environ.get("LEGO_DATABASE_URL", "sqlite:///:database.db:")
+
+# Named set of SQLite PRAGMAs applied to every connection, see sqlite_storage_profiles.py.
+SQLITE_STORAGE_PROFILE = os.environ.get("LEGO_SQLITE_PROFILE", "wal")
+
+# Size of the read-only connection pool used by the repository's get_* methods.
+READ_POOL_SIZE = int(os.environ.get("LEGO_READ_POOL_SIZE", "8"))
+
+# Statements slower than this are logged with their query plan; 0 disables the slow-query log.
+SLOW_QUERY_MS = float(os.environ.get("LEGO_SLOW_QUERY_MS", "0"))
+SLOW_QUERY_LOG_INTERVAL_SECONDS = float(os.environ.get("LEGO_SLOW_QUERY_LOG_INTERVAL_SECONDS", "60"))
+
+# Where aggregate analytics run: "" computes them from the repository, "sqlite" runs
+# DuckDB over the API's SQLite file, anything else is a Parquet export directory.
+ANALYTICS_SOURCE = os.environ.get("LEGO_ANALYTICS_SOURCE", "")
+
+# Catalogue snapshot shared by all worker processes (see shared_catalog.py); empty
+# builds the catalogue index from the database on each request.
+SHARED_CATALOG_PATH = os.environ.get("LEGO_SHARED_CATALOG", "")
+SHARED_CATALOG_CHECK_SECONDS = float(os.environ.get("LEGO_SHARED_CATALOG_CHECK_SECONDS", "5"))
+
+# Entries kept in the per-process repository cache; 0 disables it. Other workers'
+# writes are picked up from the change log at most every LEGO_CACHE_POLL_SECONDS.
+REPOSITORY_CACHE_SIZE = int(os.environ.get("LEGO_REPOSITORY_CACHE_SIZE", "10000"))
+CACHE_POLL_SECONDS = float(os.environ.get("LEGO_CACHE_POLL_SECONDS", "1"))
+
+# Error bounds of the usage sketches behind ?approx=true: relative error of distinct user
+# counts, and per-part owner count error as a fraction of all (user, part) ownerships.
+# Sketches stored with other settings are rebuilt by the next inventory write.
+SKETCH_SETTINGS = SketchSettings.from_error(
+    relative_error=float(os.environ.get("LEGO_SKETCH_RELATIVE_ERROR", "0.02")),
+    epsilon=float(os.environ.get("LEGO_SKETCH_EPSILON", "0.001")),
+)
+
+# Thread count for AnalyseBuildability batch methods; only used on a free-threaded interpreter.
+ANALYSIS_MAX_WORKERS = int(os.environ.get("LEGO_ANALYSIS_WORKERS", "1"))
+
+@functools.cache
+def get_engines() -> ReadWriteEngines:
+    # One writer and one read-only pool per process; creating them per request
+    # also re-ran the schema checks of create_all on every call.
+    engines = create_read_write_engines(DATABASE_URL, get_storage_profile(SQLITE_STORAGE_PROFILE), READ_POOL_SIZE)
+    SQLModel.metadata.create_all(engines.writer)
+    slow_query_log = SlowQueryLog(SLOW_QUERY_MS / 1000, SLOW_QUERY_LOG_INTERVAL_SECONDS) if SLOW_QUERY_MS > 0 else None
+    for engine in (engines.writer, engines.reader) if engines.is_split else (engines.writer,):
+        observe_pool_checkout(engine.pool)
+        if slow_query_log is not None:
+            slow_query_log.install(engine)
+    return engines
+
+def get_engine() -> Engine:
+    return get_engines().writer
 
 def get_session() -> Session:
-    sqlite_url = "sqlite:///:database.db:"
-    engine = create_engine(sqlite_url, echo=False)
-    SQLModel.metadata.create_all(engine)
-    with Session(engine, expire_on_commit=False) as session:
+    with Session(get_engine(), expire_on_commit=False) as session:
+        yield session
+
+def get_read_session() -> Session:
+    with Session(get_engines().reader, expire_on_commit=False) as session:
         yield session
 
-def get_brick_repository(session: Annotated[Session, Depends(get_session)]) -> BricksRepository:
+@functools.cache
+def get_repository_cache() -> RepositoryCache | None:
+    if REPOSITORY_CACHE_SIZE <= 0:
+        return None
+    engines = get_engines()
+    # An in-memory database lives in this process only, so there is nobody else to hear from.
+    poller = ChangeLogPoller(engines.reader, CACHE_POLL_SECONDS) if engines.is_split else None
+    cache = RepositoryCache(REPOSITORY_CACHE_SIZE, poller)
+    register_cache("repository", cache.stats)
+    return cache
+
+def get_brick_repository(
+    session: Annotated[Session, Depends(get_session)],
+    read_session: Annotated[Session, Depends(get_read_session)],
+) -> BricksRepository:
     with session as session:
-        yield SQLBrickRepository(session)
+        repository = SQLBrickRepository(session, read_session, SKETCH_SETTINGS)
+        if (cache := get_repository_cache()) is not None:
+            repository = CachedBricksRepository(repository, cache)
+        yield TimedRepository(repository)
+
+@functools.cache
+def get_analytics_repository() -> AnalyticsRepository | None:
+    if not ANALYTICS_SOURCE:
+        return None
+    # duckdb is an optional dependency, only needed when analytics are enabled.
+    from src.ports.repositories.duckdb_analytics_repository import DuckDBAnalyticsRepository
+
+    if ANALYTICS_SOURCE == "sqlite":
+        return DuckDBAnalyticsRepository.from_sqlite(make_url(DATABASE_URL).database)
+    return DuckDBAnalyticsRepository.from_parquet(ANALYTICS_SOURCE)
+
+@functools.cache
+def get_shared_catalog() -> SharedCatalog | None:
+    if not SHARED_CATALOG_PATH:
+        return None
+    shared_catalog = SharedCatalog(SHARED_CATALOG_PATH, SHARED_CATALOG_CHECK_SECONDS)
+    # Map it now, so a missing file fails the first caller (the app's start-up) with a clear error.
+    shared_catalog.current()
+    return shared_catalog
+
+@functools.cache
+def get_part_bitmaps() -> PartBitmaps:
+    # Process-wide, so inventory bitmaps outlive the request that encoded them.
+    return PartBitmaps()
+
+@functools.cache
+def get_similarity_index() -> InventorySimilarityIndex:
+    return InventorySimilarityIndex()
 
 def get_analyse_buildability_use_case(
     brick_repository: Annotated[BricksRepository, Depends(get_brick_repository)],
 ) -> AnalyseBuildability:
-    yield AnalyseBuildability(brick_repository)
\ No newline at end of file
+    yield TimedUseCase(AnalyseBuildability(
+        brick_repository,
+        max_workers=ANALYSIS_MAX_WORKERS,
+        analytics_repository=get_analytics_repository(),
+        catalog_source=shared_catalog.current if (shared_catalog := get_shared_catalog()) else None,
+        part_bitmaps=get_part_bitmaps(),
+        similarity_index=get_similarity_index(),
+    ))
\ No newline at end of file
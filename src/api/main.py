@@ -1,21 +1,42 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
 from src.api.routers.users import router as users_router
 from src.api.routers.sets import router as sets_router
 from src.api.routers.colours import router as colours_router
+from src.api.routers.changes import router as changes_router
 from src.api.routers.health import router as health_router
+from src.api.routers.metrics import router as metrics_router
+from src.api.request_timing import request_timing_middleware
+from src.api.request_profiling import request_profiling_middleware
+from src.api.dependencies import get_shared_catalog
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Refuse to start when LEGO_SHARED_CATALOG names a missing file, instead of failing every request.
+    get_shared_catalog()
+    yield
+
 
 app = FastAPI(
     title="LEGO Brick Manager",
     description="API for managing LEGO brick inventories and sets",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
+app.middleware("http")(request_timing_middleware)
+app.middleware("http")(request_profiling_middleware)
+
 # Register routers
 app.include_router(health_router)
+app.include_router(metrics_router)
 app.include_router(users_router)
 app.include_router(sets_router)
 app.include_router(colours_router)
+app.include_router(changes_router)
 
 @app.get("/")
 async def root():
@@ -0,0 +1,210 @@
+"""Process-local metrics rendered in the Prometheus text exposition format.
+
+Only counters, histograms and callback gauges are supported, which is all the
+``/metrics`` endpoint needs; no client library is required.
+"""
+import bisect
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable, Iterator
+
+from sqlalchemy.pool import Pool
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric(ABC):
+    metric_type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+
+    def _label_values(self, labels: dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    @abstractmethod
+    def samples(self) -> Iterator[tuple[str, str, float]]:
+        pass
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+        lines.extend(f"{name}{labels} {_format_value(value)}" for name, labels, value in self.samples())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> Iterator[tuple[str, str, float]]:
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            yield self.name, _format_labels(self.labelnames, key), value
+
+
+class Histogram(Metric):
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (non-cumulative) ..., +Inf count], sum
+        self._values: dict[LabelValues, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._label_values(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[index] += 1
+            total[0] += value
+
+    def time(self, **labels: str) -> "_HistogramTimer":
+        return _HistogramTimer(self, labels)
+
+    def samples(self) -> Iterator[tuple[str, str, float]]:
+        with self._lock:
+            values = sorted((key, (list(counts), total[0])) for key, (counts, total) in self._values.items())
+        bucket_labelnames = self.labelnames + ("le",)
+        for key, (counts, total) in values:
+            cumulative = 0
+            for upper_bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                yield f"{self.name}_bucket", _format_labels(bucket_labelnames, key + (_format_value(upper_bound),)), cumulative
+            yield f"{self.name}_sum", _format_labels(self.labelnames, key), total
+            yield f"{self.name}_count", _format_labels(self.labelnames, key), cumulative
+
+
+class _HistogramTimer:
+    def __init__(self, histogram: Histogram, labels: dict[str, str]):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.started, **self.labels)
+
+
+class CallbackMetric(Metric):
+    """A metric whose samples are read from a callback at scrape time."""
+
+    def __init__(self, name: str, documentation: str, metric_type: str, labelnames: tuple[str, ...],
+                 callback: Callable[[], Iterable[tuple[LabelValues, float]]]):
+        super().__init__(name, documentation, labelnames)
+        self.metric_type = metric_type
+        self.callback = callback
+
+    def samples(self) -> Iterator[tuple[str, str, float]]:
+        for key, value in sorted(self.callback()):
+            yield self.name, _format_labels(self.labelnames, key), value
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: list[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUEST_DURATION = REGISTRY.register(Histogram(
+    "lego_http_request_duration_seconds", "Latency of HTTP requests by route template.", ("method", "route", "status"),
+))
+USE_CASE_DURATION = REGISTRY.register(Histogram(
+    "lego_use_case_duration_seconds", "Latency of AnalyseBuildability method calls.", ("method",),
+))
+REPOSITORY_CALLS = REGISTRY.register(Counter(
+    "lego_repository_calls_total", "Number of BricksRepository method calls.", ("method",),
+))
+REPOSITORY_DURATION = REGISTRY.register(Histogram(
+    "lego_repository_call_duration_seconds", "Latency of BricksRepository method calls.", ("method",),
+))
+DB_POOL_CHECKOUT_WAIT = REGISTRY.register(Histogram(
+    "lego_db_pool_checkout_wait_seconds", "Time spent waiting for a connection from the pool.",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+))
+
+# Cache name -> callable returning (hits, misses); filled by whoever creates a cache.
+_cache_stats: dict[str, Callable[[], tuple[int, int]]] = {}
+
+
+def register_cache(name: str, stats: Callable[[], tuple[int, int]]) -> None:
+    _cache_stats[name] = stats
+
+
+def _cache_samples(index: int) -> Iterator[tuple[LabelValues, float]]:
+    for name, stats in list(_cache_stats.items()):
+        yield (name,), stats()[index]
+
+
+def _cache_hit_ratios() -> Iterator[tuple[LabelValues, float]]:
+    for name, stats in list(_cache_stats.items()):
+        hits, misses = stats()
+        yield (name,), hits / (hits + misses) if hits + misses else 0.0
+
+
+REGISTRY.register(CallbackMetric("lego_cache_hits_total", "Cache hits.", "counter", ("cache",), lambda: _cache_samples(0)))
+REGISTRY.register(CallbackMetric("lego_cache_misses_total", "Cache misses.", "counter", ("cache",), lambda: _cache_samples(1)))
+REGISTRY.register(CallbackMetric("lego_cache_hit_ratio", "Share of cache lookups that were hits.", "gauge", ("cache",), _cache_hit_ratios))
+
+
+def observe_pool_checkout(pool: Pool) -> None:
+    """Record how long each checkout from ``pool`` waits for a connection.
+
+    Pools have no event that fires before a checkout starts, so the pool's
+    ``_do_get`` (the hook every pool implementation provides) is wrapped.
+    """
+    do_get = pool._do_get
+
+    def timed_do_get():
+        started = time.perf_counter()
+        try:
+            return do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started)
+
+    pool._do_get = timed_do_get
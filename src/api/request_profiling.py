@@ -0,0 +1,100 @@
+import cProfile
+import hmac
+import os
+import re
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+from fastapi import Request, Response
+
+# Profiling is only available when a token is configured, and every profiled
+# request has to present it in the X-Profile-Token header.
+PROFILE_TOKEN = os.environ.get("LEGO_PROFILE_TOKEN", "")
+PROFILE_DIR = Path(os.environ.get("LEGO_PROFILE_DIR", "profiles"))
+PROFILERS = ("cprofile", "tracemalloc")
+TRACEMALLOC_FRAMES = 25
+TRACEMALLOC_TOP = 50
+
+# Both profilers are process-wide, so only one request is profiled at a time.
+_profile_lock = threading.Lock()
+
+
+def _is_authorised(request: Request) -> bool:
+    token = request.headers.get("X-Profile-Token", "")
+    return bool(PROFILE_TOKEN) and hmac.compare_digest(token.encode(), PROFILE_TOKEN.encode())
+
+
+def _output_path(request: Request, suffix: str) -> Path:
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", request.url.path).strip("_")
+    timestamp = time.strftime("%Y%m%dT%H%M%S")
+    return PROFILE_DIR / f"{timestamp}_{time.perf_counter_ns() % 1_000_000:06d}_{request.method}_{slug}{suffix}"
+
+
+def _write_tracemalloc_report(path: Path, snapshot: tracemalloc.Snapshot, current: int, peak: int, request: Request) -> None:
+    statistics = snapshot.statistics("traceback")
+    lines = [
+        f"{request.method} {request.url}",
+        f"traced memory at end: {current / 1024:.1f} KiB, peak: {peak / 1024:.1f} KiB",
+        f"top {TRACEMALLOC_TOP} allocation sites by size:",
+        "",
+    ]
+    for index, stat in enumerate(statistics[:TRACEMALLOC_TOP], start=1):
+        lines.append(f"#{index}: {stat.size / 1024:.1f} KiB in {stat.count} blocks")
+        lines.extend(f"    {line}" for line in stat.traceback.format(limit=TRACEMALLOC_FRAMES))
+    path.write_text("\n".join(lines) + "\n")
+
+
+async def request_profiling_middleware(request: Request, call_next) -> Response:
+    """Run an ``/api/`` request under cProfile or tracemalloc when asked to.
+
+    A client opts in with ``X-Profile: cprofile`` (a ``.pstats`` file) or
+    ``X-Profile: tracemalloc`` (a top-allocations report) plus the configured
+    ``X-Profile-Token``. The file name is returned in ``X-Profile-File``.
+    """
+    profiler_name = request.headers.get("X-Profile", "").lower()
+    if not profiler_name or not request.url.path.startswith("/api/"):
+        return await call_next(request)
+    if profiler_name not in PROFILERS or not _is_authorised(request):
+        response = await call_next(request)
+        response.headers["X-Profile-Status"] = "denied"
+        return response
+    if not _profile_lock.acquire(blocking=False):
+        response = await call_next(request)
+        response.headers["X-Profile-Status"] = "busy"
+        return response
+
+    try:
+        PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        if profiler_name == "cprofile":
+            path = _output_path(request, ".pstats")
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                response = await call_next(request)
+            finally:
+                profiler.disable()
+            profiler.dump_stats(path)
+        else:
+            path = _output_path(request, ".txt")
+            # Leave tracing alone if it was already on (e.g. PYTHONTRACEMALLOC).
+            already_tracing = tracemalloc.is_tracing()
+            if already_tracing:
+                tracemalloc.reset_peak()
+            else:
+                tracemalloc.start(TRACEMALLOC_FRAMES)
+            try:
+                response = await call_next(request)
+                snapshot = tracemalloc.take_snapshot()
+                current, peak = tracemalloc.get_traced_memory()
+            finally:
+                if not already_tracing:
+                    tracemalloc.stop()
+            _write_tracemalloc_report(path, snapshot, current, peak, request)
+    finally:
+        _profile_lock.release()
+
+    response.headers["X-Profile-Status"] = "captured"
+    response.headers["X-Profile-File"] = path.name
+    return response
@@ -0,0 +1,117 @@
+import functools
+import json
+import logging
+import time
+from abc import ABC, abstractmethod
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
+
+from fastapi import Request, Response
+
+from src.api.metrics import HTTP_REQUEST_DURATION, REPOSITORY_CALLS, REPOSITORY_DURATION, USE_CASE_DURATION
+from src.ports.repositories.sql_statement_stats import collect_statement_stats
+
+logger = logging.getLogger("lego.requests")
+
+
+@dataclass
+class RequestTiming:
+    """Repository activity of the request currently being served."""
+    repository_calls: int = 0
+    repository_seconds: float = 0.0
+
+
+_current_timing: ContextVar[RequestTiming | None] = ContextVar("request_timing", default=None)
+
+
+class _TimedProxy(ABC):
+    """Forwards attribute access to ``target`` and times every method call.
+
+    Non-callable attributes are returned as is, so the proxy can be used
+    anywhere the wrapped object is expected.
+    """
+
+    def __init__(self, target: Any):
+        self._target = target
+
+    @abstractmethod
+    def _record(self, method: str, seconds: float) -> None:
+        pass
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self._target, name)
+        if not callable(attribute):
+            return attribute
+
+        @functools.wraps(attribute)
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return attribute(*args, **kwargs)
+            finally:
+                self._record(name, time.perf_counter() - started)
+
+        return timed
+
+
+class TimedRepository(_TimedProxy):
+    """Adds repository method durations to the current request and the metrics."""
+
+    def _record(self, method: str, seconds: float) -> None:
+        REPOSITORY_CALLS.inc(method=method)
+        REPOSITORY_DURATION.observe(seconds, method=method)
+        timing = _current_timing.get()
+        if timing is not None:
+            timing.repository_calls += 1
+            timing.repository_seconds += seconds
+
+
+class TimedUseCase(_TimedProxy):
+    """Records the latency of each AnalyseBuildability method called by a router."""
+
+    def _record(self, method: str, seconds: float) -> None:
+        USE_CASE_DURATION.observe(seconds, method=method)
+
+
+def format_server_timing(total_seconds: float, timing: RequestTiming, statements: int, rows: int, sql_seconds: float) -> str:
+    return ", ".join([
+        f"total;dur={total_seconds * 1000:.2f}",
+        f'repo;dur={timing.repository_seconds * 1000:.2f};desc="{timing.repository_calls} calls"',
+        f'db;dur={sql_seconds * 1000:.2f};desc="{statements} statements, {rows} rows"',
+    ])
+
+
+async def request_timing_middleware(request: Request, call_next) -> Response:
+    """Time the request and report it in a ``Server-Timing`` header and a JSON log line."""
+    timing = RequestTiming()
+    token = _current_timing.set(timing)
+    started = time.perf_counter()
+    try:
+        with collect_statement_stats() as sql_stats:
+            response = await call_next(request)
+    finally:
+        _current_timing.reset(token)
+    total_seconds = time.perf_counter() - started
+
+    response.headers["Server-Timing"] = format_server_timing(
+        total_seconds, timing, sql_stats.statements, sql_stats.rows, sql_stats.seconds
+    )
+
+    # Unmatched paths share one label so scanners cannot blow up the series count.
+    route = getattr(request.scope.get("route"), "path", "<unmatched>")
+    HTTP_REQUEST_DURATION.observe(total_seconds, method=request.method, route=route, status=str(response.status_code))
+    logger.info(json.dumps({
+        "event": "request",
+        "method": request.method,
+        "path": request.url.path,
+        "route": route,
+        "status": response.status_code,
+        "total_ms": round(total_seconds * 1000, 3),
+        "repository_ms": round(timing.repository_seconds * 1000, 3),
+        "repository_calls": timing.repository_calls,
+        "sql_ms": round(sql_stats.seconds * 1000, 3),
+        "sql_statements": sql_stats.statements,
+        "sql_rows": sql_stats.rows,
+    }))
+    return response
@@ -0,0 +1,41 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from src.api.dependencies import get_brick_repository
+from src.api.routers.models import change_to_model
+from src.api.routers.response_models import ChangesResponse, ErrorResponse
+from src.ports.repositories.bricks_repository import BricksRepository
+
+router = APIRouter(
+    prefix="/api",
+    tags=["changes"],
+    responses={
+        500: {"model": ErrorResponse, "description": "Internal server error"},
+        501: {"model": ErrorResponse, "description": "Repository keeps no change log"},
+    }
+)
+
+RepoDep = Annotated[BricksRepository, Depends(get_brick_repository)]
+
+@router.get(
+    "/changes",
+    response_model=ChangesResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Tail the change log",
+    description="Return writes committed after version `since`, oldest first, with the part quantities each one added. "
+                "Pass `next_since` back as `since` to continue from where the previous page stopped.",
+    response_description="Page of changes and the cursor for the next page"
+)
+async def get_changes(
+    bricks_repository: RepoDep,
+    since: Annotated[int, Query(ge=0, description="Last change version already seen")] = 0,
+    limit: Annotated[int, Query(ge=1, le=10_000, description="Maximum number of changes to return")] = 1000,
+):
+    try:
+        changes = bricks_repository.get_changes(since=since, limit=limit)
+    except NotImplementedError as error:
+        raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail=str(error))
+    return ChangesResponse(
+        data=[change_to_model(change) for change in changes],
+        next_since=changes[-1].version if changes else since,
+    )
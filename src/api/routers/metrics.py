@@ -0,0 +1,21 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from src.api.metrics import REGISTRY
+
+router = APIRouter(tags=["metrics"])
+
+
+class PrometheusResponse(PlainTextResponse):
+    media_type = "text/plain; version=0.0.4"
+
+
+@router.get(
+    "/metrics",
+    response_class=PrometheusResponse,
+    summary="Prometheus metrics",
+    description="Process-local latency histograms and counters in the Prometheus text format"
+)
+async def metrics():
+    """Metrics of this worker process only; scrape every worker separately."""
+    return PrometheusResponse(REGISTRY.render())
@@ -1,6 +1,7 @@
 from pydantic import BaseModel
 from src.domain.entities.user import User
 from src.domain.entities.set import Set
+from src.domain.entities.change import Change
 
 # Pydantic Response Models
 class ColourModel(BaseModel):
@@ -39,6 +40,19 @@ class SetModel(BaseModel):
     name: str
     parts: list[SetItemModel]
 
+class PartDeltaModel(BaseModel):
+    part_id: int
+    quantity: int
+
+class InventoryDeltaRequest(BaseModel):
+    parts: list[PartDeltaModel]
+
+class ChangeModel(BaseModel):
+    version: int
+    entity_type: str
+    entity_id: int
+    part_deltas: dict[int, int]
+
 def user_to_model(user: User) -> UserModel:
     inventory_items = [
         InventoryItemModel(
@@ -92,4 +106,13 @@ def part_to_model(part) -> PartModel:
 
 def colour_to_model(colour) -> ColourModel:
     """Convert Colour domain entity to Pydantic ColourModel"""
-    return ColourModel(id=colour.id, name=colour.name)
\ No newline at end of file
+    return ColourModel(id=colour.id, name=colour.name)
+
+def change_to_model(change: Change) -> ChangeModel:
+    """Convert a change log entry to Pydantic ChangeModel"""
+    return ChangeModel(
+        version=change.version,
+        entity_type=change.entity_type,
+        entity_id=change.entity_id,
+        part_deltas=change.part_deltas,
+    )
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from src.api.routers.models import UserModel, SetModel, PartModel, ColourModel
+from src.api.routers.models import UserModel, SetModel, PartModel, ColourModel, ChangeModel
 
 class UserSummary(BaseModel):
     """Summary of a user with basic info"""
@@ -57,6 +57,29 @@ class PossibleSetsResponse(BaseModel):
     data: list[SetModel] = Field(..., description="List of buildable sets")
 
 
+class AlmostBuildableSetItem(BaseModel):
+    """A set with the pieces the user still misses to build it"""
+    set: SetModel
+    missing_pieces: int = Field(..., description="Pieces the user lacks, counting quantities")
+    missing_ratio: float = Field(..., description="Missing pieces over the pieces the set needs")
+
+
+class AlmostBuildableSetsResponse(BaseModel):
+    """Response containing the sets a user is closest to building"""
+    data: list[AlmostBuildableSetItem] = Field(..., description="Sets closest to buildable first")
+
+
+class GroupSetItem(BaseModel):
+    """A set a group can build together, with each member's share"""
+    set: SetModel
+    contributions: dict[int, int] = Field(..., description="User id to the pieces of the set that user brings")
+
+
+class GroupPossibleSetsResponse(BaseModel):
+    """Response containing the sets a group can build by pooling inventories"""
+    data: list[GroupSetItem] = Field(..., description="Sets the pooled inventories can build")
+
+
 class SuggestedUsersItem(BaseModel):
     """A suggested user with shared parts count"""
     user: UserModel
@@ -68,6 +91,18 @@ class SuggestedUsersResponse(BaseModel):
     data: list[tuple[UserModel, int]] = Field(..., description="List of [user, shared_count] pairs")
 
 
+class SimilarUserItem(BaseModel):
+    """A user with an inventory similar to the current user's"""
+    user: UserSummary
+    similarity: float = Field(..., description="Jaccard similarity of the two inventories, from 0 to 1")
+
+
+class SimilarUsersResponse(BaseModel):
+    """Response containing the users with the most similar inventories"""
+    data: list[SimilarUserItem] = Field(..., description="Similar users, most similar first")
+    weighted: bool = Field(..., description="Whether similarity weighs part quantities or only part ids")
+
+
 class PartUsageItem(BaseModel):
     """Part with usage statistics"""
     part: PartModel
@@ -77,6 +112,13 @@ class PartUsageItem(BaseModel):
 class PartUsageResponse(BaseModel):
     """Response containing parts usage statistics"""
     data: list[tuple[PartModel, int]] = Field(..., description="List of [part, quantity] pairs")
+    approximate: bool = Field(default=False, description="Whether the quantities are estimated owner counts from usage sketches")
+
+
+class OwnerCountsResponse(BaseModel):
+    """Estimated number of users owning any part of each shape or colour"""
+    data: dict[int, int] = Field(..., description="Shape or colour id to estimated number of owners")
+    relative_error: float = Field(..., description="Standard error of each estimate, relative to the estimate")
 
 
 class ErrorResponse(BaseModel):
@@ -89,6 +131,24 @@ class SetSummary(BaseModel):
     name: str = Field(..., description="Set display name")
 
 
+class SetCopiesItem(BaseModel):
+    """A buildable set with the number of copies the inventory covers"""
+    set: SetSummary
+    copies: int = Field(..., description="Copies of the set the inventory can build, one at a time")
+
+
+class SetCopiesResponse(BaseModel):
+    """Response containing every buildable set with its copies"""
+    data: list[SetCopiesItem] = Field(..., description="Buildable sets with their copies")
+
+
+class BuildPlanResponse(BaseModel):
+    """Distinct sets to build at the same time from one inventory"""
+    sets: list[SetSummary] = Field(..., description="Sets of the plan, largest first")
+    pieces_used: int = Field(..., description="Pieces the plan uses")
+    optimal: bool = Field(..., description="False if the search stopped at its budget, so a plan using more pieces may exist")
+
+
 class SetsListResponse(BaseModel):
     """Response containing list of sets"""
     message: str = Field(default="List of sets", description="Response message")
@@ -106,6 +166,27 @@ class SetsListResponse(BaseModel):
         }
 
 
+class SetDemandResponse(BaseModel):
+    """How close all users are to building one set, and what they lack"""
+    set_id: int = Field(..., description="Set unique identifier")
+    buildable_users: int = Field(..., description="Users who can build the set already")
+    within: int = Field(..., description="Missing pieces threshold used for users_within")
+    users_within: int = Field(..., description="Users missing between 1 and `within` pieces of the set")
+    users_by_missing_pieces: dict[int, int] = Field(..., description="Number of missing pieces to the number of users missing that many")
+    missing_by_part: dict[int, int] = Field(..., description="Part id to the quantity missing, summed over all users")
+
+
+class BuildableUserCountsResponse(BaseModel):
+    """Number of users able to build each set"""
+    data: dict[int, int] = Field(..., description="Set id to the number of users whose inventory covers the set")
+
+
+class MissingPartDemandResponse(BaseModel):
+    """Quantity of each part of a set missing over all users"""
+    set_id: int = Field(..., description="Set unique identifier")
+    missing_by_part: dict[int, int] = Field(..., description="Part id to the quantity missing, summed over all users")
+
+
 class SetByNameData(BaseModel):
     """Set data with parts summary"""
     id: int = Field(..., description="Set unique identifier")
@@ -149,4 +230,27 @@ class ColoursListResponse(BaseModel):
 class ColourDetailResponse(BaseModel):
     """Response containing single colour details"""
     message: str = Field(default="Colour details", description="Response message")
-    data: ColourModel = Field(..., description="Colour information")
\ No newline at end of file
+    data: ColourModel = Field(..., description="Colour information")
+
+
+class ChangesResponse(BaseModel):
+    """Response containing a page of the change log"""
+    data: list[ChangeModel] = Field(..., description="Changes after the cursor, oldest first")
+    next_since: int = Field(..., description="Cursor to pass as `since` for the next page")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "data": [
+                    {"version": 41, "entity_type": "inventory", "entity_id": 7, "part_deltas": {"3": 4, "12": 1}},
+                    {"version": 42, "entity_type": "user", "entity_id": 7, "part_deltas": {}}
+                ],
+                "next_since": 42
+            }
+        }
+
+
+class InventoryUpdateResponse(BaseModel):
+    """Response to an inventory delta update"""
+    inventory_id: int = Field(..., description="Updated inventory")
+    version: int = Field(..., description="New inventory version (the change log version of the update)")
@@ -1,10 +1,20 @@
 
 from typing import Annotated
 from sqlmodel import Session
-from fastapi import APIRouter, Depends, HTTPException, Path, status
-from src.api.routers.response_models import ErrorResponse, SetByNameData, SetByNameResponse, SetSummary, SetsListResponse
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
+from src.api.routers.response_models import (
+    BuildableUserCountsResponse,
+    ErrorResponse,
+    MissingPartDemandResponse,
+    SetByNameData,
+    SetByNameResponse,
+    SetDemandResponse,
+    SetSummary,
+    SetsListResponse,
+)
+from src.domain.use_cases.analyse_buildability import AnalyseBuildability
 from src.ports.repositories.bricks_repository import BricksRepository
-from src.api.dependencies import get_brick_repository, get_session
+from src.api.dependencies import get_analyse_buildability_use_case, get_brick_repository, get_session
 from src.api.routers.models import SetModel, set_to_model
 
 router = APIRouter(
@@ -18,6 +28,7 @@ router = APIRouter(
 
 SessionDep = Annotated[Session, Depends(get_session)]
 RepoDep = Annotated[BricksRepository, Depends(get_brick_repository)]
+UseCaseDep = Annotated[AnalyseBuildability, Depends(get_analyse_buildability_use_case)]
 
 @router.get(
     "/sets/",
@@ -36,6 +47,19 @@ async def get_all_sets(bricks_repository: RepoDep):
     return SetsListResponse(message="List of sets", data=set_summaries)
 
 
+@router.get(
+    "/sets/buildable-user-counts",
+    response_model=BuildableUserCountsResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Get the number of users able to build each set",
+    description="Count, for every set in the catalogue, the users whose inventory covers it. Answered by the DuckDB "
+                "analytics adapter when `LEGO_ANALYTICS_SOURCE` is set, otherwise from every user's inventory.",
+    response_description="Set id to number of users"
+)
+async def get_buildable_user_counts(analyse_buildability_use_case: UseCaseDep):
+    return BuildableUserCountsResponse(data=analyse_buildability_use_case.get_buildable_user_counts())
+
+
 @router.get(
     "/set/by-id/{set_id}",
     response_model=SetModel,
@@ -60,6 +84,67 @@ async def get_set_by_id(
     return set_to_model(lego_set)
 
 
+@router.get(
+    "/set/by-id/{set_id}/demand",
+    response_model=SetDemandResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Get demand for a set across all users",
+    description="How many users can build the set, how many are within `within` pieces of it, and the quantity of "
+                "each part missing over all users, which is what to restock. Cached until an inventory changes.",
+    responses={
+        200: {"description": "Set demand"},
+        404: {"model": ErrorResponse, "description": "Set not found"}
+    }
+)
+async def get_set_demand(
+    analyse_buildability_use_case: UseCaseDep,
+    set_id: int = Path(..., gt=0, description="Set unique identifier"),
+    within: int = Query(default=5, ge=1, description="Missing pieces threshold")
+):
+    demand = analyse_buildability_use_case.get_set_demand(set_id)
+    if demand is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Set with ID {set_id} not found"
+        )
+    return SetDemandResponse(
+        set_id=set_id,
+        buildable_users=demand.users_by_missing_pieces.get(0, 0),
+        within=within,
+        users_within=demand.users_within(within),
+        users_by_missing_pieces=demand.users_by_missing_pieces,
+        missing_by_part=demand.missing_by_part,
+    )
+
+
+@router.get(
+    "/set/by-id/{set_id}/missing-part-demand",
+    response_model=MissingPartDemandResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Get the missing quantity of each part of a set",
+    description="Quantity of each part of the set missing over all users' inventories. Answered by the DuckDB "
+                "analytics adapter when `LEGO_ANALYTICS_SOURCE` is set.",
+    responses={
+        200: {"description": "Missing quantity per part"},
+        404: {"model": ErrorResponse, "description": "Set not found"}
+    }
+)
+async def get_missing_part_demand(
+    bricks_repository: RepoDep,
+    analyse_buildability_use_case: UseCaseDep,
+    set_id: int = Path(..., gt=0, description="Set unique identifier")
+):
+    if bricks_repository.get_set_by_id(set_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Set with ID {set_id} not found"
+        )
+    return MissingPartDemandResponse(
+        set_id=set_id,
+        missing_by_part=analyse_buildability_use_case.get_missing_part_demand(set_id),
+    )
+
+
 @router.get(
     "/set/by-name/{name}",
     response_model=SetByNameResponse,
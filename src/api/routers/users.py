@@ -1,13 +1,13 @@
-from typing import Annotated
+from typing import Annotated, Literal
 
 from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
 from sqlmodel import Session
 from src.domain.entities.user import User
 from src.ports.repositories.bricks_repository import BricksRepository
-from src.api.dependencies import get_analyse_buildability_use_case, get_brick_repository, get_session
+from src.api.dependencies import SKETCH_SETTINGS, get_analyse_buildability_use_case, get_brick_repository, get_session
 from src.domain.use_cases.analyse_buildability import AnalyseBuildability
-from src.api.routers.models import UserModel, set_to_model, user_to_model
-from src.api.routers.response_models import ErrorResponse, PartUsageResponse, PossibleSetsResponse, SuggestedUsersResponse, UserByNameData, UserByNameResponse, UserSummary, UsersListResponse
+from src.api.routers.models import InventoryDeltaRequest, UserModel, part_to_model, set_to_model, user_to_model
+from src.api.routers.response_models import AlmostBuildableSetItem, AlmostBuildableSetsResponse, BuildPlanResponse, ErrorResponse, GroupPossibleSetsResponse, GroupSetItem, InventoryUpdateResponse, OwnerCountsResponse, PartUsageResponse, PossibleSetsResponse, SimilarUserItem, SimilarUsersResponse, SetCopiesItem, SetCopiesResponse, SetSummary, SuggestedUsersResponse, UserByNameData, UserByNameResponse, UserSummary, UsersListResponse
 
 router = APIRouter(
     prefix="/api",
@@ -65,6 +65,39 @@ async def read_user(
         )
     return user_to_model(user)
 
+@router.patch(
+    "/user/by-id/{user_id}/inventory",
+    response_model=InventoryUpdateResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Add or remove parts from a user's inventory",
+    description="Apply part quantity deltas to the user's inventory in a single transaction. "
+                "Positive quantities add parts, negative ones remove them; parts that reach zero are dropped.",
+    responses={
+        200: {"description": "Inventory updated"},
+        404: {"model": ErrorResponse, "description": "User not found"},
+        422: {"model": ErrorResponse, "description": "Unknown part"}
+    }
+)
+async def update_user_inventory(
+    repository: RepoDep,
+    update: InventoryDeltaRequest,
+    user_id: int = Path(..., gt=0, description="User unique identifier")
+):
+    user = repository.get_user_by_id(user_id)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"User with ID {user_id} not found"
+        )
+    part_deltas: dict[int, int] = {}
+    for item in update.parts:
+        part_deltas[item.part_id] = part_deltas.get(item.part_id, 0) + item.quantity
+    try:
+        version = repository.apply_inventory_deltas(user.inventory.id, part_deltas)
+    except ValueError as error:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_CONTENT, detail=str(error))
+    return InventoryUpdateResponse(inventory_id=user.inventory.id, version=version)
+
 @router.get(
     "/user/by-id/{user_id}/possible-sets",
     response_model=PossibleSetsResponse,
@@ -85,6 +118,92 @@ async def read_user_possible_sets(
         return PossibleSetsResponse(data=[])
     return PossibleSetsResponse(data=[set_to_model(s) for s in sets])
 
+@router.get(
+    "/user/by-id/{user_id}/set-copies",
+    response_model=SetCopiesResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Get how many copies of each set a user can build",
+    description="Every set the user can build, with the minimum over its parts of held ÷ required quantity.",
+    responses={
+        200: {"description": "Buildable sets with their copies"},
+        404: {"model": ErrorResponse, "description": "User not found"}
+    }
+)
+async def read_user_set_copies(
+    analyse_buildability_use_case: UseCaseDep,
+    user_id: int = Path(..., gt=0, description="User unique identifier")
+):
+    if analyse_buildability_use_case.bricks_repository.get_user_by_id(user_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"User with ID {user_id} not found"
+        )
+    copies = analyse_buildability_use_case.get_buildable_copies(user_id)
+    return SetCopiesResponse(data=[
+        SetCopiesItem(set=SetSummary(id=lego_set.id, name=lego_set.name), copies=count) for lego_set, count in copies
+    ])
+
+@router.get(
+    "/user/by-id/{user_id}/build-plan",
+    response_model=BuildPlanResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Plan which sets a user should build together",
+    description="Distinct sets the user can build at the same time, sharing one inventory, chosen to use as many pieces "
+                "as possible. The search is bounded; `optimal` is false when it stopped before proving its plan is best.",
+    responses={
+        200: {"description": "Sets to build together"},
+        404: {"model": ErrorResponse, "description": "User not found"}
+    }
+)
+async def read_user_build_plan(
+    analyse_buildability_use_case: UseCaseDep,
+    user_id: int = Path(..., gt=0, description="User unique identifier")
+):
+    plan = analyse_buildability_use_case.get_build_plan(user_id)
+    if plan is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"User with ID {user_id} not found"
+        )
+    return BuildPlanResponse(
+        sets=[SetSummary(id=lego_set.id, name=lego_set.name) for lego_set in plan.sets],
+        pieces_used=plan.pieces,
+        optimal=plan.optimal,
+    )
+
+@router.get(
+    "/user/by-id/{user_id}/almost-buildable-sets",
+    response_model=AlmostBuildableSetsResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Get the sets a user is closest to building",
+    description="Return the `k` sets the user cannot build yet with the fewest missing pieces, or with `by_ratio=true` "
+                "the smallest missing share of the set's pieces.",
+    responses={
+        200: {"description": "Sets closest to buildable first"},
+        404: {"model": ErrorResponse, "description": "User not found"}
+    }
+)
+async def read_user_almost_buildable_sets(
+    analyse_buildability_use_case: UseCaseDep,
+    user_id: int = Path(..., gt=0, description="User unique identifier"),
+    k: int = Query(default=10, ge=1, le=100, description="Number of sets to return"),
+    by_ratio: bool = Query(default=False, description="Rank by missing share of the set instead of missing pieces")
+):
+    if analyse_buildability_use_case.bricks_repository.get_user_by_id(user_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"User with ID {user_id} not found"
+        )
+    sets = analyse_buildability_use_case.get_almost_buildable_sets(user_id, k=k, by_ratio=by_ratio)
+    return AlmostBuildableSetsResponse(data=[
+        AlmostBuildableSetItem(
+            set=set_to_model(lego_set),
+            missing_pieces=missing,
+            missing_ratio=missing / sum(item.quantity for item in lego_set.parts),
+        )
+        for lego_set, missing in sets
+    ])
+
 @router.get(
     "/user/by-id/{user_id}/set/{set_id}/suggest-users",
     response_model=SuggestedUsersResponse,
@@ -125,6 +244,37 @@ async def read_user_suggest_users_for_set(
     
     return SuggestedUsersResponse(data=result)
 
+@router.get(
+    "/user/by-id/{user_id}/similar-users",
+    response_model=SimilarUsersResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Find users with similar inventories",
+    description="Shortlist users through a MinHash LSH index of inventories, then rank the shortlist by exact Jaccard "
+                "similarity of part ids, or of part quantities with `weighted=true`. Users below about 0.4 similarity "
+                "are mostly left out.",
+    responses={
+        200: {"description": "Users with similar inventories, most similar first"},
+        404: {"model": ErrorResponse, "description": "User not found"}
+    }
+)
+async def read_user_similar_users(
+    analyse_buildability_use_case: UseCaseDep,
+    user_id: int = Path(..., gt=0, description="User unique identifier"),
+    limit: int = Query(default=10, ge=1, le=100, description="Maximum number of users to return"),
+    weighted: bool = Query(default=False, description="Weigh similarity by part quantities")
+):
+    user = analyse_buildability_use_case.bricks_repository.get_user_by_id(user_id)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"User with ID {user_id} not found"
+        )
+    similar_users = analyse_buildability_use_case.get_similar_users(user_id, limit=limit, weighted=weighted)
+    return SimilarUsersResponse(
+        data=[SimilarUserItem(user=UserSummary(id=other.id, name=other.name), similarity=similarity) for other, similarity in similar_users],
+        weighted=weighted,
+    )
+
 @router.get(
     "/user/by-name/{name}",
     response_model=UserByNameResponse,
@@ -159,7 +309,11 @@ async def get_user_by_name(
     response_model=PartUsageResponse,
     status_code=status.HTTP_200_OK,
     summary="Get parts by usage percentage",
-    description="Retrieve parts that are owned by at least the specified percentage of users.",
+    description="Retrieve parts that are owned by at least the specified percentage of users, with their smallest owned quantity. "
+                "With `approx=true` the answer comes from usage sketches in constant time per part and each part is paired with "
+                "its estimated number of owners instead. Estimates never undercount and, with 99% probability, overshoot by at "
+                "most ε × the number of (user, part) ownerships (ε = `LEGO_SKETCH_EPSILON`, default 0.001); that is within 2% "
+                "of the users only while users own about 20 distinct parts each or fewer.",
     responses={
         200: {"description": "List of parts with usage above threshold"}
     }
@@ -171,16 +325,55 @@ async def get_parts_with_percentage_of_usage(
         ge=0.0,
         le=1.0,
         description="Minimum usage percentage (0.0 to 1.0)"
-    )
+    ),
+    approx: bool = Query(default=False, description="Estimate from usage sketches instead of exact statistics")
 ):
-    parts_usage = analyse_buildability_use_case.get_parts_with_percentage_of_usage(percentage)
+    parts_usage = analyse_buildability_use_case.get_parts_with_percentage_of_usage(percentage, approximate=approx)
     
     # Convert to response format with full part details
-    result = []
-    for part_id, quantity in parts_usage.items():
-        part = analyse_buildability_use_case.bricks_repository.get_part_by_id(part_id)
-        if part:
-            from src.api.routers.models import part_to_model
-            result.append([part_to_model(part), quantity])
-    
-    return PartUsageResponse(data=result)
\ No newline at end of file
+    result = [(part_to_model(part), quantity) for part, quantity in parts_usage]
+    return PartUsageResponse(data=result, approximate=approx)
+
+@router.get(
+    "/users/group/possible-sets",
+    response_model=GroupPossibleSetsResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Get the sets a group of users can build together",
+    description="Sum the inventories of the given users and return the sets the pooled parts can build, with the "
+                "pieces each member contributes to each set. Pass the ids as `user_ids=1&user_ids=2`.",
+    responses={
+        200: {"description": "Sets the group can build"},
+        404: {"model": ErrorResponse, "description": "A user was not found"}
+    }
+)
+async def get_group_possible_sets(
+    analyse_buildability_use_case: UseCaseDep,
+    user_ids: list[int] = Query(..., min_length=1, max_length=1000, description="Members of the group")
+):
+    unknown = [user_id for user_id in dict.fromkeys(user_ids) if analyse_buildability_use_case.bricks_repository.get_user_by_id(user_id) is None]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Users with IDs {unknown} not found"
+        )
+    group_sets = analyse_buildability_use_case.get_group_possible_sets(user_ids)
+    return GroupPossibleSetsResponse(data=[
+        GroupSetItem(set=set_to_model(lego_set), contributions=contributions) for lego_set, contributions in group_sets
+    ])
+
+@router.get(
+    "/users/owner-counts/{attribute}",
+    response_model=OwnerCountsResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Estimate owners per shape or colour",
+    description="Estimated number of users owning at least one part of each shape or colour, from HyperLogLog sketches.",
+    responses={
+        200: {"description": "Estimated owners per shape or colour id"}
+    }
+)
+async def get_owner_counts(
+    analyse_buildability_use_case: UseCaseDep,
+    attribute: Literal["shape", "colour"] = Path(..., description="Part attribute to group by")
+):
+    counts = analyse_buildability_use_case.get_approximate_owner_counts(attribute)
+    return OwnerCountsResponse(data=counts, relative_error=1.04 / 2 ** (SKETCH_SETTINGS.hll_precision / 2))
\ No newline at end of file
@@ -0,0 +1,164 @@
+"""Load generator for the REST API.
+
+Drives ``src.api.main.app`` in-process through an ASGI transport, or a running
+server when ``--base-url`` is given, with a weighted mix of endpoints::
+
+    LEGO_DATABASE_URL=sqlite:///large.db python -m src.benchmarks.load_test --concurrency 32 --duration 30
+    python -m src.benchmarks.load_test --base-url http://127.0.0.1:8000 --mix possible-sets=5,suggest-users=1
+"""
+import asyncio
+import itertools
+import json
+import random
+import time
+from collections import defaultdict
+from collections.abc import Callable
+from dataclasses import asdict
+from pathlib import Path
+
+import httpx
+import typer
+
+from src.benchmarks.stats import LatencySummary
+
+# Route template -> function building a concrete URL from known user and set ids.
+ENDPOINTS: dict[str, tuple[str, Callable[[random.Random, list[int], list[int]], str]]] = {
+    "users": (
+        "GET /api/users/",
+        lambda rng, user_ids, set_ids: "/api/users/",
+    ),
+    "user": (
+        "GET /api/user/by-id/{user_id}",
+        lambda rng, user_ids, set_ids: f"/api/user/by-id/{rng.choice(user_ids)}",
+    ),
+    "sets": (
+        "GET /api/sets/",
+        lambda rng, user_ids, set_ids: "/api/sets/",
+    ),
+    "set": (
+        "GET /api/set/by-id/{set_id}",
+        lambda rng, user_ids, set_ids: f"/api/set/by-id/{rng.choice(set_ids)}",
+    ),
+    "possible-sets": (
+        "GET /api/user/by-id/{user_id}/possible-sets",
+        lambda rng, user_ids, set_ids: f"/api/user/by-id/{rng.choice(user_ids)}/possible-sets",
+    ),
+    "suggest-users": (
+        "GET /api/user/by-id/{user_id}/set/{set_id}/suggest-users",
+        lambda rng, user_ids, set_ids: f"/api/user/by-id/{rng.choice(user_ids)}/set/{rng.choice(set_ids)}/suggest-users",
+    ),
+    "part-usage": (
+        "GET /api/users/part-usage",
+        lambda rng, user_ids, set_ids: f"/api/users/part-usage?percentage={rng.choice([0.1, 0.25, 0.5])}",
+    ),
+}
+
+DEFAULT_MIX = "users=2,user=2,sets=2,set=2,possible-sets=4,suggest-users=2,part-usage=1"
+
+
+def parse_mix(mix: str) -> dict[str, int]:
+    weights = {}
+    for entry in mix.split(","):
+        name, _, weight = entry.strip().partition("=")
+        if name not in ENDPOINTS:
+            raise typer.BadParameter(f"Unknown endpoint '{name}', expected one of {', '.join(ENDPOINTS)}")
+        weights[name] = int(weight or 1)
+    return weights
+
+
+def _build_client(base_url: str | None, timeout: float) -> httpx.AsyncClient:
+    if base_url:
+        return httpx.AsyncClient(base_url=base_url, timeout=timeout)
+    from src.api.main import app
+
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app, raise_app_exceptions=False), base_url="http://loadtest", timeout=timeout)
+
+
+async def _discover_ids(client: httpx.AsyncClient) -> tuple[list[int], list[int]]:
+    users = (await client.get("/api/users/", params={"limit": 1000})).json()["data"]
+    sets = (await client.get("/api/sets/")).json()["data"]
+    return [user["id"] for user in users], [lego_set["id"] for lego_set in sets]
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    weights: dict[str, int],
+    concurrency: int,
+    duration: float,
+    max_requests: int | None,
+    seed: int,
+) -> tuple[dict[str, list[float]], dict[str, int], float]:
+    """Send requests from ``concurrency`` workers until time or request budget runs out."""
+    user_ids, set_ids = await _discover_ids(client)
+    if not user_ids or not set_ids:
+        raise RuntimeError("The database needs at least one user and one set")
+
+    names = list(weights)
+    cum_weights = list(itertools.accumulate(weights.values()))
+    latencies: dict[str, list[float]] = defaultdict(list)
+    errors: dict[str, int] = defaultdict(int)
+    sent = 0
+    started = time.perf_counter()
+    deadline = started + duration
+
+    async def worker(worker_id: int):
+        nonlocal sent
+        rng = random.Random(seed + worker_id)
+        while time.perf_counter() < deadline and (max_requests is None or sent < max_requests):
+            sent += 1
+            route, build_url = ENDPOINTS[rng.choices(names, cum_weights=cum_weights)[0]]
+            request_started = time.perf_counter()
+            try:
+                response = await client.get(build_url(rng, user_ids, set_ids))
+                failed = response.status_code >= 500
+            except httpx.HTTPError:
+                failed = True
+            latencies[route].append(time.perf_counter() - request_started)
+            if failed:
+                errors[route] += 1
+
+    await asyncio.gather(*(worker(worker_id) for worker_id in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+
+def main(
+    concurrency: int = typer.Option(16, min=1, help="Number of concurrent clients"),
+    duration: float = typer.Option(10.0, min=0.1, help="Seconds to keep sending requests"),
+    max_requests: int | None = typer.Option(None, min=1, help="Stop after this many requests"),
+    mix: str = typer.Option(DEFAULT_MIX, help=f"Weighted endpoint mix out of: {', '.join(ENDPOINTS)}"),
+    base_url: str | None = typer.Option(None, help="Target a running server (e.g. local uvicorn) instead of in-process ASGI"),
+    timeout: float = typer.Option(30.0, help="Per-request timeout in seconds"),
+    seed: int = typer.Option(42, help="Seed for endpoint and id selection"),
+    output: Path | None = typer.Option(None, help="Also write the per-route report as JSON"),
+):
+    """
+    Generate load against the API and report throughput and latency per route.
+    """
+    weights = parse_mix(mix)
+
+    async def run() -> tuple[dict[str, list[float]], dict[str, int], float]:
+        async with _build_client(base_url, timeout) as client:
+            return await run_load(client, weights, concurrency, duration, max_requests, seed)
+
+    latencies, errors, elapsed = asyncio.run(run())
+
+    report = {}
+    typer.echo(f"{'route':<60} {'count':>7} {'errors':>6} {'req/s':>9} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9}")
+    for route, samples in sorted(latencies.items()):
+        summary = LatencySummary.from_samples(samples, wall_seconds=elapsed)
+        report[route] = {**asdict(summary), "errors": errors[route]}
+        typer.echo(
+            f"{route:<60} {summary.count:>7} {errors[route]:>6} {summary.ops_per_sec:>9.1f} "
+            f"{summary.p50_ms:>9.2f} {summary.p90_ms:>9.2f} {summary.p99_ms:>9.2f}"
+        )
+    total = LatencySummary.from_samples([s for samples in latencies.values() for s in samples], wall_seconds=elapsed)
+    report["total"] = {**asdict(total), "errors": sum(errors.values())}
+    typer.echo(f"{'total':<60} {total.count:>7} {sum(errors.values()):>6} {total.ops_per_sec:>9.1f} "
+               f"{total.p50_ms:>9.2f} {total.p90_ms:>9.2f} {total.p99_ms:>9.2f}")
+
+    if output is not None:
+        output.write_text(json.dumps({"concurrency": concurrency, "elapsed_seconds": elapsed, "routes": report}, indent=2))
+
+
+if __name__ == "__main__":
+    typer.run(main)
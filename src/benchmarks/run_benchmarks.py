@@ -0,0 +1,252 @@
+"""Benchmarks for AnalyseBuildability and the SQLBrickRepository readers.
+
+Each case runs against generated datasets of increasing size and records
+throughput, latency percentiles, SQL statements per call and peak RSS.
+Read cases run first and the write case last, on a copy of any database
+kept in ``--database-dir``, so every read sees the dataset as generated::
+
+    python -m src.benchmarks.run_benchmarks run --sizes 1000,10000 --output bench.json
+    python -m src.benchmarks.run_benchmarks compare baseline.json bench.json --threshold 0.15
+"""
+import json
+import platform
+import random
+import re
+import resource
+import shutil
+import tempfile
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+import typer
+from sqlmodel import Session, create_engine
+
+from src.benchmarks.stats import LatencySummary
+from src.domain.entities.inventory import Inventory
+from src.domain.entities.user import User
+from src.domain.use_cases.analyse_buildability import AnalyseBuildability
+from src.domain.use_cases.thread_parallel import is_gil_disabled
+from src.ports.repositories.sql_brick_repository import SQLBrickRepository
+from src.ports.repositories.sql_statement_stats import collect_statement_stats
+from src.ports.repositories.sqlite_storage_profiles import STORAGE_PROFILES, apply_storage_profile, get_storage_profile
+from src.scripts.generate_large_dataset import generate_dataset
+
+app = typer.Typer(help="Benchmark AnalyseBuildability and SQLBrickRepository")
+
+
+@dataclass
+class BenchmarkResult:
+    size: int
+    case: str
+    iterations: int
+    ops_per_sec: float
+    mean_ms: float
+    p50_ms: float
+    p99_ms: float
+    queries_per_op: float
+    peak_rss_kb: int
+    # "case" when peak_rss_kb was reset before the case, "process" when it is the high-water mark since start-up.
+    peak_rss_scope: str
+
+
+def _reset_peak_rss() -> bool:
+    """Restart the peak RSS count (Linux only); returns False where the peak can only grow."""
+    try:
+        Path("/proc/self/clear_refs").write_text("5")
+    except OSError:
+        return False
+    return True
+
+
+def _peak_rss_kb() -> int:
+    try:
+        return int(re.search(r"VmHWM:\s+(\d+)", Path("/proc/self/status").read_text()).group(1))
+    except (OSError, AttributeError):
+        # ru_maxrss is a process-wide high-water mark, in KiB on Linux.
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _benchmark_cases(repository: SQLBrickRepository, use_case: AnalyseBuildability, users: int, sets: int, seed: int) -> dict[str, Callable[[], object]]:
+    rng = random.Random(seed)
+    user_ids = [rng.randint(1, users) for _ in range(64)]
+    set_ids = [rng.randint(1, sets) for _ in range(64)]
+    sample_users = [repository.get_user_by_id(user_id) for user_id in user_ids[:8]]
+    sample_sets = [repository.get_set_by_id(set_id) for set_id in set_ids[:8]]
+    all_users = repository.get_all_users()
+    counter = iter(range(1 << 62))
+
+    def pick(values: list):
+        return values[next(counter) % len(values)]
+
+    return {
+        # Repository readers
+        "repository.get_all_sets": lambda: repository.get_all_sets(),
+        "repository.get_all_users": lambda: repository.get_all_users(),
+        "repository.get_all_parts": lambda: repository.get_all_parts(),
+        "repository.get_user_by_id": lambda: repository.get_user_by_id(pick(user_ids)),
+        "repository.get_user_by_name": lambda: repository.get_user_by_name(f"User {pick(user_ids)}"),
+        "repository.get_set_by_id": lambda: repository.get_set_by_id(pick(set_ids)),
+        "repository.get_set_by_name": lambda: repository.get_set_by_name(f"Set {pick(set_ids)}"),
+        "repository.get_parts_by_set_id": lambda: repository.get_parts_by_set_id(pick(set_ids)),
+        "repository.get_inventory_by_id": lambda: repository.get_inventory_by_id(pick(user_ids)),
+        # Use case methods
+        "use_case.get_possible_sets_for_user_inventory": lambda: use_case.get_possible_sets_for_user_inventory(pick(user_ids)),
+        "use_case.get_possible_sets_from_inventory": lambda: use_case.get_possible_sets_from_inventory(pick(sample_users).inventory),
+        "use_case.get_possible_sets_for_users": lambda: use_case.get_possible_sets_for_users(all_users),
+        "use_case.get_missing_parts_for_set": lambda: use_case.get_missing_parts_for_set(pick(sample_users).inventory, pick(sample_sets)),
+        "use_case.get_other_users_with_common_parts": lambda: use_case.get_other_users_with_common_parts(
+            all_users, sample_users[0], use_case.get_missing_parts_for_set(sample_users[0].inventory, pick(sample_sets))
+        ),
+        "use_case.suggest_users_for_part_sharing": lambda: use_case.suggest_users_for_part_sharing(pick(sample_users), pick(set_ids)),
+        "use_case.get_parts_with_percentage_of_usage": lambda: use_case.get_parts_with_percentage_of_usage(0.1),
+        # Writes last: they add users, which every read case above would otherwise see.
+        "repository.create_user": lambda: repository.create_user(
+            User(name=f"Benchmark user {next(counter)}", inventory=Inventory(parts=pick(sample_users).inventory.parts))
+        ),
+    }
+
+
+def _run_case(func: Callable[[], object], min_time: float, min_iterations: int, max_iterations: int) -> tuple[list[float], int]:
+    samples = []
+    with collect_statement_stats() as statement_stats:
+        started = time.perf_counter()
+        while len(samples) < max_iterations and (len(samples) < min_iterations or time.perf_counter() - started < min_time):
+            call_started = time.perf_counter()
+            func()
+            samples.append(time.perf_counter() - call_started)
+    return samples, statement_stats.statements
+
+
+@app.command()
+def run(
+    sizes: str = typer.Option("1000,10000", help="Comma-separated user counts to benchmark"),
+    sets: int = typer.Option(500, min=1, help="Number of sets in each generated catalogue"),
+    parts: int = typer.Option(2000, min=1, help="Number of distinct parts in each dataset"),
+    seed: int = typer.Option(42, help="Seed for the dataset generator and input selection"),
+    cases: str = typer.Option("", help="Only run cases whose name contains one of these comma-separated strings"),
+    min_time: float = typer.Option(1.0, min=0.0, help="Minimum seconds spent per case"),
+    min_iterations: int = typer.Option(5, min=1, help="Minimum calls per case"),
+    max_iterations: int = typer.Option(10_000, min=1, help="Maximum calls per case"),
+    max_workers: int = typer.Option(1, min=1, help="AnalyseBuildability max_workers"),
+    storage_profile: str = typer.Option("wal", help=f"SQLite storage profile: {', '.join(STORAGE_PROFILES)}"),
+    database_dir: Path | None = typer.Option(None, help="Keep generated databases here instead of a temp dir"),
+    output: Path = typer.Option(Path("bench_output.json"), help="Where to write the JSON results"),
+):
+    """
+    Run every benchmark case against datasets of increasing size.
+    """
+    case_filters = [name.strip() for name in cases.split(",") if name.strip()]
+    profile = get_storage_profile(storage_profile)
+    results: list[BenchmarkResult] = []
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        target_dir = database_dir or Path(temp_dir)
+        target_dir.mkdir(parents=True, exist_ok=True)
+
+        for size in (int(value) for value in sizes.split(",")):
+            database_path = target_dir / f"bench_{size}_{sets}_{parts}_{seed}.db"
+            if not database_path.exists() or database_path.stat().st_size == 0:
+                # Generate on its own engine so no bulk-load PRAGMAs leak into the measured connections.
+                generator_engine = create_engine(f"sqlite:///{database_path}", echo=False)
+                summary = generate_dataset(generator_engine, users=size, sets=sets, parts=parts, seed=seed)
+                generator_engine.dispose()
+                typer.echo(f"Generated {size} users ({summary.inventory_links} inventory rows) in {summary.seconds:.1f}s")
+
+            if database_dir is not None:
+                # Measure a copy so the write case leaves the kept database as generated.
+                run_path = Path(temp_dir) / database_path.name
+                shutil.copyfile(database_path, run_path)
+            else:
+                run_path = database_path
+            engine = create_engine(f"sqlite:///{run_path}", echo=False)
+            apply_storage_profile(engine, profile)
+
+            with Session(engine, expire_on_commit=False) as session:
+                repository = SQLBrickRepository(session)
+                use_case = AnalyseBuildability(repository, max_workers=max_workers)
+
+                for case, func in _benchmark_cases(repository, use_case, size, sets, seed).items():
+                    if case_filters and not any(name in case for name in case_filters):
+                        continue
+                    per_case_rss = _reset_peak_rss()
+                    samples, statements = _run_case(func, min_time, min_iterations, max_iterations)
+                    summary = LatencySummary.from_samples(samples)
+                    result = BenchmarkResult(
+                        size=size,
+                        case=case,
+                        iterations=summary.count,
+                        ops_per_sec=summary.ops_per_sec,
+                        mean_ms=summary.mean_ms,
+                        p50_ms=summary.p50_ms,
+                        p99_ms=summary.p99_ms,
+                        queries_per_op=statements / summary.count,
+                        peak_rss_kb=_peak_rss_kb(),
+                        peak_rss_scope="case" if per_case_rss else "process",
+                    )
+                    results.append(result)
+                    typer.echo(
+                        f"{size:>9} {case:<50} {result.ops_per_sec:>10.1f} ops/s  "
+                        f"p50 {result.p50_ms:8.3f}ms  p99 {result.p99_ms:8.3f}ms  {result.queries_per_op:6.1f} q/op"
+                    )
+            engine.dispose()
+
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "gil_disabled": is_gil_disabled(),
+            "sets": sets,
+            "parts": parts,
+            "seed": seed,
+            "max_workers": max_workers,
+            "storage_profile": storage_profile,
+        },
+        "results": [asdict(result) for result in results],
+    }
+    output.write_text(json.dumps(report, indent=2))
+    typer.echo(f"Wrote {len(results)} results to {output}")
+
+
+def find_regressions(baseline: dict, current: dict, threshold: float) -> list[str]:
+    """Describe every case whose p50 latency or throughput got worse than ``threshold``."""
+    baseline_results = {(r["size"], r["case"]): r for r in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        previous = baseline_results.get((result["size"], result["case"]))
+        if previous is None:
+            continue
+        label = f"{result['case']} @ {result['size']} users"
+        if previous["p50_ms"] > 0 and result["p50_ms"] > previous["p50_ms"] * (1 + threshold):
+            regressions.append(f"{label}: p50 {previous['p50_ms']:.3f}ms -> {result['p50_ms']:.3f}ms")
+        if result["ops_per_sec"] < previous["ops_per_sec"] * (1 - threshold):
+            regressions.append(f"{label}: {previous['ops_per_sec']:.1f} -> {result['ops_per_sec']:.1f} ops/s")
+        if result["queries_per_op"] > previous["queries_per_op"]:
+            regressions.append(f"{label}: {previous['queries_per_op']:.1f} -> {result['queries_per_op']:.1f} queries/op")
+    return regressions
+
+
+@app.command()
+def compare(
+    baseline: Path = typer.Argument(..., exists=True, help="Stored baseline JSON"),
+    current: Path = typer.Argument(..., exists=True, help="JSON from the run under test"),
+    threshold: float = typer.Option(0.10, min=0.0, help="Tolerated relative slowdown, e.g. 0.10 for 10%"),
+):
+    """
+    Compare a benchmark run with a baseline and exit non-zero on regressions.
+    """
+    regressions = find_regressions(json.loads(baseline.read_text()), json.loads(current.read_text()), threshold)
+    if not regressions:
+        typer.echo("No regressions")
+        return
+    for regression in regressions:
+        typer.echo(f"REGRESSION {regression}")
+    raise typer.Exit(1)
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,36 @@
+import math
+from dataclasses import dataclass
+
+
+def percentile(sorted_samples: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of already sorted samples."""
+    if not sorted_samples:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_samples)))
+    return sorted_samples[min(rank, len(sorted_samples)) - 1]
+
+
+@dataclass
+class LatencySummary:
+    count: int
+    ops_per_sec: float
+    mean_ms: float
+    p50_ms: float
+    p90_ms: float
+    p99_ms: float
+    max_ms: float
+
+    @classmethod
+    def from_samples(cls, samples_seconds: list[float], wall_seconds: float | None = None) -> "LatencySummary":
+        """Summarise latencies; ``wall_seconds`` gives throughput under concurrency."""
+        samples = sorted(samples_seconds)
+        total = wall_seconds if wall_seconds is not None else sum(samples)
+        return cls(
+            count=len(samples),
+            ops_per_sec=len(samples) / total if total > 0 else 0.0,
+            mean_ms=1000 * sum(samples) / len(samples) if samples else 0.0,
+            p50_ms=1000 * percentile(samples, 0.50),
+            p90_ms=1000 * percentile(samples, 0.90),
+            p99_ms=1000 * percentile(samples, 0.99),
+            max_ms=1000 * samples[-1] if samples else 0.0,
+        )
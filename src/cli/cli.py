@@ -10,6 +10,31 @@ app = typer.Typer(help="CLI tool to interact with REST APIs")
 console = Console()
 
 url_base = "http://127.0.0.1:8000"
+request_headers: dict[str, str] = {}
+
+@app.callback()
+def main(
+    profile: Optional[str] = typer.Option(
+        None, help="Profile each request on the server with 'cprofile' or 'tracemalloc'"
+    ),
+    profile_token: str = typer.Option(
+        "", envvar="LEGO_PROFILE_TOKEN", help="Token matching the server's LEGO_PROFILE_TOKEN"
+    ),
+):
+    """
+    CLI tool to interact with REST APIs.
+    """
+    if profile:
+        request_headers["X-Profile"] = profile
+        request_headers["X-Profile-Token"] = profile_token
+
+def api_get(url: str) -> requests.Response:
+    response = requests.get(url, headers=request_headers)
+    if "X-Profile-File" in response.headers:
+        console.print(f"[dim]Profile saved on the server as {response.headers['X-Profile-File']}[/dim]")
+    elif "X-Profile-Status" in response.headers:
+        console.print(f"[yellow]Profiling {response.headers['X-Profile-Status']}[/yellow]")
+    return response
 
 @app.command()
 def get_users():
@@ -17,7 +42,7 @@ def get_users():
     List all users from the API.
     """
     try:
-        response = requests.get(f"{url_base}/api/users/")
+        response = api_get(f"{url_base}/api/users/")
         response.raise_for_status()
         users = response.json()["data"]
         
@@ -39,7 +64,7 @@ def get_user_by_id(id: int):
     Get a user by ID from the API.
     """
     try:
-        response = requests.get(f"{url_base}/api/user/by-id/{id}")
+        response = api_get(f"{url_base}/api/user/by-id/{id}")
         response.raise_for_status()
         user = response.json()
         
@@ -86,7 +111,7 @@ def get_user_by_name(name: str):
     Get a user by name from the API.
     """
     try:
-        response = requests.get(f"{url_base}/api/user/by-name/{name}")
+        response = api_get(f"{url_base}/api/user/by-name/{name}")
         response.raise_for_status()
         data = response.json()["data"]
         
@@ -122,7 +147,7 @@ def get_sets():
     List all sets from the API.
     """
     try:
-        response = requests.get(f"{url_base}/api/sets/")
+        response = api_get(f"{url_base}/api/sets/")
         response.raise_for_status()
         sets = response.json()
         
@@ -144,7 +169,7 @@ def get_set_by_name(name: str):
     Get a set by name from the API.
     """
     try:
-        response = requests.get(f"{url_base}/api/set/by-name/{name}")
+        response = api_get(f"{url_base}/api/set/by-name/{name}")
         response.raise_for_status()
         brick_set = response.json()
         print(brick_set)
@@ -167,7 +192,7 @@ def get_set_by_id(id: int):
     Get a set by ID from the API.
     """
     try:
-        response = requests.get(f"{url_base}/api/set/by-id/{id}")
+        response = api_get(f"{url_base}/api/set/by-id/{id}")
         response.raise_for_status()
         brick_set = response.json()
         
@@ -198,7 +223,7 @@ def get_colours():
     List all colours from the API.
     """
     try:
-        response = requests.get(f"{url_base}/api/colours/")
+        response = api_get(f"{url_base}/api/colours/")
         response.raise_for_status()
         colours = response.json()
         
@@ -220,7 +245,7 @@ def get_part_usage(percentage: float = 0.5):
     Get parts with usage above a certain percentage from the API.
     """
     try:
-        response = requests.get(f"{url_base}/api/users/part-usage/{percentage}")
+        response = api_get(f"{url_base}/api/users/part-usage?percentage={percentage}")
         response.raise_for_status()
         parts_usage = response.json()["data"]
         
@@ -254,7 +279,7 @@ def suggest_users(user_id: int, set_id: int):
     Suggest users for part sharing based on a user's missing parts for a set.
     """
     try:
-        response = requests.get(f"{url_base}/api/user/by-id/{user_id}/set/{set_id}/suggest-users")
+        response = api_get(f"{url_base}/api/user/by-id/{user_id}/set/{set_id}/suggest-users")
         response.raise_for_status()
         suggested_users = response.json()["data"]
         
@@ -0,0 +1,13 @@
+from dataclasses import dataclass, field
+
+@dataclass(frozen=True)
+class Change:
+    """One committed write, in the order of the change log.
+
+    ``part_deltas`` maps part ids to the quantity added (or removed, when
+    negative) by the write; it is empty for entities without parts.
+    """
+    version: int
+    entity_type: str
+    entity_id: int
+    part_deltas: dict[int, int] = field(default_factory=dict)
@@ -1,6 +1,21 @@
+import hashlib
+import struct
+from collections.abc import Iterable
 from dataclasses import dataclass, field
 from src.domain.entities.part import Part
 
+CONTENT_HASH_MODULUS = 1 << 63
+
+def part_quantity_hash(part_id: int, quantity: int) -> int:
+    """Contribution of holding ``quantity`` of ``part_id`` to an inventory's content hash; 0 if none is held."""
+    if quantity <= 0:
+        return 0
+    return int.from_bytes(hashlib.blake2b(struct.pack("<qq", part_id, quantity), digest_size=8).digest(), "little") % CONTENT_HASH_MODULUS
+
+def content_hash(quantities: Iterable[tuple[int, int]]) -> int:
+    """Order-independent hash of (part id, quantity) pairs, one pair per part: the sum of each pair's ``part_quantity_hash``."""
+    return sum(part_quantity_hash(part_id, quantity) for part_id, quantity in quantities) % CONTENT_HASH_MODULUS
+
 @dataclass
 class InventoryItem:
     part: Part
@@ -9,4 +24,17 @@ class InventoryItem:
 @dataclass
 class Inventory:
     parts: list[InventoryItem] = field(default_factory=list)
-    id: int = field(default_factory=int)
\ No newline at end of file
+    id: int = field(default_factory=int)
+    # Change log version of the inventory's last write; 0 if it was never changed through the repository.
+    version: int = field(default=0, compare=False)
+
+    def quantities(self) -> dict[int, int]:
+        """Part id -> quantity held, summing items of the same part and leaving out parts not held."""
+        quantities: dict[int, int] = {}
+        for item in self.parts:
+            quantities[item.part.id] = quantities.get(item.part.id, 0) + item.quantity
+        return {part_id: quantity for part_id, quantity in quantities.items() if quantity > 0}
+
+    def content_hash(self) -> int:
+        """Equal for inventories holding the same quantity of each part, whatever their order or id."""
+        return content_hash(self.quantities().items())
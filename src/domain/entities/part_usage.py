@@ -0,0 +1,27 @@
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from src.domain.entities.inventory import Inventory
+
+@dataclass
+class PartUsage:
+    """How widely one part is owned across all inventories."""
+    part_id: int
+    owner_count: int
+    total_quantity: int
+    min_quantity: int
+
+def summarise_part_usage(inventories: Iterable[Inventory]) -> dict[int, PartUsage]:
+    usage: dict[int, PartUsage] = {}
+    for inventory in inventories:
+        for item in inventory.parts:
+            if item.quantity <= 0:
+                continue
+            part_usage = usage.get(item.part.id)
+            if part_usage is None:
+                usage[item.part.id] = PartUsage(item.part.id, 1, item.quantity, item.quantity)
+            else:
+                part_usage.owner_count += 1
+                part_usage.total_quantity += item.quantity
+                part_usage.min_quantity = min(part_usage.min_quantity, item.quantity)
+    return usage
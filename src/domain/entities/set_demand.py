@@ -0,0 +1,34 @@
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+
+from src.domain.entities.inventory import Inventory
+from src.domain.entities.set import Set
+
+@dataclass
+class SetDemand:
+    """How far all users are from building one set."""
+    set_id: int
+    # Number of users by how many pieces of the set they miss; 0 means they can build it.
+    users_by_missing_pieces: dict[int, int] = field(default_factory=dict)
+    # Quantity of each part missing, summed over all users; parts nobody misses are left out.
+    missing_by_part: dict[int, int] = field(default_factory=dict)
+
+    def users_within(self, pieces: int) -> int:
+        """Users missing between 1 and ``pieces`` pieces of the set."""
+        return sum(users for missing, users in self.users_by_missing_pieces.items() if 0 < missing <= pieces)
+
+def summarise_set_demand(target_set: Set, inventories: Iterable[Inventory]) -> SetDemand:
+    required: dict[int, int] = {}
+    for item in target_set.parts:
+        required[item.part.id] = required.get(item.part.id, 0) + item.quantity
+    demand = SetDemand(set_id=target_set.id)
+    for inventory in inventories:
+        held = inventory.quantities()
+        missing_pieces = 0
+        for part_id, quantity in required.items():
+            missing = quantity - min(held.get(part_id, 0), quantity)
+            if missing:
+                missing_pieces += missing
+                demand.missing_by_part[part_id] = demand.missing_by_part.get(part_id, 0) + missing
+        demand.users_by_missing_pieces[missing_pieces] = demand.users_by_missing_pieces.get(missing_pieces, 0) + 1
+    return demand
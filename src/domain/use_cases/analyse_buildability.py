@@ -1,13 +1,67 @@
-from src.domain.entities.inventory import Inventory
+from collections.abc import Callable
+
+from src.domain.entities.inventory import Inventory, content_hash
 from src.domain.entities.set import Set
+from src.domain.entities.set_demand import SetDemand
 from src.domain.entities.user import User
 
+from src.domain.use_cases.build_planner import BuildPlan, plan_builds
+from src.domain.use_cases.catalog_index import CatalogIndex
+from src.domain.use_cases.part_bitmaps import PartBitmaps
+from src.domain.use_cases.similarity_index import InventorySimilarityIndex
+from src.domain.use_cases.thread_parallel import parallel_map_chunks
+
+from src.ports.repositories.analytics_repository import AnalyticsRepository
 from src.ports.repositories.bricks_repository import BricksRepository
 from src.ports.repositories.sql_brick_repository_schema import Part
 
+# Users fetched per page when the similarity index is first loaded.
+SIMILARITY_LOAD_PAGE_USERS = 1000
+
+def _group_identical_inventories(users: list[User]) -> list[list[User]]:
+    """Users grouped by identical inventory (same quantity of every part), groups in order of their first user.
+
+    Inventories are bucketed by content hash and compared within a bucket, so
+    a hash collision never merges two different inventories.
+    """
+    groups: list[list[User]] = []
+    buckets: dict[int, list[tuple[dict[int, int], list[User]]]] = {}
+    for user in users:
+        quantities = user.inventory.quantities()
+        bucket = buckets.setdefault(content_hash(quantities.items()), [])
+        for held, group in bucket:
+            if held == quantities:
+                group.append(user)
+                break
+        else:
+            groups.append([user])
+            bucket.append((quantities, groups[-1]))
+    return groups
+
 class AnalyseBuildability:
-    def __init__(self, bricks_repository: BricksRepository):
+    def __init__(
+        self,
+        bricks_repository: BricksRepository,
+        max_workers: int = 1,
+        analytics_repository: AnalyticsRepository | None = None,
+        catalog_source: Callable[[], CatalogIndex] | None = None,
+        part_bitmaps: PartBitmaps | None = None,
+        similarity_index: InventorySimilarityIndex | None = None,
+    ):
         self.bricks_repository = bricks_repository
+        # Batch methods fan out over up to max_workers threads when the
+        # interpreter runs without the GIL, and stay single-threaded otherwise.
+        self.max_workers = max_workers
+        # When set, aggregate questions over all users are pushed down to it
+        # instead of being computed from get_all_users().
+        self.analytics_repository = analytics_repository
+        # Supplies a prebuilt catalogue index (e.g. a shared memory-mapped one)
+        # instead of building it from get_all_sets() on every call.
+        self.catalog_source = catalog_source
+        # Inventory bitmaps for overlap counts; pass a shared instance to reuse them across calls.
+        self.part_bitmaps = part_bitmaps if part_bitmaps is not None else PartBitmaps()
+        # MinHash LSH index of inventories; pass a shared instance to keep signatures across calls.
+        self.similarity_index = similarity_index if similarity_index is not None else InventorySimilarityIndex()
 
     def get_possible_sets_for_user_inventory(self, user_id: int) -> list[Set]:
         user = self.bricks_repository.get_user_by_id(user_id)
@@ -18,18 +72,101 @@ class AnalyseBuildability:
             return []
         return self.get_possible_sets_from_inventory(inventory)
 
-    def get_possible_sets_from_inventory(self, inventory: Inventory) -> list[Set]:
-        all_sets = self.bricks_repository.get_all_sets()
+    def get_catalog_index(self) -> CatalogIndex:
+        if self.catalog_source is not None:
+            return self.catalog_source()
+        return CatalogIndex.from_sets(self.bricks_repository.get_all_sets())
+
+    def get_possible_sets_from_inventory(self, inventory: Inventory, catalog_index: CatalogIndex | None = None) -> list[Set]:
+        if catalog_index is None:
+            catalog_index = self.get_catalog_index()
         inventory_parts = {item.part.id: item.quantity for item in inventory.parts}
-        
-        possible_sets = []
-        for target_set in all_sets:
-            required_parts = {item.part.id: item.quantity for item in target_set.parts}
-            
-            if all(inventory_parts.get(part_id, 0) >= qty for part_id, qty in required_parts.items()):
-                possible_sets.append(target_set)
-        
-        return possible_sets
+        return catalog_index.buildable_sets(inventory_parts)
+
+    def get_almost_buildable_sets(self, user_id: int, k: int = 10, by_ratio: bool = False) -> list[tuple[Set, int]]:
+        """The ``k`` sets ``user_id`` is fewest pieces (or, ``by_ratio``, the smallest share) away from building.
+
+        Returns (set, missing pieces) pairs, closest first; sets the user can
+        already build are left out.
+        """
+        user = self.bricks_repository.get_user_by_id(user_id)
+        if user is None:
+            return []
+        catalog_index = self.get_catalog_index()
+        inventory_parts = {item.part.id: item.quantity for item in user.inventory.parts}
+        return [
+            (catalog_index.sets[set_index], missing)
+            for set_index, missing in catalog_index.closest_set_indices(inventory_parts, k, by_ratio)
+        ]
+
+    def get_group_possible_sets(self, user_ids: list[int]) -> list[tuple[Set, dict[int, int]]]:
+        """Sets the pooled inventories of ``user_ids`` can build, with the pieces each member brings.
+
+        The repository sums the inventories in one query and the usual index
+        lookup runs on the sum. Each required piece is credited to the member
+        holding most of that part first, so a set's contributions add up to
+        its size.
+        """
+        user_ids = list(dict.fromkeys(user_ids))
+        pooled = self.bricks_repository.get_pooled_inventory(user_ids)
+        catalog_index = self.get_catalog_index()
+        set_indices = catalog_index.buildable_set_indices(pooled)
+        if not set_indices:
+            return []
+
+        holdings = {}
+        for user_id in user_ids:
+            member = self.bricks_repository.get_user_by_id(user_id)
+            if member is not None:
+                holdings[member.id] = {item.part.id: item.quantity for item in member.inventory.parts}
+        group_sets = []
+        for set_index in set_indices:
+            contributions = dict.fromkeys(holdings, 0)
+            for part_id, required_qty in catalog_index.requirements[set_index]:
+                holders = sorted(holdings, key=lambda member_id: -holdings[member_id].get(part_id, 0))
+                for member_id in holders:
+                    taken = min(required_qty, holdings[member_id].get(part_id, 0))
+                    if taken <= 0:
+                        break
+                    contributions[member_id] += taken
+                    required_qty -= taken
+            group_sets.append((catalog_index.sets[set_index], contributions))
+        return group_sets
+
+    def get_buildable_copies(self, user_id: int) -> list[tuple[Set, int]]:
+        """Every set ``user_id`` can build, with how many copies of it the inventory holds."""
+        user = self.bricks_repository.get_user_by_id(user_id)
+        if user is None:
+            return []
+        catalog_index = self.get_catalog_index()
+        inventory_parts = {item.part.id: item.quantity for item in user.inventory.parts}
+        return [(catalog_index.sets[set_index], copies) for set_index, copies in catalog_index.buildable_copies(inventory_parts).items()]
+
+    def get_build_plan(self, user_id: int, max_nodes: int = 2_000) -> BuildPlan | None:
+        """Distinct sets ``user_id`` can build at the same time using the most pieces, see ``plan_builds``."""
+        user = self.bricks_repository.get_user_by_id(user_id)
+        if user is None:
+            return None
+        inventory_parts = {item.part.id: item.quantity for item in user.inventory.parts}
+        return plan_builds(self.get_catalog_index(), inventory_parts, max_nodes)
+
+    def get_possible_sets_for_users(self, users: list[User]) -> dict[int, list[Set]]:
+        """Buildable sets of each user, keyed by user id.
+
+        Users holding identical inventories (same quantity of every part) are
+        analysed once, through their first member, and share the result.
+        """
+        catalog_index = self.get_catalog_index()
+        groups = _group_identical_inventories(users)
+
+        def analyse_chunk(chunk: list[list[User]]) -> list[list[Set]]:
+            return [self.get_possible_sets_from_inventory(group[0].inventory, catalog_index) for group in chunk]
+
+        possible_sets = {}
+        for group, sets in zip(groups, parallel_map_chunks(analyse_chunk, groups, self.max_workers)):
+            for user in group:
+                possible_sets[user.id] = list(sets)
+        return {user.id: possible_sets[user.id] for user in users}
     
     def get_missing_parts_for_set(self, inventory: Inventory, target_set: Set) -> dict[int, int]:
         required_parts = {item.part.id: item.quantity for item in target_set.parts}
@@ -44,19 +181,25 @@ class AnalyseBuildability:
         return missing_parts
     
     def get_other_users_with_common_parts(self, users: list[User], current_user: User | None, missing_parts: dict[int, int]) -> list[tuple[User, int]]:
-        users_with_parts = []
-        
-        for user in users:
-            if current_user is not None and user.id == current_user.id:
-                continue
-            
-            user_part_ids = {item.part.id for item in user.inventory.parts}
-            missing_part_ids = set(missing_parts.keys())
-            
-            number_of_common_parts = len(user_part_ids & missing_part_ids)
-            if number_of_common_parts > 0:
-                users_with_parts.append((user, number_of_common_parts))
-        
+        """Users other than ``current_user`` holding any of ``missing_parts``, with how many of them, most first.
+
+        Users holding identical inventories are counted once, through their
+        first member, and share the count.
+        """
+        missing_bitmap = self.part_bitmaps.encode(missing_parts.keys())
+        current_user_id = current_user.id if current_user is not None else None
+        groups = _group_identical_inventories([user for user in users if current_user_id is None or user.id != current_user_id])
+
+        def count_chunk(chunk: list[list[User]]) -> list[int]:
+            return [PartBitmaps.overlap(missing_bitmap, self.part_bitmaps.inventory(group[0].inventory)) for group in chunk]
+
+        common_parts = {}
+        for group, number_of_common_parts in zip(groups, parallel_map_chunks(count_chunk, groups, self.max_workers)):
+            for user in group:
+                common_parts[id(user)] = number_of_common_parts
+        users_with_parts = [
+            (user, common_parts[id(user)]) for user in users if common_parts.get(id(user), 0) > 0
+        ]
         return sorted(users_with_parts, key=lambda x: x[1], reverse=True)
     
     def get_other_users_with_part(self, users: list[User], part_id: int) -> dict[int, int]:
@@ -84,20 +227,165 @@ class AnalyseBuildability:
         return self.get_other_users_with_common_parts(all_users, current_user, missing_parts)
     
     
-    def get_parts_with_percentage_of_usage(self, percentage: float) -> list[tuple[Part, int]]:
-        all_users = self.bricks_repository.get_all_users()
-        if not all_users:
+    def get_similar_users(self, user_id: int, limit: int = 10, weighted: bool = False) -> list[tuple[User, float]]:
+        """Users whose inventories are most like ``user_id``'s, most similar first.
+
+        The similarity index shortlists the users sharing a MinHash band with
+        the inventory, then only the shortlist is fetched and ranked by exact
+        Jaccard similarity of part ids, or with ``weighted`` of part
+        quantities. Users below about 0.4 similarity mostly miss the shortlist.
+        """
+        user = self.bricks_repository.get_user_by_id(user_id)
+        if user is None:
+            return []
+        self._sync_similarity_index()
+        self.similarity_index.update(user.inventory, user.id)
+
+        inventory_parts = {item.part.id: item.quantity for item in user.inventory.parts if item.quantity > 0}
+        similarity = InventorySimilarityIndex.weighted_jaccard if weighted else InventorySimilarityIndex.jaccard
+        similar_users = []
+        for inventory_id in self.similarity_index.candidates(inventory_parts):
+            other_id = self.similarity_index.owner_of(inventory_id)
+            if other_id is None or other_id == user.id:
+                continue
+            other = self.bricks_repository.get_user_by_id(other_id)
+            if other is None:
+                continue
+            other_parts = {item.part.id: item.quantity for item in other.inventory.parts if item.quantity > 0}
+            similar_users.append((other, similarity(inventory_parts, other_parts)))
+        similar_users.sort(key=lambda pair: pair[1], reverse=True)
+        return similar_users[:limit]
+
+    def _sync_similarity_index(self) -> None:
+        """Load every user into the similarity index the first time, then replay the change log written since.
+
+        Replaying starts from the beginning of the log, so writes made while
+        the users were being loaded are not missed; inventories the index
+        already holds at that version are skipped without being fetched.
+        """
+        index = self.similarity_index
+        with index.sync_lock:
+            if not index.loaded:
+                offset = 0
+                while page := self.bricks_repository.get_all_users(offset=offset, limit=SIMILARITY_LOAD_PAGE_USERS):
+                    for other in page:
+                        index.update(other.inventory, other.id)
+                    offset += len(page)
+                index.loaded = True
+
+            while True:
+                try:
+                    changes = self.bricks_repository.get_changes(since=index.synced_version)
+                except NotImplementedError:
+                    # Repositories without a change log (snapshots) never change.
+                    return
+                if not changes:
+                    return
+                for change in changes:
+                    if change.entity_type == "user" and not index.has_user(change.entity_id):
+                        other = self.bricks_repository.get_user_by_id(change.entity_id)
+                        if other is not None:
+                            index.update(other.inventory, other.id)
+                    elif change.entity_type == "inventory":
+                        # Inventories nobody owns are not indexed; a new user's arrives with its user change.
+                        version = index.version_of(change.entity_id)
+                        if version is not None and version < change.version:
+                            inventory = self.bricks_repository.get_inventory_by_id(change.entity_id)
+                            if inventory is not None:
+                                index.update(inventory)
+                index.synced_version = changes[-1].version
+
+    def get_parts_with_percentage_of_usage(self, percentage: float, approximate: bool = False) -> list[tuple[Part, int]]:
+        """Parts owned by at least ``percentage`` of users, with their smallest owned quantity.
+
+        With ``approximate`` the answer comes from the repository's usage
+        sketches and each part is paired with its estimated number of owners
+        instead, see ``get_approximate_parts_with_percentage_of_usage``.
+        """
+        if approximate:
+            return self.get_approximate_parts_with_percentage_of_usage(percentage)
+        if self.analytics_repository is not None:
+            user_count = self.analytics_repository.count_users()
+            if not user_count:
+                return {}
+            usage_by_part = self.analytics_repository.get_part_usage()
+            return self._parts_above_usage(usage_by_part, user_count, percentage)
+
+        user_count = self.bricks_repository.count_users()
+        if not user_count:
             return {}
-        
-        all_parts = self.bricks_repository.get_all_parts()
-        parts_with_usage_above_percentage = []
-
-        for part in all_parts:
-            users_with_part = self.get_other_users_with_part(all_users, part.id)
-            if len(users_with_part) / len(all_users) >= percentage:
-                number_of_parts = min(users_with_part.values()) if users_with_part else 0
-                parts_with_usage_above_percentage.append((part, number_of_parts))
-        
-        return parts_with_usage_above_percentage
+        # Rounded down so float error never drops a part; _parts_above_usage applies the exact threshold.
+        min_owners = int(percentage * user_count)
+        usage_by_part = {
+            usage.part_id: (usage.owner_count, usage.min_quantity)
+            for usage in self.bricks_repository.get_part_usage(min_owners)
+        }
+        return self._parts_above_usage(usage_by_part, user_count, percentage)
+
+    def get_approximate_parts_with_percentage_of_usage(self, percentage: float) -> list[tuple[Part, int]]:
+        """Parts whose estimated owner count reaches ``percentage`` of the estimated users.
+
+        Costs a few hash lookups for every part of the catalogue, whatever the
+        number of users. Owner counts overshoot by at most ``epsilon`` times the
+        number of (user, part) ownerships, with probability ``1 - delta`` (see
+        ``SketchSettings``).
+        """
+        sketches = self.bricks_repository.get_usage_sketches()
+        user_count = sketches.users.count()
+        if not user_count:
+            return []
+        parts = []
+        for part in self.bricks_repository.get_all_parts():
+            owners = sketches.part_owners.estimate(part.id)
+            if owners / user_count >= percentage:
+                parts.append((part, owners))
+        return parts
+
+    def get_approximate_owner_counts(self, attribute: str) -> dict[int, int]:
+        """Estimated number of users owning any part of each shape or colour id."""
+        sketches = self.bricks_repository.get_usage_sketches()
+        by_key = {"shape": sketches.shape_owners, "colour": sketches.colour_owners}.get(attribute)
+        if by_key is None:
+            raise ValueError(f"Unknown part attribute '{attribute}', expected 'shape' or 'colour'")
+        return {key: sketch.count() for key, sketch in sorted(by_key.items())}
+
+    def _parts_above_usage(self, usage_by_part: dict[int, tuple[int, int]], user_count: int, percentage: float) -> list[tuple[Part, int]]:
+        min_quantities = {
+            part_id: min_quantity
+            for part_id, (owners, min_quantity) in usage_by_part.items()
+            if owners / user_count >= percentage
+        }
+        if not min_quantities:
+            return []
+        return [(part, min_quantities[part.id]) for part in self.bricks_repository.get_parts_by_ids(min_quantities)]
+
+    def get_buildable_user_counts(self) -> dict[int, int]:
+        """Number of users able to build each set, keyed by set id."""
+        if self.analytics_repository is not None:
+            return self.analytics_repository.get_buildable_user_counts()
+
+        catalog_index = self.get_catalog_index()
+        counts = dict.fromkeys((target_set.id for target_set in catalog_index.sets), 0)
+        for group in _group_identical_inventories(self.bricks_repository.get_all_users()):
+            inventory_parts = {item.part.id: item.quantity for item in group[0].inventory.parts}
+            for set_index in catalog_index.buildable_set_indices(inventory_parts):
+                counts[catalog_index.sets[set_index].id] += len(group)
+        return counts
+
+    def get_missing_part_demand(self, set_id: int) -> dict[int, int]:
+        """Quantity of each part of ``set_id`` missing across all users' inventories."""
+        if self.analytics_repository is not None:
+            return self.analytics_repository.get_missing_part_demand(set_id)
+
+        set_demand = self.get_set_demand(set_id)
+        return set_demand.missing_by_part if set_demand is not None else {}
+
+    def get_set_demand(self, set_id: int) -> SetDemand | None:
+        """How many pieces of ``set_id`` each user misses, as a histogram, and the missing quantity per part.
+
+        The repository aggregates it in one pass over the owners of the set's
+        parts; a cached repository keeps it until an inventory changes.
+        """
+        return self.bricks_repository.get_set_demand(set_id)
     
     
@@ -0,0 +1,102 @@
+import random
+from collections.abc import Mapping
+from dataclasses import dataclass
+
+from src.domain.entities.set import Set
+from src.domain.use_cases.catalog_index import CatalogIndex
+
+# Budgets are remembered by a linear hash of the pieces already used, modulo
+# this prime: two plans leaving the same budget always share a key.
+_BUDGET_HASH_MODULUS = (1 << 61) - 1
+
+
+@dataclass(frozen=True)
+class BuildPlan:
+    sets: tuple[Set, ...]
+    pieces: int
+    # False when the search stopped at its node budget before proving no plan uses more pieces.
+    optimal: bool
+
+
+def plan_builds(catalog_index: CatalogIndex, inventory_parts: Mapping[int, int], max_nodes: int = 2_000) -> BuildPlan:
+    """Distinct sets to build at once from ``inventory_parts``, using as many pieces as possible.
+
+    Only sets buildable on their own can be part of a plan. They are tried
+    largest first, so the first plan found is the greedy one; a depth-first
+    branch and bound then looks for better ones. A branch stops when even
+    every remaining set could not beat the best plan, or when it leaves the
+    same part budget as a branch already explored. After ``max_nodes``
+    branches the best plan so far is returned, marked as not optimal.
+    """
+    candidates = sorted(
+        catalog_index.buildable_copies(inventory_parts),
+        key=lambda set_index: (-catalog_index.requirement_totals[set_index], set_index),
+    )
+    requirements = [tuple(catalog_index.requirements[set_index]) for set_index in candidates]
+    totals = [catalog_index.requirement_totals[set_index] for set_index in candidates]
+    remaining_totals = [0] * (len(candidates) + 1)
+    for position in range(len(candidates) - 1, -1, -1):
+        remaining_totals[position] = remaining_totals[position + 1] + totals[position]
+
+    rng = random.Random(0)
+    part_keys: dict[int, int] = {}
+    for required in requirements:
+        for part_id, _ in required:
+            if part_id not in part_keys:
+                part_keys[part_id] = rng.getrandbits(61)
+    set_keys = [sum(quantity * part_keys[part_id] for part_id, quantity in required) % _BUDGET_HASH_MODULUS for required in requirements]
+
+    budget = {part_id: inventory_parts.get(part_id, 0) for part_id in part_keys}
+    explored: set[tuple[int, int]] = set()
+    chosen: list[int] = []
+    budget_keys: list[int] = []
+    best_pieces, best_positions = 0, ()
+    pieces = budget_key = nodes = 0
+    optimal = True
+    # One entry per plan depth: the next candidate to try there. Iterative, as
+    # a plan of many small sets would overflow the interpreter's stack.
+    next_positions = [0]
+    while next_positions and optimal:
+        position = next_positions[-1]
+        while position < len(candidates):
+            if pieces + remaining_totals[position] <= best_pieces:
+                # Candidates only get smaller from here on.
+                position = len(candidates)
+                break
+            required = requirements[position]
+            key = (position, (budget_key + set_keys[position]) % _BUDGET_HASH_MODULUS)
+            if key in explored or any(budget[part_id] < quantity for part_id, quantity in required):
+                position += 1
+                continue
+            explored.add(key)
+            nodes += 1
+            if nodes > max_nodes:
+                optimal = False
+                break
+            for part_id, quantity in required:
+                budget[part_id] -= quantity
+            chosen.append(position)
+            budget_keys.append(budget_key)
+            pieces, budget_key = pieces + totals[position], key[1]
+            if pieces > best_pieces:
+                best_pieces, best_positions = pieces, tuple(chosen)
+            next_positions[-1] = position + 1
+            next_positions.append(position + 1)
+            break
+        else:
+            next_positions.pop()
+            if chosen:
+                position = chosen.pop()
+                for part_id, quantity in requirements[position]:
+                    budget[part_id] += quantity
+                pieces, budget_key = pieces - totals[position], budget_keys.pop()
+            continue
+        if position == len(candidates):
+            # Pruned by the bound: this depth is done.
+            next_positions[-1] = position
+
+    return BuildPlan(
+        sets=tuple(catalog_index.sets[candidates[position]] for position in best_positions),
+        pieces=best_pieces,
+        optimal=optimal,
+    )
@@ -0,0 +1,169 @@
+import heapq
+from itertools import takewhile
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import dataclass
+from types import MappingProxyType
+
+from src.domain.entities.set import Set
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogIndex:
+    """Read-only view of the set catalogue used by the buildability checks.
+
+    Every field is a read-only container (tuples and a mapping proxy, or views
+    of a memory-mapped file), so a single index can be shared by any number of
+    threads without locking. ``requirements[i]`` lists the (part id, quantity)
+    pairs of set ``i``, ``requirement_counts[i]`` is its length and
+    ``requirement_totals[i]`` the number of pieces it needs. Parts a set lists
+    with a quantity of zero or less are no requirement and are left out.
+    ``sets_by_total`` holds the set positions ordered by piece total, then by
+    position, so sets with nothing to build come first.
+    """
+    sets: Sequence[Set]
+    requirements: Sequence[Sequence[tuple[int, int]]]
+    sets_by_part: Mapping[int, Iterable[tuple[int, int]]]
+    requirement_counts: Sequence[int]
+    requirement_totals: Sequence[int]
+    sets_by_total: Sequence[int]
+
+    @classmethod
+    def from_sets(cls, sets: Iterable[Set]) -> "CatalogIndex":
+        sets = tuple(sets)
+        requirements = []
+        postings: dict[int, list[tuple[int, int]]] = {}
+
+        for set_index, target_set in enumerate(sets):
+            required_parts: dict[int, int] = {}
+            for item in target_set.parts:
+                required_parts[item.part.id] = required_parts.get(item.part.id, 0) + item.quantity
+            required_parts = {part_id: quantity for part_id, quantity in required_parts.items() if quantity > 0}
+            requirements.append(tuple(required_parts.items()))
+            for part_id, quantity in required_parts.items():
+                postings.setdefault(part_id, []).append((set_index, quantity))
+
+        requirement_totals = tuple(sum(quantity for _, quantity in required_parts) for required_parts in requirements)
+        return cls(
+            sets=sets,
+            requirements=tuple(requirements),
+            sets_by_part=MappingProxyType({part_id: tuple(entries) for part_id, entries in postings.items()}),
+            requirement_counts=tuple(len(required_parts) for required_parts in requirements),
+            requirement_totals=requirement_totals,
+            sets_by_total=order_by_total(requirement_totals),
+        )
+
+    def buildable_set_indices(self, inventory_parts: Mapping[int, int]) -> list[int]:
+        """Return the positions of the sets fully covered by ``inventory_parts``.
+
+        Only the postings of parts the inventory actually holds are visited and
+        only the sets they touch are counted, so the cost follows the inventory
+        rather than the size of the catalogue.
+        """
+        satisfied: dict[int, int] = {}
+        for part_id, available_qty in inventory_parts.items():
+            for set_index, required_qty in self.sets_by_part.get(part_id, ()):
+                if available_qty >= required_qty:
+                    satisfied[set_index] = satisfied.get(set_index, 0) + 1
+
+        buildable = [set_index for set_index, count in satisfied.items() if count == self.requirement_counts[set_index]]
+        buildable.extend(takewhile(lambda set_index: not self.requirement_totals[set_index], self.sets_by_total))
+        return sorted(buildable)
+
+    def buildable_copies(self, inventory_parts: Mapping[int, int]) -> dict[int, int]:
+        """Set position -> number of copies ``inventory_parts`` can build, for every set it can build at least once.
+
+        A set's copies are the minimum over its parts of held // required.
+        Small inventories take them in the same postings walk as
+        ``buildable_set_indices``. When that walk would visit more postings
+        than there are sets, as for large inventories, each set is checked
+        directly instead and given up at its first missing part.
+        """
+        postings_per_part = sum(self.requirement_counts) / max(len(self.sets_by_part), 1)
+        if len(inventory_parts) * postings_per_part > len(self.sets):
+            return self._scan_copies(inventory_parts)
+
+        satisfied: dict[int, int] = {}
+        copies: dict[int, int] = {}
+        for part_id, available_qty in inventory_parts.items():
+            for set_index, required_qty in self.sets_by_part.get(part_id, ()):
+                if available_qty >= required_qty:
+                    satisfied[set_index] = satisfied.get(set_index, 0) + 1
+                    part_copies = available_qty // required_qty
+                    if part_copies < copies.get(set_index, part_copies + 1):
+                        copies[set_index] = part_copies
+
+        return {
+            set_index: copies[set_index]
+            for set_index in sorted(copies)
+            if satisfied[set_index] == self.requirement_counts[set_index]
+        }
+
+    def _scan_copies(self, inventory_parts: Mapping[int, int]) -> dict[int, int]:
+        copies = {}
+        for set_index, required_parts in enumerate(self.requirements):
+            set_copies = None
+            for part_id, required_qty in required_parts:
+                part_copies = inventory_parts.get(part_id, 0) // required_qty
+                if not part_copies:
+                    break
+                if set_copies is None or part_copies < set_copies:
+                    set_copies = part_copies
+            else:
+                if set_copies is not None:
+                    copies[set_index] = set_copies
+        return copies
+
+    def closest_set_indices(self, inventory_parts: Mapping[int, int], k: int, by_ratio: bool = False) -> list[tuple[int, int]]:
+        """Return (set position, missing pieces) of the ``k`` sets ``inventory_parts`` comes closest to building.
+
+        Sets are ranked by missing pieces, or with ``by_ratio`` by the share of
+        their pieces that is missing, ties going to the earlier set; sets that
+        can already be built are left out. Covered pieces are counted from the
+        postings of held parts as in ``buildable_set_indices`` and a heap keeps
+        the best ``k`` of the sets they touch. Untouched sets miss all their
+        pieces, so they are taken in rank order (by position for ratios, by
+        ``sets_by_total`` otherwise) only until one no longer beats the heap.
+        """
+        if k <= 0:
+            return []
+        covered: dict[int, int] = {}
+        for part_id, available_qty in inventory_parts.items():
+            if available_qty <= 0:
+                continue
+            for set_index, required_qty in self.sets_by_part.get(part_id, ()):
+                covered[set_index] = covered.get(set_index, 0) + min(available_qty, required_qty)
+
+        # Max-heap through negation: the root is the worst of the best k.
+        best: list[tuple[float, int, int]] = []
+
+        def offer(rank: float, set_index: int, missing: int) -> bool:
+            entry = (-rank, -set_index, missing)
+            if len(best) < k:
+                heapq.heappush(best, entry)
+            elif entry[:2] > best[0][:2]:
+                heapq.heapreplace(best, entry)
+            else:
+                return False
+            return True
+
+        for set_index, covered_qty in covered.items():
+            total = self.requirement_totals[set_index]
+            missing = total - covered_qty
+            if missing > 0:
+                offer(missing / total if by_ratio else missing, set_index, missing)
+
+        for set_index in range(len(self.sets)) if by_ratio else self.sets_by_total:
+            total = self.requirement_totals[set_index]
+            if not total or set_index in covered:
+                continue
+            if not offer(1.0 if by_ratio else total, set_index, total):
+                break
+        return [(-negated_index, missing) for _, negated_index, missing in sorted(best, reverse=True)]
+
+    def buildable_sets(self, inventory_parts: Mapping[int, int]) -> list[Set]:
+        return [self.sets[set_index] for set_index in self.buildable_set_indices(inventory_parts)]
+
+
+def order_by_total(requirement_totals: Sequence[int]) -> tuple[int, ...]:
+    """Set positions ordered by piece total, ties keeping their position order."""
+    return tuple(sorted(range(len(requirement_totals)), key=requirement_totals.__getitem__))
@@ -0,0 +1,85 @@
+import sys
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable
+
+from src.domain.entities.inventory import Inventory
+
+
+class PartBitmaps:
+    """Encodes collections of part ids as int bitmasks over a dense bit space.
+
+    Each part id gets the next free bit the first time it is seen and keeps
+    it, so bitmaps built at different times stay comparable. Overlaps and
+    subset tests are then a single ``&`` plus ``int.bit_count()``, which
+    CPython runs a machine word at a time. Inventory bitmaps are cached per
+    (inventory id, version), so a changed inventory is simply re-encoded.
+    A bitmap is as wide as the part space seen so far, so the cache is
+    bounded by ``max_cached_bytes`` rather than by a number of inventories.
+    Safe to share between threads.
+    """
+
+    def __init__(self, max_cached_bytes: int = 64 * 1024 * 1024):
+        self.max_cached_bytes = max_cached_bytes
+        self._positions: dict[int, int] = {}
+        # Part id at each position; only appended to, under the lock.
+        self._part_ids: list[int] = []
+        self._inventories: OrderedDict[tuple[int, int], int] = OrderedDict()
+        self._cached_bytes = 0
+        self._lock = threading.Lock()
+
+    def _position(self, part_id: int) -> int:
+        position = self._positions.get(part_id)
+        if position is None:
+            with self._lock:
+                position = self._positions.get(part_id)
+                if position is None:
+                    position = self._positions[part_id] = len(self._part_ids)
+                    self._part_ids.append(part_id)
+        return position
+
+    def encode(self, part_ids: Iterable[int]) -> int:
+        bitmap = 0
+        for part_id in part_ids:
+            bitmap |= 1 << self._position(part_id)
+        return bitmap
+
+    def decode(self, bitmap: int) -> set[int]:
+        # Walks the set bits only; their positions were all assigned before the bitmap existed.
+        part_ids = set()
+        while bitmap:
+            lowest = bitmap & -bitmap
+            part_ids.add(self._part_ids[lowest.bit_length() - 1])
+            bitmap ^= lowest
+        return part_ids
+
+    def inventory(self, inventory: Inventory) -> int:
+        """Bitmap of the parts ``inventory`` holds at least one of."""
+        # Inventories that were never stored have no identity to cache under.
+        if not inventory.id:
+            return self.encode(item.part.id for item in inventory.parts if item.quantity > 0)
+        key = (inventory.id, inventory.version)
+        with self._lock:
+            bitmap = self._inventories.get(key)
+            if bitmap is not None:
+                self._inventories.move_to_end(key)
+                return bitmap
+        bitmap = self.encode(item.part.id for item in inventory.parts if item.quantity > 0)
+        with self._lock:
+            replaced = self._inventories.pop(key, None)
+            if replaced is not None:
+                self._cached_bytes -= sys.getsizeof(replaced)
+            self._inventories[key] = bitmap
+            self._cached_bytes += sys.getsizeof(bitmap)
+            while self._cached_bytes > self.max_cached_bytes and self._inventories:
+                _, evicted = self._inventories.popitem(last=False)
+                self._cached_bytes -= sys.getsizeof(evicted)
+        return bitmap
+
+    @staticmethod
+    def overlap(bitmap: int, other: int) -> int:
+        return (bitmap & other).bit_count()
+
+    @staticmethod
+    def contains_all(bitmap: int, required: int) -> bool:
+        return bitmap & required == required
@@ -0,0 +1,139 @@
+import threading
+from collections.abc import Iterable, Mapping
+
+from src.domain.entities.inventory import Inventory
+from src.domain.use_cases.sketches import _hash64
+
+# Added per bin of distance when an empty bin borrows a neighbour's value, so
+# borrowed values never collide with genuine ones (those stay below 2 ** 64).
+_ROTATION = 1 << 64
+
+
+class InventorySimilarityIndex:
+    """MinHash LSH index of inventories by the part ids they hold.
+
+    Two inventories share each MinHash value with probability equal to the
+    Jaccard similarity of their part id sets. Signatures are split into
+    ``bands`` bands of ``rows`` values and inventories sharing any whole band
+    become candidates, so a lookup touches ``bands`` buckets instead of every
+    inventory. Inventories at Jaccard similarity ``s`` are found with
+    probability ``1 - (1 - s ** rows) ** bands``; with the defaults, 87% of
+    inventories at 0.5 and 12% of those at 0.25.
+
+    Signatures use one-permutation hashing: each part id is hashed once into
+    one of ``bands * rows`` bins and empty bins borrow the next non-empty one,
+    so signing an inventory costs one hash per part. Entries are kept per
+    (inventory id, version) like ``PartBitmaps``, so only inventories changed
+    since the last update are signed again. Safe to share between threads.
+
+    The index also remembers the user owning each inventory, and how far it
+    has caught up with the change log (``loaded`` and ``synced_version``),
+    for callers that keep it in step with a repository under ``sync_lock``.
+    """
+
+    def __init__(self, bands: int = 32, rows: int = 4):
+        self.bands = bands
+        self.rows = rows
+        self._buckets: list[dict[tuple[int, ...], set[int]]] = [{} for _ in range(bands)]
+        self._entries: dict[int, tuple[int, tuple[int, ...]]] = {}
+        self._owners: dict[int, int] = {}
+        self._owned: dict[int, int] = {}
+        self._lock = threading.Lock()
+        self.loaded = False
+        self.synced_version = 0
+        self.sync_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def signature(self, part_ids: Iterable[int]) -> tuple[int, ...]:
+        bins = self.bands * self.rows
+        minimums: list[int | None] = [None] * bins
+        for part_id in part_ids:
+            hashed = _hash64(part_id)
+            value = hashed // bins
+            current = minimums[hashed % bins]
+            if current is None or value < current:
+                minimums[hashed % bins] = value
+
+        if all(value is None for value in minimums):
+            return ()
+        signature = list(minimums)
+        for index in range(bins):
+            distance = 1
+            while signature[index] is None:
+                borrowed = minimums[(index + distance) % bins]
+                if borrowed is not None:
+                    signature[index] = borrowed + distance * _ROTATION
+                distance += 1
+        return tuple(signature)
+
+    def _band_keys(self, signature: tuple[int, ...]) -> list[tuple[int, ...]]:
+        return [signature[band * self.rows:(band + 1) * self.rows] for band in range(self.bands)] if signature else []
+
+    def update(self, inventory: Inventory, user_id: int | None = None) -> None:
+        """Index ``inventory`` under its id, replacing any older version of it, and record ``user_id`` as its owner."""
+        if not inventory.id:
+            return
+        if user_id is not None:
+            with self._lock:
+                self._owners[inventory.id] = user_id
+                self._owned[user_id] = inventory.id
+        entry = self._entries.get(inventory.id)
+        if entry is not None and entry[0] == inventory.version:
+            return
+        band_keys = self._band_keys(self.signature(item.part.id for item in inventory.parts if item.quantity > 0))
+        with self._lock:
+            self._discard(inventory.id)
+            self._entries[inventory.id] = (inventory.version, tuple(band_keys))
+            for buckets, key in zip(self._buckets, band_keys):
+                buckets.setdefault(key, set()).add(inventory.id)
+
+    def version_of(self, inventory_id: int) -> int | None:
+        """Version of ``inventory_id`` in the index, or None if it is not indexed."""
+        entry = self._entries.get(inventory_id)
+        return entry[0] if entry is not None else None
+
+    def owner_of(self, inventory_id: int) -> int | None:
+        return self._owners.get(inventory_id)
+
+    def has_user(self, user_id: int) -> bool:
+        return user_id in self._owned
+
+    def remove(self, inventory_id: int) -> None:
+        with self._lock:
+            self._discard(inventory_id)
+            user_id = self._owners.pop(inventory_id, None)
+            if user_id is not None:
+                del self._owned[user_id]
+
+    def _discard(self, inventory_id: int) -> None:
+        entry = self._entries.pop(inventory_id, None)
+        if entry is None:
+            return
+        for buckets, key in zip(self._buckets, entry[1]):
+            members = buckets[key]
+            members.discard(inventory_id)
+            if not members:
+                del buckets[key]
+
+    def candidates(self, part_ids: Iterable[int]) -> set[int]:
+        """Ids of the indexed inventories sharing at least one band with ``part_ids``."""
+        band_keys = self._band_keys(self.signature(part_ids))
+        found: set[int] = set()
+        with self._lock:
+            for buckets, key in zip(self._buckets, band_keys):
+                found.update(buckets.get(key, ()))
+        return found
+
+    @staticmethod
+    def jaccard(parts: Mapping[int, int], other: Mapping[int, int]) -> float:
+        union = len(parts.keys() | other.keys())
+        return len(parts.keys() & other.keys()) / union if union else 0.0
+
+    @staticmethod
+    def weighted_jaccard(parts: Mapping[int, int], other: Mapping[int, int]) -> float:
+        """Sum of the smaller quantities over sum of the larger ones, part by part."""
+        smaller = sum(min(quantity, other.get(part_id, 0)) for part_id, quantity in parts.items())
+        larger = sum(parts.values()) + sum(other.values()) - smaller
+        return smaller / larger if larger else 0.0
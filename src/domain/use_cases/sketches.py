@@ -0,0 +1,158 @@
+"""Mergeable approximate counters for usage analytics.
+
+``HyperLogLog`` estimates how many distinct values were added and
+``CountMinSketch`` how often each key was counted, both in fixed memory
+chosen from an error bound. Two sketches with the same settings merge into
+the sketch of the union of their inputs, so they can be built in chunks, per
+worker or cell by cell in a database.
+"""
+import hashlib
+import math
+import struct
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+
+from src.domain.entities.inventory import Inventory
+from src.domain.entities.part import Part
+
+
+def _hash64(value: int, seed: int = 0) -> int:
+    # Stable across processes, unlike hash(), so sketches stored by one worker are valid in another.
+    return int.from_bytes(hashlib.blake2b(struct.pack("<qq", seed, value), digest_size=8).digest(), "little")
+
+
+class HyperLogLog:
+    """Distinct count estimate with a standard error of ``1.04 / sqrt(2 ** precision)``.
+
+    Values can only be added: a sketch never forgets a value, so it counts
+    everything ever added until it is rebuilt.
+    """
+
+    def __init__(self, precision: int = 12, registers: bytearray | None = None):
+        if not 4 <= precision <= 16:
+            raise ValueError(f"HyperLogLog precision must be between 4 and 16, got {precision}")
+        self.precision = precision
+        self.registers = registers if registers is not None else bytearray(1 << precision)
+
+    @staticmethod
+    def precision_for_error(relative_error: float) -> int:
+        return max(4, min(16, math.ceil(math.log2((1.04 / relative_error) ** 2))))
+
+    @property
+    def relative_error(self) -> float:
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def register_for(self, value: int) -> tuple[int, int]:
+        """(register index, rank) that adding ``value`` raises its register to, at least."""
+        hashed = _hash64(value)
+        remaining_bits = 64 - self.precision
+        rest = hashed & ((1 << remaining_bits) - 1)
+        return hashed >> remaining_bits, remaining_bits - rest.bit_length() + 1
+
+    def add(self, value: int) -> None:
+        index, rank = self.register_for(value)
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def count(self) -> int:
+        registers = len(self.registers)
+        alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(registers, 0.7213 / (1 + 1.079 / registers))
+        estimate = alpha * registers * registers / sum(2.0 ** -rank for rank in self.registers)
+        empty = self.registers.count(0)
+        if estimate <= 2.5 * registers and empty:
+            # Linear counting is more accurate while many registers are still empty.
+            estimate = registers * math.log(registers / empty)
+        return round(estimate)
+
+    def merge(self, other: "HyperLogLog") -> None:
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches of different precision")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+
+class CountMinSketch:
+    """Per-key count estimate that overshoots by at most ``epsilon * total`` with probability ``1 - delta``.
+
+    Counts may go down as well as up, as long as no key's true count goes
+    below zero.
+    """
+
+    def __init__(self, width: int = 2719, depth: int = 5, counters: list[list[int]] | None = None):
+        self.width = width
+        self.depth = depth
+        self.counters = counters if counters is not None else [[0] * width for _ in range(depth)]
+
+    @staticmethod
+    def dimensions_for_error(epsilon: float, delta: float) -> tuple[int, int]:
+        return math.ceil(math.e / epsilon), math.ceil(math.log(1 / delta))
+
+    def columns(self, key: int) -> list[int]:
+        return [_hash64(key, row) % self.width for row in range(self.depth)]
+
+    def add(self, key: int, count: int = 1) -> None:
+        for row, column in enumerate(self.columns(key)):
+            self.counters[row][column] += count
+
+    def estimate(self, key: int) -> int:
+        return max(0, min(self.counters[row][column] for row, column in enumerate(self.columns(key))))
+
+    def merge(self, other: "CountMinSketch") -> None:
+        if (other.width, other.depth) != (self.width, self.depth):
+            raise ValueError("Cannot merge count-min sketches of different dimensions")
+        for row, other_row in zip(self.counters, other.counters):
+            for column, count in enumerate(other_row):
+                row[column] += count
+
+
+@dataclass(frozen=True)
+class SketchSettings:
+    hll_precision: int = 12
+    cms_width: int = 2719
+    cms_depth: int = 5
+
+    @classmethod
+    def from_error(cls, relative_error: float = 0.02, epsilon: float = 0.001, delta: float = 0.01) -> "SketchSettings":
+        """``relative_error`` bounds distinct counts; ``epsilon`` and ``delta`` bound per-part owner counts."""
+        width, depth = CountMinSketch.dimensions_for_error(epsilon, delta)
+        return cls(HyperLogLog.precision_for_error(relative_error), width, depth)
+
+
+@dataclass
+class UsageSketches:
+    """Approximate ownership statistics over all users.
+
+    ``part_owners`` counts the owners of each part id. ``users``,
+    ``shape_owners`` and ``colour_owners`` estimate the distinct users in
+    total and owning any part of each shape and colour. Users are identified
+    by their inventory id, the one id every inventory write knows.
+    """
+    settings: SketchSettings = field(default_factory=SketchSettings)
+    users: HyperLogLog | None = None
+    part_owners: CountMinSketch | None = None
+    shape_owners: dict[int, HyperLogLog] = field(default_factory=dict)
+    colour_owners: dict[int, HyperLogLog] = field(default_factory=dict)
+
+    def __post_init__(self):
+        if self.users is None:
+            self.users = HyperLogLog(self.settings.hll_precision)
+        if self.part_owners is None:
+            self.part_owners = CountMinSketch(self.settings.cms_width, self.settings.cms_depth)
+
+    def add_owner(self, owner_id: int, part: Part) -> None:
+        self.part_owners.add(part.id)
+        self.shape_owners.setdefault(part.shape.id, HyperLogLog(self.settings.hll_precision)).add(owner_id)
+        self.colour_owners.setdefault(part.colour.id, HyperLogLog(self.settings.hll_precision)).add(owner_id)
+
+    def add_inventories(self, inventories: Iterable[Inventory]) -> None:
+        for inventory in inventories:
+            self.users.add(inventory.id)
+            for item in inventory.parts:
+                if item.quantity > 0:
+                    self.add_owner(inventory.id, item.part)
+
+    def merge(self, other: "UsageSketches") -> None:
+        self.users.merge(other.users)
+        self.part_owners.merge(other.part_owners)
+        for mine, theirs in ((self.shape_owners, other.shape_owners), (self.colour_owners, other.colour_owners)):
+            for key, sketch in theirs.items():
+                mine.setdefault(key, HyperLogLog(self.settings.hll_precision)).merge(sketch)
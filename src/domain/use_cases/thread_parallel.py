@@ -0,0 +1,54 @@
+import sys
+import sysconfig
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from typing import TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Below this many items per worker the thread hand-off costs more than it saves.
+MIN_CHUNK_SIZE = 256
+
+
+def is_free_threaded_build() -> bool:
+    """True when the interpreter was compiled without the GIL (``python3.14t``)."""
+    return bool(sysconfig.get_config_var("Py_GIL_DISABLED"))
+
+
+def is_gil_disabled() -> bool:
+    """True when running on a free-threaded build with the GIL actually off.
+
+    A free-threaded interpreter can re-enable the GIL at runtime, e.g. when an
+    extension module that does not declare free-threading support is imported.
+    """
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_free_threaded_build() and is_gil_enabled is not None and not is_gil_enabled()
+
+
+def chunked(items: Sequence[T], number_of_chunks: int) -> list[Sequence[T]]:
+    chunk_size = -(-len(items) // number_of_chunks)
+    return [items[start:start + chunk_size] for start in range(0, len(items), chunk_size)]
+
+
+def parallel_map_chunks(
+    func: Callable[[Sequence[T]], list[R]],
+    items: Sequence[T],
+    max_workers: int,
+    min_chunk_size: int | None = None,
+) -> list[R]:
+    """Apply ``func`` to contiguous chunks of ``items`` and concatenate the results.
+
+    Chunks run on a thread pool only when the GIL is disabled; with the GIL on,
+    CPU-bound work gains nothing from threads, so the whole sequence is handed
+    to ``func`` in the calling thread. Result order always matches ``items``.
+    """
+    if min_chunk_size is None:
+        min_chunk_size = MIN_CHUNK_SIZE
+    number_of_chunks = min(max_workers, len(items) // min_chunk_size)
+    if number_of_chunks <= 1 or not is_gil_disabled():
+        return func(items)
+
+    with ThreadPoolExecutor(max_workers=number_of_chunks) as executor:
+        chunk_results = executor.map(func, chunked(items, number_of_chunks))
+        return [result for chunk_result in chunk_results for result in chunk_result]
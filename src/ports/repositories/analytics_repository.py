@@ -0,0 +1,29 @@
+from abc import ABC, abstractmethod
+
+
+class AnalyticsRepository(ABC):
+    """Aggregate questions over every user and set, answered in bulk.
+
+    Unlike ``BricksRepository`` nothing here returns domain entities: results
+    are plain id-keyed counts that a column store can compute without
+    materialising a single ``User``.
+    """
+
+    @abstractmethod
+    def count_users(self) -> int:
+        pass
+
+    @abstractmethod
+    def get_part_usage(self) -> dict[int, tuple[int, int]]:
+        """Map each owned part id to (number of owners, smallest owned quantity)."""
+        pass
+
+    @abstractmethod
+    def get_buildable_user_counts(self) -> dict[int, int]:
+        """Map every set id to the number of users whose inventory covers it."""
+        pass
+
+    @abstractmethod
+    def get_missing_part_demand(self, set_id: int) -> dict[int, int]:
+        """Map each part of ``set_id`` to the quantity missing, summed over all users."""
+        pass
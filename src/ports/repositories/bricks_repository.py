@@ -1,14 +1,20 @@
 from abc import ABC, abstractmethod
+from collections.abc import Iterable
 from typing import Any
 from src.domain.entities.set import Set
 from src.domain.entities.user import User
 from src.domain.entities.inventory import Inventory
 from src.domain.entities.part import Part
 from src.domain.entities.colour import Colour
+from src.domain.entities.change import Change
+from src.domain.entities.part_usage import PartUsage
+from src.domain.entities.set_demand import SetDemand
+from src.domain.use_cases.sketches import UsageSketches
 
 class BricksRepository(ABC):
     @abstractmethod
-    def get_all_sets(self) -> list[Set]:
+    def get_all_sets(self, offset: int = 0, limit: int | None = None) -> list[Set]:
+        """Sets ordered by id with their parts; ``offset`` and ``limit`` count sets, and no limit returns them all."""
         pass
 
     @abstractmethod
@@ -40,7 +46,8 @@ class BricksRepository(ABC):
         pass
     
     @abstractmethod
-    def get_all_users(self) -> list[User]:
+    def get_all_users(self, offset: int = 0, limit: int | None = None) -> list[User]:
+        """Users ordered by id with their inventories; ``offset`` and ``limit`` count users, and no limit returns them all."""
         pass
 
     @abstractmethod
@@ -48,5 +55,51 @@ class BricksRepository(ABC):
         pass
 
     @abstractmethod
-    def get_all_parts(self) -> list[Part]:
-        pass
\ No newline at end of file
+    def get_all_parts(self, offset: int = 0, limit: int | None = None) -> list[Part]:
+        """Parts ordered by id; no limit returns them all."""
+        pass
+
+    @abstractmethod
+    def get_parts_by_ids(self, part_ids: Iterable[int]) -> list[Part]:
+        """Parts with the given ids, ordered by id; unknown ids are left out."""
+        pass
+
+    @abstractmethod
+    def count_users(self) -> int:
+        pass
+
+    @abstractmethod
+    def apply_inventory_deltas(self, inventory_id: int, part_deltas: dict[int, int]) -> int:
+        """Add ``part_deltas`` (part id -> quantity change) to an inventory; returns its new version.
+
+        Raises ValueError if the inventory or one of the parts does not exist.
+        """
+        pass
+
+    @abstractmethod
+    def get_changes(self, since: int = 0, limit: int = 1000) -> list[Change]:
+        """Change log entries with a version above ``since``, oldest first.
+
+        Raises NotImplementedError for repositories that keep no change log.
+        """
+        pass
+
+    @abstractmethod
+    def get_pooled_inventory(self, user_ids: list[int]) -> dict[int, int]:
+        """Part id -> quantity summed over the inventories of ``user_ids``; unknown ids add nothing."""
+        pass
+
+    @abstractmethod
+    def get_set_demand(self, set_id: int) -> SetDemand | None:
+        """How many pieces of ``set_id`` every user misses, or None if the set does not exist."""
+        pass
+
+    @abstractmethod
+    def get_part_usage(self, min_owners: int = 1) -> list[PartUsage]:
+        """Usage statistics of every part owned by at least ``min_owners`` users, by part id."""
+        pass
+
+    @abstractmethod
+    def get_usage_sketches(self) -> UsageSketches:
+        """Approximate ownership statistics, kept up to date with every inventory."""
+        pass
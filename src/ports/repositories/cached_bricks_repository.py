@@ -0,0 +1,257 @@
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Iterable
+from typing import Any
+
+from src.domain.entities.colour import Colour
+from src.domain.entities.inventory import Inventory
+from src.domain.entities.part import Part
+from src.domain.entities.part_usage import PartUsage
+from src.domain.entities.set_demand import SetDemand
+from src.domain.use_cases.sketches import UsageSketches
+from src.domain.entities.set import Set, SetItem
+from src.domain.entities.user import User
+from src.ports.repositories.bricks_repository import BricksRepository
+from src.domain.entities.change import Change
+from src.ports.repositories.sql_change_log import ChangeLogPoller
+
+# (entity type, entity id); an id of None stands for "any entity of this type".
+Dependency = tuple[str, int | None]
+
+
+class RepositoryCache:
+    """Process-wide LRU of repository results, invalidated entity by entity.
+
+    Every entry records the entities it was built from. ``invalidate`` drops
+    the entries depending on one entity, plus those depending on its whole
+    type (listings), and leaves everything else cached. With a ``poller``,
+    changes committed by other processes are applied the same way.
+
+    Loads run outside the lock. A load overtaken by an invalidation of one of
+    its dependencies is returned but not stored, so it cannot outlive the
+    change. Every hit returns the stored value itself, shared with every
+    other caller, so values must be treated as read-only: none of the use
+    cases or routers changes what a repository read returns.
+    """
+
+    def __init__(self, max_entries: int = 10_000, poller: ChangeLogPoller | None = None):
+        self.max_entries = max_entries
+        self.poller = poller
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, tuple[Any, tuple[Dependency, ...]]] = OrderedDict()
+        self._dependents: dict[Dependency, set[Hashable]] = {}
+        # Generation of the last invalidation of each dependency, kept while loads are in flight.
+        self._generation = 0
+        self._invalidated_at: dict[Dependency, int] = {}
+        self._cleared_at = 0
+        self._loads_in_flight = 0
+        self._lock = threading.Lock()
+        if poller is not None:
+            poller.add_listener(self.apply_changes)
+
+    def get_or_load(self, key: Hashable, load: Callable[[], Any], dependencies: Callable[[Any], Iterable[Dependency]]) -> Any:
+        if self.poller is not None:
+            self.poller.poll()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                value = entry[0]
+            else:
+                self.misses += 1
+                started_at = self._generation
+                self._loads_in_flight += 1
+        if entry is not None:
+            return value
+        try:
+            value = load()
+            # Misses are not cached: the entity may be created by the next request.
+            if value is not None:
+                self._store(key, value, tuple(dependencies(value)), started_at)
+        finally:
+            with self._lock:
+                self._loads_in_flight -= 1
+                if not self._loads_in_flight:
+                    self._invalidated_at.clear()
+        return value
+
+    def _store(self, key: Hashable, value: Any, dependencies: tuple[Dependency, ...], started_at: int) -> None:
+        with self._lock:
+            if self._cleared_at > started_at or any(self._invalidated_at.get(dependency, 0) > started_at for dependency in dependencies):
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, dependencies)
+            for dependency in dependencies:
+                self._dependents.setdefault(dependency, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: Hashable) -> None:
+        _, dependencies = self._entries.pop(key)
+        for dependency in dependencies:
+            keys = self._dependents.get(dependency)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._dependents[dependency]
+
+    def invalidate(self, entity_type: str, entity_id: int | None) -> None:
+        with self._lock:
+            if self._loads_in_flight:
+                self._generation += 1
+                self._invalidated_at[(entity_type, entity_id)] = self._generation
+                self._invalidated_at[(entity_type, None)] = self._generation
+            keys = set(self._dependents.get((entity_type, entity_id), ()))
+            keys |= self._dependents.get((entity_type, None), set())
+            for key in keys:
+                self._remove(key)
+
+    def apply_changes(self, changes: list[Change]) -> None:
+        for change in changes:
+            self.invalidate(change.entity_type, change.entity_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._cleared_at = self._generation
+            self._entries.clear()
+            self._dependents.clear()
+
+    def stats(self) -> tuple[int, int]:
+        return self.hits, self.misses
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _set_dependencies(lego_set: Set) -> list[Dependency]:
+    return [("set", lego_set.id)]
+
+
+def _user_dependencies(user: User) -> list[Dependency]:
+    return [("user", user.id), ("inventory", user.inventory.id)]
+
+
+class CachedBricksRepository(BricksRepository):
+    """Serves reads from a ``RepositoryCache`` shared by every request of the process.
+
+    Writes go straight to ``repository`` and invalidate what they touched at
+    once, so the writing worker never reads its own change stale; other
+    workers catch up on their next change log poll.
+    """
+
+    def __init__(self, repository: BricksRepository, cache: RepositoryCache):
+        self.repository = repository
+        self.cache = cache
+
+    def get_all_sets(self, offset: int = 0, limit: int | None = None) -> list[Set]:
+        return self.cache.get_or_load(
+            ("all_sets", offset, limit),
+            lambda: self.repository.get_all_sets(offset=offset, limit=limit),
+            lambda sets: [("set", None)],
+        )
+
+    def get_parts_by_set_id(self, set_id: int) -> list[SetItem]:
+        return self.cache.get_or_load(("set_parts", set_id), lambda: self.repository.get_parts_by_set_id(set_id), lambda parts: [("set", set_id)])
+
+    def get_set_by_id(self, set_id: int) -> Set | None:
+        return self.cache.get_or_load(("set", set_id), lambda: self.repository.get_set_by_id(set_id), _set_dependencies)
+
+    def get_set_by_name(self, name: str) -> Set | None:
+        return self.cache.get_or_load(("set_name", name), lambda: self.repository.get_set_by_name(name), _set_dependencies)
+
+    def get_user_by_id(self, user_id: int) -> User | None:
+        return self.cache.get_or_load(("user", user_id), lambda: self.repository.get_user_by_id(user_id), _user_dependencies)
+
+    def get_user_by_name(self, name: str) -> User | None:
+        return self.cache.get_or_load(("user_name", name), lambda: self.repository.get_user_by_name(name), _user_dependencies)
+
+    def get_inventory_by_id(self, inventory_id: int) -> Inventory | None:
+        return self.cache.get_or_load(
+            ("inventory", inventory_id),
+            lambda: self.repository.get_inventory_by_id(inventory_id),
+            lambda inventory: [("inventory", inventory.id)],
+        )
+
+    def get_all_users(self, offset: int = 0, limit: int | None = None) -> list[User]:
+        # Every user with every inventory: too large and too volatile to keep.
+        return self.repository.get_all_users(offset=offset, limit=limit)
+
+    def get_all_colours(self) -> list[Colour]:
+        return self.cache.get_or_load("all_colours", self.repository.get_all_colours, lambda colours: [("colour", None)])
+
+    def get_all_parts(self, offset: int = 0, limit: int | None = None) -> list[Part]:
+        return self.cache.get_or_load(
+            ("all_parts", offset, limit),
+            lambda: self.repository.get_all_parts(offset=offset, limit=limit),
+            lambda parts: [("part", None)],
+        )
+
+    def get_parts_by_ids(self, part_ids: Iterable[int]) -> list[Part]:
+        part_ids = frozenset(part_ids)
+        return self.cache.get_or_load(("parts", part_ids), lambda: self.repository.get_parts_by_ids(part_ids), lambda parts: [("part", None)])
+
+    def count_users(self) -> int:
+        return self.cache.get_or_load("user_count", self.repository.count_users, lambda count: [("user", None)])
+
+    def get_changes(self, since: int = 0, limit: int = 1000) -> list[Change]:
+        # A tail of the log is read once per cursor: nothing to gain from caching it.
+        return self.repository.get_changes(since, limit)
+
+    def get_part_usage(self, min_owners: int = 1) -> list[PartUsage]:
+        return self.cache.get_or_load(
+            ("part_usage", min_owners),
+            lambda: self.repository.get_part_usage(min_owners),
+            lambda usage: [("inventory", None)],
+        )
+
+    def get_pooled_inventory(self, user_ids: list[int]) -> dict[int, int]:
+        return self.cache.get_or_load(
+            ("pooled_inventory", frozenset(user_ids)),
+            lambda: self.repository.get_pooled_inventory(user_ids),
+            lambda pooled: [("inventory", None), ("user", None)],
+        )
+
+    def get_set_demand(self, set_id: int) -> SetDemand | None:
+        # Kept until any inventory, user or this set changes.
+        return self.cache.get_or_load(
+            ("set_demand", set_id),
+            lambda: self.repository.get_set_demand(set_id),
+            lambda demand: [("set", set_id), ("inventory", None), ("user", None)],
+        )
+
+    def get_usage_sketches(self) -> UsageSketches:
+        return self.cache.get_or_load("usage_sketches", self.repository.get_usage_sketches, lambda sketches: [("inventory", None), ("user", None)])
+
+    def create_colour(self, colour: Colour) -> Colour:
+        created = self.repository.create_colour(colour)
+        self.cache.invalidate("colour", created.id)
+        return created
+
+    def create_user(self, user: User) -> User:
+        created = self.repository.create_user(user)
+        self.cache.invalidate("user", created.id)
+        self.cache.invalidate("inventory", created.inventory.id)
+        return created
+
+    def apply_inventory_deltas(self, inventory_id: int, part_deltas: dict[int, int]) -> int:
+        version = self.repository.apply_inventory_deltas(inventory_id, part_deltas)
+        self.cache.invalidate("inventory", inventory_id)
+        return version
+
+    def __getattr__(self, name: str) -> Any:
+        # create_shape, create_part, create_set and create_inventory of the SQL repository.
+        attribute = getattr(self.repository, name)
+        if not (callable(attribute) and name.startswith("create_")):
+            return attribute
+        entity_type = name.removeprefix("create_")
+
+        def create(*args, **kwargs):
+            created = attribute(*args, **kwargs)
+            self.cache.invalidate(entity_type, getattr(created, "id", None))
+            return created
+
+        return create
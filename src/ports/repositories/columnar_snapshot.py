@@ -0,0 +1,296 @@
+"""Compact columnar snapshot of the catalogue and inventories.
+
+The file is a small JSON header followed by raw little-endian arrays:
+
+* id arrays (``colour.ids``, ``set.ids``, ``user.inventory_ids``, ...),
+* link tables in CSR form: ``set.part_offsets`` holds, for set ``i``, the
+  slice ``[offsets[i], offsets[i + 1])`` of ``set.part_ids`` and
+  ``set.part_quantities``; inventories use the same layout,
+* string tables as an offsets array plus one UTF-8 blob,
+* the inverted catalogue index: for each part in ``index.part_ids``, the
+  sets needing it (``index.set_positions``) and how many (``index.quantities``).
+
+The header also carries a ``version`` stamp taken at export time.
+
+Rows are ordered by id so lookups can bisect the id arrays. ``ColumnarSnapshot``
+memory-maps the file and exposes every array as a zero-copy ``memoryview``,
+so opening a snapshot costs the same at any size.
+"""
+import itertools
+import json
+import mmap
+import struct
+import sys
+import time
+from array import array
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+
+from sqlalchemy import Connection
+
+from src.ports.repositories.sql_brick_repository_schema import (
+    Colour,
+    Shape,
+    SetPartLink,
+    InventoryPartLink,
+    Part,
+    Set,
+    User,
+    Inventory,
+)
+
+MAGIC = b"LEGOSNAP"
+FORMAT_VERSION = 1
+ALIGNMENT = 8
+# magic, format version, header length
+_PREAMBLE = struct.Struct("<8sII")
+ID_TYPECODE = "i"
+OFFSET_TYPECODE = "q"
+
+
+@dataclass
+class SnapshotSummary:
+    colours: int
+    shapes: int
+    parts: int
+    sets: int
+    inventories: int
+    users: int
+    bytes: int
+    version: int
+
+
+class StringTable:
+    """Read-only sequence of the strings stored in a snapshot."""
+
+    def __init__(self, offsets: memoryview, data: memoryview):
+        self.offsets = offsets
+        self.data = data
+        self._positions: dict[str, int] | None = None
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        return str(self.data[self.offsets[index]:self.offsets[index + 1]], "utf-8")
+
+    def position_of(self, value: str) -> int | None:
+        # Built on first use: most callers only ever read by position.
+        if self._positions is None:
+            self._positions = {}
+            for index in range(len(self)):
+                self._positions.setdefault(self[index], index)
+        return self._positions.get(value)
+
+
+class _SnapshotWriter:
+    def __init__(self, metadata: dict):
+        self.metadata = metadata
+        self.sections: dict[str, array] = {}
+
+    def add_array(self, name: str, typecode: str, values: Iterable[int]) -> None:
+        self.sections[name] = values if isinstance(values, array) else array(typecode, values)
+
+    def add_strings(self, name: str, values: Iterable[str]) -> None:
+        encoded = [value.encode("utf-8") for value in values]
+        self.add_array(f"{name}.offsets", OFFSET_TYPECODE, itertools.accumulate((len(value) for value in encoded), initial=0))
+        self.add_array(f"{name}.data", "B", b"".join(encoded))
+
+    def write(self, path: Path) -> int:
+        # Section offsets are relative to the first aligned byte after the header.
+        layout = {}
+        position = 0
+        for name, values in self.sections.items():
+            layout[name] = {"typecode": values.typecode, "itemsize": values.itemsize, "length": len(values), "offset": position}
+            position += _aligned(len(values) * values.itemsize)
+        header = json.dumps({"byteorder": "little", "metadata": self.metadata, "sections": layout}).encode("utf-8")
+        data_start = _aligned(_PREAMBLE.size + len(header))
+
+        partial_path = path.with_name(path.name + ".tmp")
+        with open(partial_path, "wb") as file:
+            file.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header)))
+            file.write(header)
+            for name, values in self.sections.items():
+                file.write(b"\0" * (data_start + layout[name]["offset"] - file.tell()))
+                if sys.byteorder != "little":
+                    values = array(values.typecode, values)
+                    values.byteswap()
+                values.tofile(file)
+            size = file.tell()
+        # Readers that already mapped the old file keep their view of it.
+        partial_path.replace(path)
+        return size
+
+
+def _aligned(size: int) -> int:
+    return (size + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _csr(owner_ids: array, links: Iterable[tuple[int, int, int]]) -> tuple[array, array, array]:
+    """Pack (owner_id, part_id, quantity) rows, sorted by owner id, into CSR arrays."""
+    position = {owner_id: index for index, owner_id in enumerate(owner_ids)}
+    counts = [0] * len(owner_ids)
+    part_ids = array(ID_TYPECODE)
+    quantities = array(ID_TYPECODE)
+    for owner_id, part_id, quantity in links:
+        counts[position[owner_id]] += 1
+        part_ids.append(part_id)
+        quantities.append(quantity)
+    offsets = array(OFFSET_TYPECODE, itertools.accumulate(counts, initial=0))
+    return offsets, part_ids, quantities
+
+
+def _inverted_index(set_offsets: array, set_part_ids: array, set_quantities: array) -> tuple[array, array, array, array]:
+    postings: dict[int, list[tuple[int, int]]] = {}
+    for set_position in range(len(set_offsets) - 1):
+        for link in range(set_offsets[set_position], set_offsets[set_position + 1]):
+            postings.setdefault(set_part_ids[link], []).append((set_position, set_quantities[link]))
+
+    part_ids = array(ID_TYPECODE, sorted(postings))
+    offsets = array(OFFSET_TYPECODE, itertools.accumulate((len(postings[part_id]) for part_id in part_ids), initial=0))
+    set_positions = array(ID_TYPECODE)
+    quantities = array(ID_TYPECODE)
+    for part_id in part_ids:
+        for set_position, quantity in postings[part_id]:
+            set_positions.append(set_position)
+            quantities.append(quantity)
+    return part_ids, offsets, set_positions, quantities
+
+
+def export_snapshot(connection: Connection, path: str | Path, include_inventories: bool = True, version: int | None = None) -> SnapshotSummary:
+    """Write every colour, shape, part and set, plus inventories and users unless excluded, to ``path``.
+
+    ``version`` defaults to the export time in nanoseconds, so later exports
+    always carry a larger stamp.
+    """
+    version = time.time_ns() if version is None else version
+    writer = _SnapshotWriter({"version": version, "includes_inventories": include_inventories})
+
+    def rows(statement: str) -> list[tuple]:
+        return connection.exec_driver_sql(statement).fetchall()
+
+    for prefix, model in (("colour", Colour), ("shape", Shape)):
+        entries = rows(f'SELECT id, name FROM "{model.__tablename__}" ORDER BY id')
+        writer.add_array(f"{prefix}.ids", ID_TYPECODE, (entry[0] for entry in entries))
+        writer.add_strings(f"{prefix}.names", (entry[1] for entry in entries))
+
+    parts = rows(f'SELECT id, name, colour_id, shape_id FROM "{Part.__tablename__}" ORDER BY id')
+    writer.add_array("part.ids", ID_TYPECODE, (part[0] for part in parts))
+    writer.add_strings("part.names", (part[1] for part in parts))
+    writer.add_array("part.colour_ids", ID_TYPECODE, (part[2] for part in parts))
+    writer.add_array("part.shape_ids", ID_TYPECODE, (part[3] for part in parts))
+
+    sets = rows(f'SELECT id, name FROM "{Set.__tablename__}" ORDER BY id')
+    set_ids = array(ID_TYPECODE, (entry[0] for entry in sets))
+    writer.add_array("set.ids", ID_TYPECODE, set_ids)
+    writer.add_strings("set.names", (entry[1] for entry in sets))
+    set_links = connection.exec_driver_sql(
+        f'SELECT set_id, part_id, quantity FROM "{SetPartLink.__tablename__}" ORDER BY set_id, part_id'
+    )
+    offsets, part_ids, quantities = _csr(set_ids, set_links)
+    writer.add_array("set.part_offsets", OFFSET_TYPECODE, offsets)
+    writer.add_array("set.part_ids", ID_TYPECODE, part_ids)
+    writer.add_array("set.part_quantities", ID_TYPECODE, quantities)
+    writer.add_array("set.part_counts", ID_TYPECODE, (offsets[index + 1] - offsets[index] for index in range(len(set_ids))))
+
+    index_part_ids, index_offsets, index_set_positions, index_quantities = _inverted_index(offsets, part_ids, quantities)
+    writer.add_array("index.part_ids", ID_TYPECODE, index_part_ids)
+    writer.add_array("index.offsets", OFFSET_TYPECODE, index_offsets)
+    writer.add_array("index.set_positions", ID_TYPECODE, index_set_positions)
+    writer.add_array("index.quantities", ID_TYPECODE, index_quantities)
+
+    inventories = users = 0
+    if include_inventories:
+        inventories, users = _add_inventories(writer, connection)
+
+    size = writer.write(Path(path))
+    return SnapshotSummary(
+        colours=len(writer.sections["colour.ids"]),
+        shapes=len(writer.sections["shape.ids"]),
+        parts=len(parts),
+        sets=len(sets),
+        inventories=inventories,
+        users=users,
+        bytes=size,
+        version=version,
+    )
+
+
+def _add_inventories(writer: _SnapshotWriter, connection: Connection) -> tuple[int, int]:
+    inventory_ids = array(ID_TYPECODE, (entry[0] for entry in connection.exec_driver_sql(f'SELECT id FROM "{Inventory.__tablename__}" ORDER BY id')))
+    writer.add_array("inventory.ids", ID_TYPECODE, inventory_ids)
+    inventory_links = connection.exec_driver_sql(
+        f'SELECT inventory_id, part_id, quantity FROM "{InventoryPartLink.__tablename__}" ORDER BY inventory_id, part_id'
+    )
+    offsets, part_ids, quantities = _csr(inventory_ids, inventory_links)
+    writer.add_array("inventory.part_offsets", OFFSET_TYPECODE, offsets)
+    writer.add_array("inventory.part_ids", ID_TYPECODE, part_ids)
+    writer.add_array("inventory.part_quantities", ID_TYPECODE, quantities)
+
+    users = connection.exec_driver_sql(f'SELECT id, name, inventory_id FROM "{User.__tablename__}" ORDER BY id').fetchall()
+    writer.add_array("user.ids", ID_TYPECODE, (user[0] for user in users))
+    writer.add_strings("user.names", (user[1] for user in users))
+    writer.add_array("user.inventory_ids", ID_TYPECODE, (user[2] for user in users))
+    return len(inventory_ids), len(users)
+
+
+class ColumnarSnapshot:
+    """A memory-mapped snapshot written by ``export_snapshot``."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._views = self._map_sections()
+        except Exception:
+            self._mmap.close()
+            raise
+
+    def _map_sections(self) -> dict[str, memoryview]:
+        if len(self._mmap) < _PREAMBLE.size:
+            raise ValueError(f"{self.path} is not a LEGO snapshot")
+        magic, version, header_length = _PREAMBLE.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a LEGO snapshot")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"{self.path} has snapshot format {version}, expected {FORMAT_VERSION}")
+        header = json.loads(self._mmap[_PREAMBLE.size:_PREAMBLE.size + header_length])
+        if header["byteorder"] != sys.byteorder:
+            raise ValueError(f"{self.path} was written on a {header['byteorder']}-endian machine")
+        self.metadata = header["metadata"]
+
+        data_start = _aligned(_PREAMBLE.size + header_length)
+        buffer = memoryview(self._mmap)
+        views = {}
+        for name, section in header["sections"].items():
+            if array(section["typecode"]).itemsize != section["itemsize"]:
+                raise ValueError(f"{self.path} section {name} uses an item size this platform does not have")
+            start = data_start + section["offset"]
+            views[name] = buffer[start:start + section["length"] * section["itemsize"]].cast(section["typecode"])
+        buffer.release()
+        return views
+
+    @property
+    def version(self) -> int:
+        return self.metadata["version"]
+
+    def array(self, name: str) -> memoryview:
+        return self._views[name]
+
+    def strings(self, name: str) -> StringTable:
+        return StringTable(self._views[f"{name}.offsets"], self._views[f"{name}.data"])
+
+    def close(self) -> None:
+        # Every view into the map has to be released before it can be closed.
+        for view in self._views.values():
+            view.release()
+        self._views = {}
+        self._mmap.close()
+
+    def __enter__(self) -> "ColumnarSnapshot":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,133 @@
+"""DuckDB implementation of ``AnalyticsRepository``.
+
+DuckDB runs embedded in the process and scans the link tables column by
+column, so the aggregates below stay in the millisecond range over millions
+of inventory rows. It reads either the live SQLite file (through DuckDB's
+``sqlite`` extension) or a Parquet export of it made with ``export_parquet``.
+
+``duckdb`` is an optional dependency (``uv sync --extra analytics``); only
+import this module when analytics are enabled.
+"""
+import threading
+from pathlib import Path
+
+import duckdb
+
+from src.ports.repositories.analytics_repository import AnalyticsRepository
+
+TABLES = ("user", "inventorypartlink", "set", "setpartlink")
+
+PART_USAGE_QUERY = """
+    SELECT i.part_id, count(*) AS owners, min(i.quantity) AS min_quantity
+    FROM inventorypartlink i
+    JOIN "user" u ON u.inventory_id = i.inventory_id
+    WHERE i.quantity > 0
+    GROUP BY i.part_id
+"""
+
+BUILDABLE_USER_COUNTS_QUERY = """
+    WITH set_sizes AS (
+        SELECT s.id AS set_id, count(r.part_id) AS parts
+        FROM "set" s
+        LEFT JOIN setpartlink r ON r.set_id = s.id AND r.quantity > 0
+        GROUP BY s.id
+    ),
+    covered AS (
+        SELECT r.set_id, u.id AS user_id, count(*) AS parts
+        FROM setpartlink r
+        JOIN inventorypartlink i ON i.part_id = r.part_id AND i.quantity >= r.quantity
+        JOIN "user" u ON u.inventory_id = i.inventory_id
+        WHERE r.quantity > 0
+        GROUP BY r.set_id, u.id
+    )
+    SELECT s.set_id,
+           CASE WHEN s.parts = 0 THEN (SELECT count(*) FROM "user") ELSE count(c.user_id) END AS users
+    FROM set_sizes s
+    LEFT JOIN covered c ON c.set_id = s.set_id AND c.parts = s.parts
+    GROUP BY s.set_id, s.parts
+"""
+
+MISSING_PART_DEMAND_QUERY = """
+    SELECT r.part_id, sum(r.quantity - coalesce(i.quantity, 0)) AS missing
+    FROM "user" u
+    CROSS JOIN (SELECT part_id, quantity FROM setpartlink WHERE set_id = $set_id) r
+    LEFT JOIN inventorypartlink i ON i.inventory_id = u.inventory_id AND i.part_id = r.part_id
+    WHERE coalesce(i.quantity, 0) < r.quantity
+    GROUP BY r.part_id
+"""
+
+
+def _sql_path(path: Path) -> str:
+    return "'" + path.as_posix().replace("'", "''") + "'"
+
+
+class DuckDBAnalyticsRepository(AnalyticsRepository):
+    def __init__(self, connection: duckdb.DuckDBPyConnection):
+        # The connection must expose the tables in TABLES, e.g. as views.
+        self.connection = connection
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_sqlite(cls, database_path: str | Path) -> "DuckDBAnalyticsRepository":
+        """Query the SQLite database in place; needs DuckDB's ``sqlite`` extension."""
+        connection = duckdb.connect()
+        connection.execute("ATTACH ? AS lego (TYPE sqlite, READ_ONLY)", [str(database_path)])
+        for table in TABLES:
+            connection.execute(f'CREATE VIEW "{table}" AS SELECT * FROM lego."{table}"')
+        return cls(connection)
+
+    @classmethod
+    def from_parquet(cls, directory: str | Path) -> "DuckDBAnalyticsRepository":
+        """Query a Parquet export written by ``export_parquet``."""
+        connection = duckdb.connect()
+        for table in TABLES:
+            path = Path(directory) / f"{table}.parquet"
+            if not path.exists():
+                raise ValueError(f"Analytics export is missing {path}")
+            connection.execute(f'CREATE VIEW "{table}" AS SELECT * FROM read_parquet({_sql_path(path)})')
+        return cls(connection)
+
+    def _fetch(self, query: str, parameters: dict | None = None) -> list[tuple]:
+        # A DuckDB connection must not be shared between threads; each query
+        # runs on its own cursor, which reuses the connection's database.
+        with self._lock:
+            cursor = self.connection.cursor()
+        try:
+            return cursor.execute(query, parameters or {}).fetchall()
+        finally:
+            cursor.close()
+
+    def count_users(self) -> int:
+        return self._fetch('SELECT count(*) FROM "user"')[0][0]
+
+    def get_part_usage(self) -> dict[int, tuple[int, int]]:
+        return {part_id: (owners, min_quantity) for part_id, owners, min_quantity in self._fetch(PART_USAGE_QUERY)}
+
+    def get_buildable_user_counts(self) -> dict[int, int]:
+        return dict(self._fetch(BUILDABLE_USER_COUNTS_QUERY))
+
+    def get_missing_part_demand(self, set_id: int) -> dict[int, int]:
+        return dict(self._fetch(MISSING_PART_DEMAND_QUERY, {"set_id": set_id}))
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+def export_parquet(database_path: str | Path, directory: str | Path) -> list[Path]:
+    """Write the tables used by the analytics queries to ``directory`` as Parquet files."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    connection = duckdb.connect()
+    try:
+        connection.execute("ATTACH ? AS lego (TYPE sqlite, READ_ONLY)", [str(database_path)])
+        written = []
+        for table in TABLES:
+            path = directory / f"{table}.parquet"
+            # Write next to the target and rename, so readers never see a partial file.
+            partial_path = path.with_suffix(".parquet.tmp")
+            connection.execute(f'COPY lego."{table}" TO {_sql_path(partial_path)} (FORMAT parquet)')
+            partial_path.replace(path)
+            written.append(path)
+        return written
+    finally:
+        connection.close()
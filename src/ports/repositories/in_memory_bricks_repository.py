@@ -1,17 +1,34 @@
+from collections import Counter
+from collections.abc import Iterable
+
+from src.domain.entities.change import Change
 from src.domain.entities.set import Set
 from src.domain.entities.user import User
 from src.domain.entities.colour import Colour
 from src.domain.entities.part import Part
-from src.domain.entities.inventory import Inventory
+from src.domain.entities.inventory import Inventory, InventoryItem
 from src.domain.entities.set import SetItem
+from src.domain.entities.part_usage import PartUsage, summarise_part_usage
+from src.domain.entities.set_demand import SetDemand, summarise_set_demand
+from src.domain.use_cases.sketches import UsageSketches
 from src.ports.repositories.bricks_repository import BricksRepository
 
 class InMemoryBricksRepository(BricksRepository):
     sets: list[Set]
     users: list[User]
+    parts: list[Part]
+    changes: list[Change]
+
+    def __init__(self):
+        self.changes = []
 
-    def get_all_sets(self) -> list[Set]:
-        return self.sets
+    def _log_change(self, entity_type: str, entity_id: int, part_deltas: dict[int, int] | None = None) -> int:
+        change = Change(version=len(self.changes) + 1, entity_type=entity_type, entity_id=entity_id, part_deltas=dict(part_deltas or {}))
+        self.changes.append(change)
+        return change.version
+
+    def get_all_sets(self, offset: int = 0, limit: int | None = None) -> list[Set]:
+        return self.sets[offset:None if limit is None else offset + limit]
     
     def get_parts_by_set_id(self, set_id: int) -> list[SetItem]:
         lego_set = next((s for s in self.sets if s.id == set_id), None)
@@ -28,6 +45,11 @@ class InMemoryBricksRepository(BricksRepository):
 
     def create_user(self, user: User) -> User:
         self.users.append(user)
+        part_deltas = Counter()
+        for item in user.inventory.parts:
+            part_deltas[item.part.id] += item.quantity
+        user.inventory.version = self._log_change("inventory", user.inventory.id, part_deltas)
+        self._log_change("user", user.id)
         return user
     
     def get_user_by_id(self, user_id: int) -> User:
@@ -36,15 +58,71 @@ class InMemoryBricksRepository(BricksRepository):
     def get_user_by_name(self, name: str) -> User:
         return next((u for u in self.users if u.name == name), None)
     
-    def get_all_users(self) -> list[User]:
-        return self.users
+    def get_all_users(self, offset: int = 0, limit: int | None = None) -> list[User]:
+        return self.users[offset:None if limit is None else offset + limit]
     
     def get_all_colours(self) -> list[Colour]:
         pass
 
-    def get_all_parts(self) -> list[Part]:
-        pass
+    def get_all_parts(self, offset: int = 0, limit: int | None = None) -> list[Part]:
+        return self.parts[offset:None if limit is None else offset + limit]
+
+    def get_parts_by_ids(self, part_ids: Iterable[int]) -> list[Part]:
+        part_ids = set(part_ids)
+        return sorted((part for part in self.parts if part.id in part_ids), key=lambda part: part.id)
 
     def get_inventory_by_id(self, inventory_id: int) -> Inventory:
-        return
-    
+        return next((u.inventory for u in self.users if u.inventory.id == inventory_id), None)
+
+    def count_users(self) -> int:
+        return len(self.users)
+
+    def apply_inventory_deltas(self, inventory_id: int, part_deltas: dict[int, int]) -> int:
+        inventory = next((u.inventory for u in self.users if u.inventory.id == inventory_id), None)
+        if inventory is None:
+            raise ValueError(f"Inventory with id {inventory_id} does not exist")
+        parts = {p.id: p for p in self.parts}
+        for part_id in part_deltas:
+            if part_id not in parts:
+                raise ValueError(f"Part with id {part_id} does not exist")
+        quantities = Counter()
+        for item in inventory.parts:
+            quantities[item.part.id] += item.quantity
+        applied = {}
+        for part_id, delta in part_deltas.items():
+            held = max(quantities[part_id], 0)
+            if max(held + delta, 0) != held:
+                applied[part_id] = max(held + delta, 0) - held
+        quantities.update(applied)
+        inventory.parts = [
+            InventoryItem(part=parts[part_id], quantity=quantity) for part_id, quantity in quantities.items() if quantity > 0
+        ]
+        inventory.version = self._log_change("inventory", inventory_id, applied)
+        return inventory.version
+
+    def get_changes(self, since: int = 0, limit: int = 1000) -> list[Change]:
+        # Versions are positions in the list, starting at 1.
+        return self.changes[since:since + limit]
+
+    def get_pooled_inventory(self, user_ids: list[int]) -> dict[int, int]:
+        members = set(user_ids)
+        pooled = Counter()
+        for user in self.users:
+            if user.id in members:
+                pooled.update(user.inventory.quantities())
+        return dict(pooled)
+
+    def get_set_demand(self, set_id: int) -> SetDemand | None:
+        target_set = self.get_set_by_id(set_id)
+        if target_set is None:
+            return None
+        return summarise_set_demand(target_set, (user.inventory for user in self.users))
+
+    def get_part_usage(self, min_owners: int = 1) -> list[PartUsage]:
+        usage = summarise_part_usage(user.inventory for user in self.users)
+        return [usage[part_id] for part_id in sorted(usage) if usage[part_id].owner_count >= min_owners]
+
+    def get_usage_sketches(self) -> UsageSketches:
+        sketches = UsageSketches()
+        sketches.add_inventories(user.inventory for user in self.users)
+        return sketches
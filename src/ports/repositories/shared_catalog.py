@@ -0,0 +1,156 @@
+"""Catalogue index served from a memory-mapped snapshot shared by all workers.
+
+Every uvicorn worker maps the same read-only file, so the operating system
+keeps one copy of the catalogue and its inverted index in the page cache no
+matter how many workers run. A rebuild writes a new file and renames it over
+the old one; workers notice the new version stamp and remap.
+
+    python -m src.scripts.export_columnar_snapshot --catalog-only --output catalog.snapshot
+"""
+import bisect
+import logging
+import os
+import threading
+import time
+from collections.abc import Iterator, Mapping, Sequence
+from pathlib import Path
+
+from src.domain.entities.set import Set
+from src.domain.use_cases.catalog_index import CatalogIndex, order_by_total
+from src.ports.repositories.columnar_snapshot import ColumnarSnapshot
+from src.ports.repositories.snapshot_bricks_repository import SnapshotBricksRepository
+
+logger = logging.getLogger("lego.shared_catalog")
+
+
+class _MappedSets(Sequence[Set]):
+    def __init__(self, repository: SnapshotBricksRepository, count: int):
+        self.repository = repository
+        self.count = count
+        # Only sets that were part of an answer are ever built, once per worker.
+        self._built: dict[int, Set] = {}
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index: int) -> Set:
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        lego_set = self._built.get(index)
+        if lego_set is None:
+            lego_set = self._built.setdefault(index, self.repository._set_at(index))
+        return lego_set
+
+
+class _MappedRequirements(Sequence[tuple[tuple[int, int], ...]]):
+    def __init__(self, snapshot: ColumnarSnapshot):
+        self.offsets = snapshot.array("set.part_offsets")
+        self.part_ids = snapshot.array("set.part_ids")
+        self.quantities = snapshot.array("set.part_quantities")
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> tuple[tuple[int, int], ...]:
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return tuple(
+            (part_id, quantity) for part_id, quantity in zip(self.part_ids[start:end], self.quantities[start:end]) if quantity > 0
+        )
+
+
+class _MappedPostings(Mapping[int, Iterator[tuple[int, int]]]):
+    """Part id -> (set position, required quantity) pairs, read straight from the map."""
+
+    def __init__(self, snapshot: ColumnarSnapshot):
+        self.part_ids = snapshot.array("index.part_ids")
+        self.offsets = snapshot.array("index.offsets")
+        self.set_positions = snapshot.array("index.set_positions")
+        self.quantities = snapshot.array("index.quantities")
+
+    def __getitem__(self, part_id: int) -> Iterator[tuple[int, int]]:
+        index = bisect.bisect_left(self.part_ids, part_id)
+        if index == len(self.part_ids) or self.part_ids[index] != part_id:
+            raise KeyError(part_id)
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return ((set_position, quantity) for set_position, quantity in zip(self.set_positions[start:end], self.quantities[start:end]) if quantity > 0)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.part_ids)
+
+    def __len__(self) -> int:
+        return len(self.part_ids)
+
+
+def _requirement_counts_and_totals(snapshot: ColumnarSnapshot) -> tuple[tuple[int, ...], tuple[int, ...]]:
+    # Totals are not stored in the snapshot, and stored counts include parts
+    # listed with no quantity; one pass per mapping keeps older files readable.
+    offsets, quantities = snapshot.array("set.part_offsets"), snapshot.array("set.part_quantities")
+    required = [[quantity for quantity in quantities[offsets[index]:offsets[index + 1]] if quantity > 0] for index in range(len(offsets) - 1)]
+    return tuple(len(set_quantities) for set_quantities in required), tuple(sum(set_quantities) for set_quantities in required)
+
+
+def mapped_catalog_index(snapshot: ColumnarSnapshot) -> CatalogIndex:
+    """A ``CatalogIndex`` whose containers are views of ``snapshot``, plus per-set counts, piece totals and their order."""
+    requirement_counts, requirement_totals = _requirement_counts_and_totals(snapshot)
+    return CatalogIndex(
+        sets=_MappedSets(SnapshotBricksRepository(snapshot), len(snapshot.array("set.ids"))),
+        requirements=_MappedRequirements(snapshot),
+        sets_by_part=_MappedPostings(snapshot),
+        requirement_counts=requirement_counts,
+        requirement_totals=requirement_totals,
+        sets_by_total=order_by_total(requirement_totals),
+    )
+
+
+class SharedCatalog:
+    """Hands out the catalogue index of ``path``, remapping it when the file is replaced.
+
+    The file is checked at most once every ``check_interval_seconds`` with a
+    single ``stat``; the previous mapping stays valid for callers still
+    holding it and is unmapped once they let go of it. If the file goes
+    missing, the last mapping keeps being served; without one, ``current``
+    raises FileNotFoundError.
+    """
+
+    def __init__(self, path: str | Path, check_interval_seconds: float = 5.0):
+        self.path = Path(path)
+        self.check_interval_seconds = check_interval_seconds
+        self.version: int | None = None
+        self._index: CatalogIndex | None = None
+        self._file_stamp: tuple[int, int, int] | None = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def current(self) -> CatalogIndex:
+        if self._index is None or time.monotonic() - self._checked_at >= self.check_interval_seconds:
+            with self._lock:
+                if self._index is None or time.monotonic() - self._checked_at >= self.check_interval_seconds:
+                    self._refresh()
+        return self._index
+
+    def _refresh(self) -> None:
+        self._checked_at = time.monotonic()
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            if self._index is None:
+                raise FileNotFoundError(
+                    f"Shared catalogue snapshot {self.path} does not exist; export it with "
+                    f"src.scripts.export_columnar_snapshot --catalog-only or unset LEGO_SHARED_CATALOG"
+                ) from None
+            if self._file_stamp is not None:
+                logger.warning("Shared catalogue snapshot %s is missing; serving version %s", self.path, self.version)
+                self._file_stamp = None
+            return
+        file_stamp = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if file_stamp == self._file_stamp:
+            return
+        snapshot = ColumnarSnapshot(self.path)
+        if self.version is not None and snapshot.version <= self.version:
+            # Touched or copied back without a rebuild: keep the current mapping.
+            snapshot.close()
+            self._file_stamp = file_stamp
+            return
+        self._index = mapped_catalog_index(snapshot)
+        self.version = snapshot.version
+        self._file_stamp = file_stamp
@@ -0,0 +1,168 @@
+import bisect
+from collections import Counter
+from collections.abc import Iterable
+
+from src.domain.entities.change import Change
+from src.domain.entities.colour import Colour
+from src.domain.entities.inventory import Inventory, InventoryItem
+from src.domain.entities.part import Part
+from src.domain.entities.part_usage import PartUsage, summarise_part_usage
+from src.domain.entities.set_demand import SetDemand, summarise_set_demand
+from src.domain.use_cases.sketches import UsageSketches
+from src.domain.entities.set import Set, SetItem
+from src.domain.entities.shape import Shape
+from src.domain.entities.user import User
+from src.ports.repositories.bricks_repository import BricksRepository
+from src.ports.repositories.columnar_snapshot import ColumnarSnapshot
+
+
+def _position(ids: memoryview, entity_id: int) -> int | None:
+    index = bisect.bisect_left(ids, entity_id)
+    return index if index < len(ids) and ids[index] == entity_id else None
+
+
+class SnapshotBricksRepository(BricksRepository):
+    """Read-only repository over a memory-mapped ``ColumnarSnapshot``.
+
+    Nothing is loaded up front: domain objects are built from the mapped
+    arrays when a method asks for them, so a worker can start serving from a
+    snapshot of any size straight away. The ``create_*`` methods raise.
+    """
+
+    def __init__(self, snapshot: ColumnarSnapshot):
+        self.snapshot = snapshot
+        self._parts: dict[int, Part] | None = None
+
+    def _parts_by_id(self) -> dict[int, Part]:
+        if self._parts is None:
+            colours = {colour.id: colour for colour in self.get_all_colours()}
+            shapes = {shape.id: shape for shape in self._get_all_shapes()}
+            ids = self.snapshot.array("part.ids")
+            names = self.snapshot.strings("part.names")
+            colour_ids = self.snapshot.array("part.colour_ids")
+            shape_ids = self.snapshot.array("part.shape_ids")
+            self._parts = {
+                ids[index]: Part(id=ids[index], name=names[index], colour=colours[colour_ids[index]], shape=shapes[shape_ids[index]])
+                for index in range(len(ids))
+            }
+        return self._parts
+
+    def _get_all_shapes(self) -> list[Shape]:
+        ids = self.snapshot.array("shape.ids")
+        names = self.snapshot.strings("shape.names")
+        return [Shape(id=ids[index], name=names[index]) for index in range(len(ids))]
+
+    def _links(self, prefix: str, index: int) -> list[tuple[Part, int]]:
+        offsets = self.snapshot.array(f"{prefix}.part_offsets")
+        part_ids = self.snapshot.array(f"{prefix}.part_ids")
+        quantities = self.snapshot.array(f"{prefix}.part_quantities")
+        parts = self._parts_by_id()
+        return [(parts[part_ids[link]], quantities[link]) for link in range(offsets[index], offsets[index + 1])]
+
+    def _set_at(self, index: int) -> Set:
+        return Set(
+            id=self.snapshot.array("set.ids")[index],
+            name=self.snapshot.strings("set.names")[index],
+            parts=[SetItem(part=part, quantity=quantity) for part, quantity in self._links("set", index)],
+        )
+
+    def _inventory_at(self, index: int) -> Inventory:
+        return Inventory(
+            id=self.snapshot.array("inventory.ids")[index],
+            parts=[InventoryItem(part=part, quantity=quantity) for part, quantity in self._links("inventory", index)],
+        )
+
+    def _user_at(self, index: int) -> User:
+        inventory_id = self.snapshot.array("user.inventory_ids")[index]
+        inventory = self.get_inventory_by_id(inventory_id) or Inventory(id=inventory_id)
+        return User(id=self.snapshot.array("user.ids")[index], name=self.snapshot.strings("user.names")[index], inventory=inventory)
+
+    def get_all_sets(self, offset: int = 0, limit: int | None = None) -> list[Set]:
+        indices = range(len(self.snapshot.array("set.ids")))[offset:None if limit is None else offset + limit]
+        return [self._set_at(index) for index in indices]
+
+    def get_parts_by_set_id(self, set_id: int) -> list[SetItem]:
+        lego_set = self.get_set_by_id(set_id)
+        return lego_set.parts if lego_set else []
+
+    def get_set_by_id(self, set_id: int) -> Set | None:
+        index = _position(self.snapshot.array("set.ids"), set_id)
+        return self._set_at(index) if index is not None else None
+
+    def get_set_by_name(self, name: str) -> Set | None:
+        index = self.snapshot.strings("set.names").position_of(name)
+        return self._set_at(index) if index is not None else None
+
+    def get_inventory_by_id(self, inventory_id: int) -> Inventory | None:
+        index = _position(self.snapshot.array("inventory.ids"), inventory_id)
+        return self._inventory_at(index) if index is not None else None
+
+    def get_user_by_id(self, user_id: int) -> User | None:
+        index = _position(self.snapshot.array("user.ids"), user_id)
+        return self._user_at(index) if index is not None else None
+
+    def get_user_by_name(self, name: str) -> User | None:
+        index = self.snapshot.strings("user.names").position_of(name)
+        return self._user_at(index) if index is not None else None
+
+    def get_all_users(self, offset: int = 0, limit: int | None = None) -> list[User]:
+        indices = range(len(self.snapshot.array("user.ids")))[offset:None if limit is None else offset + limit]
+        return [self._user_at(index) for index in indices]
+
+    def get_all_colours(self) -> list[Colour]:
+        ids = self.snapshot.array("colour.ids")
+        names = self.snapshot.strings("colour.names")
+        return [Colour(id=ids[index], name=names[index]) for index in range(len(ids))]
+
+    def get_all_parts(self, offset: int = 0, limit: int | None = None) -> list[Part]:
+        return list(self._parts_by_id().values())[offset:None if limit is None else offset + limit]
+
+    def get_parts_by_ids(self, part_ids: Iterable[int]) -> list[Part]:
+        parts = self._parts_by_id()
+        return [parts[part_id] for part_id in sorted(set(part_ids)) if part_id in parts]
+
+    def count_users(self) -> int:
+        return len(self.snapshot.array("user.ids"))
+
+    def get_changes(self, since: int = 0, limit: int = 1000) -> list[Change]:
+        raise NotImplementedError("Snapshots keep no change log")
+
+    def get_pooled_inventory(self, user_ids: list[int]) -> dict[int, int]:
+        offsets = self.snapshot.array("inventory.part_offsets")
+        part_ids = self.snapshot.array("inventory.part_ids")
+        quantities = self.snapshot.array("inventory.part_quantities")
+        pooled = Counter()
+        for user_id in set(user_ids):
+            index = _position(self.snapshot.array("user.ids"), user_id)
+            if index is None:
+                continue
+            inventory_index = _position(self.snapshot.array("inventory.ids"), self.snapshot.array("user.inventory_ids")[index])
+            if inventory_index is not None:
+                start, end = offsets[inventory_index], offsets[inventory_index + 1]
+                pooled.update(dict(zip(part_ids[start:end], quantities[start:end])))
+        return {part_id: quantity for part_id, quantity in pooled.items() if quantity > 0}
+
+    def get_set_demand(self, set_id: int) -> SetDemand | None:
+        target_set = self.get_set_by_id(set_id)
+        if target_set is None:
+            return None
+        return summarise_set_demand(target_set, (user.inventory for user in self.get_all_users()))
+
+    def get_part_usage(self, min_owners: int = 1) -> list[PartUsage]:
+        inventories = (self._inventory_at(index) for index in range(len(self.snapshot.array("inventory.ids"))))
+        usage = summarise_part_usage(inventories)
+        return [usage[part_id] for part_id in sorted(usage) if usage[part_id].owner_count >= min_owners]
+
+    def get_usage_sketches(self) -> UsageSketches:
+        sketches = UsageSketches()
+        sketches.add_inventories(self._inventory_at(index) for index in range(len(self.snapshot.array("inventory.ids"))))
+        return sketches
+
+    def create_colour(self, colour: Colour) -> Colour:
+        raise NotImplementedError("Snapshots are read-only")
+
+    def create_user(self, user: User) -> User:
+        raise NotImplementedError("Snapshots are read-only")
+
+    def apply_inventory_deltas(self, inventory_id: int, part_deltas: dict[int, int]) -> int:
+        raise NotImplementedError("Snapshots are read-only")
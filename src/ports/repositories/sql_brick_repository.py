@@ -1,3 +1,7 @@
+from collections.abc import Iterable
+
+from sqlalchemy import delete, func
+from sqlalchemy.dialects.sqlite import insert
 from sqlmodel import Session, select
 from src.ports.repositories.sql_brick_repository_schema import (
     Colour,
@@ -8,7 +12,13 @@ from src.ports.repositories.sql_brick_repository_schema import (
     Set,
     User,
     Inventory,
+    ChangeLog,
+    ChangeLogPart,
+    PartUsage,
+    InventoryVersion,
 )
+from src.ports.repositories.sql_part_usage import QuantityChange, update_part_usage
+from src.ports.repositories.sql_usage_sketches import load_usage_sketches, update_usage_sketches
 
 from src.ports.repositories.bricks_repository import BricksRepository
 from src.domain.entities.user import User as DomainUser
@@ -19,22 +29,69 @@ from src.domain.entities.set import SetItem as DomainSetItem
 from src.domain.entities.colour import Colour as DomainColour
 from src.domain.entities.shape import Shape as DomainShape
 from src.domain.entities.inventory import InventoryItem as DomainInventoryItem
+from src.domain.entities.change import Change as DomainChange
+from src.domain.entities.part_usage import PartUsage as DomainPartUsage
+from src.domain.entities.set_demand import SetDemand as DomainSetDemand
+from src.domain.use_cases.sketches import SketchSettings, UsageSketches
+
+
+def _log_change(session: Session, entity_type: str, entity_id: int, part_deltas: dict[int, int] | None = None) -> int:
+    """Append a change log entry to the session's pending transaction and return its version."""
+    change = ChangeLog(entity_type=entity_type, entity_id=entity_id)
+    session.add(change)
+    session.flush()
+    for part_id, quantity_delta in (part_deltas or {}).items():
+        session.add(ChangeLogPart(version=change.version, part_id=part_id, quantity_delta=quantity_delta))
+    if entity_type == "inventory":
+        session.merge(InventoryVersion(inventory_id=entity_id, version=change.version))
+    return change.version
+
+
+# Rows per INSERT statement; 3 bound parameters each stays below SQLite's variable limit.
+_UPSERT_BATCH_ROWS = 10_000
+# Ids per IN (...) list, for the same limit.
+_IN_BATCH_IDS = 30_000
+
+
+def _part_deltas(items) -> dict[int, int]:
+    deltas: dict[int, int] = {}
+    for item in items:
+        deltas[item.part.id] = deltas.get(item.part.id, 0) + item.quantity
+    return deltas
 
 
 class SQLBrickRepository(BricksRepository):
-    def __init__(self, session: Session):
+    """SQL repository that sends ``create_*`` calls to ``session`` and ``get_*`` calls to ``read_session``.
+
+    ``read_session`` is meant to be bound to a read-only engine (see
+    ``sqlite_read_write_engines``); without one, reads share the write session.
+    ``sketch_settings`` must match the ones the stored usage sketches were built with.
+    """
+
+    def __init__(self, session: Session, read_session: Session | None = None, sketch_settings: SketchSettings = SketchSettings()):
         self.session = session
+        self.read_session = read_session if read_session is not None else session
+        self.sketch_settings = sketch_settings
+
+    def _update_usage(self, session: Session, inventory_id: int, changes: list[QuantityChange], new_user: bool = False) -> None:
+        # The statistics describe users: inventories nobody owns (see create_inventory) are left out.
+        if not new_user and session.exec(select(User.id).where(User.inventory_id == inventory_id)).first() is None:
+            return
+        update_part_usage(session, changes)
+        update_usage_sketches(session, self.sketch_settings, inventory_id, changes, new_user)
 
     def create_colour(self, coulour: DomainColour) -> DomainColour:
         with self.session as session:
             db_colour = Colour(name=coulour.name)
             session.add(db_colour)
+            session.flush()
+            _log_change(session, "colour", db_colour.id)
             session.commit()
             session.refresh(db_colour)
             return DomainColour(id=db_colour.id, name=db_colour.name)
 
     def get_all_colours(self) -> list[DomainColour]:
-        with self.session as session:
+        with self.read_session as session:
             db_colours = session.exec(select(Colour)).all()
             return [
                 DomainColour(id=colour.id, name=colour.name) for colour in db_colours
@@ -44,6 +101,8 @@ class SQLBrickRepository(BricksRepository):
         with self.session as session:
             db_shape = Shape(name=shape.name)
             session.add(db_shape)
+            session.flush()
+            _log_change(session, "shape", db_shape.id)
             session.commit()
             session.refresh(db_shape)
             return DomainShape(id=db_shape.id, name=db_shape.name)
@@ -54,6 +113,8 @@ class SQLBrickRepository(BricksRepository):
                 name=part.name, colour_id=part.colour.id, shape_id=part.shape.id
             )
             session.add(db_part)
+            session.flush()
+            _log_change(session, "part", db_part.id)
             session.commit()
             session.refresh(db_part)
             colour = DomainColour(id=part.colour.id, name=part.colour.name)
@@ -62,8 +123,8 @@ class SQLBrickRepository(BricksRepository):
                 id=db_part.id, name=db_part.name, colour=colour, shape=shape
             )
 
-    def get_all_parts(self, offset: int = 0, limit: int = 100) -> list[DomainPart]:
-        with self.session as session:
+    def get_all_parts(self, offset: int = 0, limit: int | None = None) -> list[DomainPart]:
+        with self.read_session as session:
             statement = (
                 select(
                     Part.id.label("part_id"),
@@ -75,6 +136,7 @@ class SQLBrickRepository(BricksRepository):
                 )
                 .join(Colour, Part.colour_id == Colour.id)
                 .join(Shape, Part.shape_id == Shape.id)
+                .order_by(Part.id)
                 .offset(offset)
                 .limit(limit)
             )
@@ -95,6 +157,27 @@ class SQLBrickRepository(BricksRepository):
             
             return parts
 
+    def get_parts_by_ids(self, part_ids: Iterable[int]) -> list[DomainPart]:
+        part_ids = sorted(set(part_ids))
+        parts = []
+        with self.read_session as session:
+            for start in range(0, len(part_ids), _IN_BATCH_IDS):
+                statement = (
+                    select(Part.id, Part.name, Colour.id, Colour.name, Shape.id, Shape.name)
+                    .join(Colour, Part.colour_id == Colour.id)
+                    .join(Shape, Part.shape_id == Shape.id)
+                    .where(Part.id.in_(part_ids[start:start + _IN_BATCH_IDS]))
+                    .order_by(Part.id)
+                )
+                for part_id, part_name, colour_id, colour_name, shape_id, shape_name in session.exec(statement):
+                    parts.append(DomainPart(
+                        id=part_id,
+                        name=part_name,
+                        colour=DomainColour(id=colour_id, name=colour_name),
+                        shape=DomainShape(id=shape_id, name=shape_name),
+                    ))
+        return parts
+
     def create_set(self, lego_set: DomainSet) -> DomainSet:
         with self.session as session:
             # Create set
@@ -119,6 +202,7 @@ class SQLBrickRepository(BricksRepository):
                 session.add(set_part_link)
                 valid_items.append(item)
             
+            _log_change(session, "set", db_set.id, _part_deltas(valid_items))
             session.commit()
             
             return DomainSet(
@@ -127,8 +211,12 @@ class SQLBrickRepository(BricksRepository):
                 parts=valid_items
             )
 
-    def get_all_sets(self, offset: int = 0, limit: int = 100) -> list[DomainSet]:
-        with self.session as session:
+    def get_all_sets(self, offset: int = 0, limit: int | None = None) -> list[DomainSet]:
+        """Sets ordered by id, with their parts; ``offset`` and ``limit`` count sets, and no limit returns them all."""
+        with self.read_session as session:
+            page = select(Set.id).order_by(Set.id).offset(offset)
+            if limit is not None:
+                page = page.limit(limit)
             statement = (
                 select(
                     Set.id.label("set_id"),
@@ -145,10 +233,11 @@ class SQLBrickRepository(BricksRepository):
                 .outerjoin(Part, SetPartLink.part_id == Part.id)
                 .outerjoin(Colour, Part.colour_id == Colour.id)
                 .outerjoin(Shape, Part.shape_id == Shape.id)
-                .offset(offset)
-                .limit(limit)
+                .order_by(Set.id)
             )
-            
+            if offset or limit is not None:
+                statement = statement.where(Set.id.in_(page.scalar_subquery()))
+
             results = session.exec(statement).all()
             
             # Group results by set
@@ -187,7 +276,7 @@ class SQLBrickRepository(BricksRepository):
             return domain_sets
 
     def get_set_by_id(self, set_id: int) -> DomainSet | None:
-        with self.session as session:
+        with self.read_session as session:
             statement = (
                 select(
                     Set.id.label("set_id"),
@@ -234,7 +323,7 @@ class SQLBrickRepository(BricksRepository):
             )
 
     def get_set_by_name(self, name: str) -> DomainSet | None:
-        with self.session as session:
+        with self.read_session as session:
             statement = (
                 select(
                     Set.id.label("set_id"),
@@ -281,7 +370,7 @@ class SQLBrickRepository(BricksRepository):
             )
 
     def get_parts_by_set_id(self, set_id: int) -> list[DomainSetItem]:
-        with self.session as session:
+        with self.read_session as session:
             statement = (
                 select(
                     Part.id.label("part_id"),
@@ -334,16 +423,20 @@ class SQLBrickRepository(BricksRepository):
                 session.add(inventory_part_link)
                 valid_items.append(item)
 
+            part_deltas = _part_deltas(valid_items)
+            session.flush()
+            version = _log_change(session, "inventory", db_inventory.id, part_deltas)
             session.commit()
 
             # Return DomainInventory with the new structure
-            return DomainInventory(id=db_inventory.id, parts=valid_items)
+            return DomainInventory(id=db_inventory.id, parts=valid_items, version=version)
 
     def get_inventory_by_id(self, inventory_id: int) -> DomainInventory | None:
-        with self.session as session:
+        with self.read_session as session:
             statement = (
                 select(
                     Inventory.id.label("inventory_id"),
+                    InventoryVersion.version.label("inventory_version"),
                     Part.id.label("part_id"),
                     Part.name.label("part_name"),
                     Colour.id.label("colour_id"),
@@ -356,6 +449,7 @@ class SQLBrickRepository(BricksRepository):
                 .join(Part, InventoryPartLink.part_id == Part.id)
                 .join(Colour, Part.colour_id == Colour.id)
                 .join(Shape, Part.shape_id == Shape.id)
+                .outerjoin(InventoryVersion, InventoryVersion.inventory_id == Inventory.id)
                 .where(Inventory.id == inventory_id)
             )
 
@@ -365,7 +459,8 @@ class SQLBrickRepository(BricksRepository):
                 # Check if inventory exists but has no parts
                 db_inventory = session.get(Inventory, inventory_id)
                 if db_inventory:
-                    return DomainInventory(id=db_inventory.id, parts=[])
+                    db_version = session.get(InventoryVersion, inventory_id)
+                    return DomainInventory(id=db_inventory.id, parts=[], version=db_version.version if db_version else 0)
                 return None
 
             items = []
@@ -379,15 +474,16 @@ class SQLBrickRepository(BricksRepository):
                 inventory_item = DomainInventoryItem(part=part, quantity=row.quantity)
                 items.append(inventory_item)
 
-            return DomainInventory(id=results[0].inventory_id, parts=items)
+            return DomainInventory(id=results[0].inventory_id, parts=items, version=results[0].inventory_version or 0)
 
     def get_user_by_id(self, user_id: int) -> DomainUser | None:
-        with self.session as session:
+        with self.read_session as session:
             statement = (
                 select(
                     User.id.label("user_id"),
                     User.name.label("user_name"),
                     Inventory.id.label("inventory_id"),
+                    InventoryVersion.version.label("inventory_version"),
                     Part.id.label("part_id"),
                     Part.name.label("part_name"),
                     Colour.id.label("colour_id"),
@@ -397,6 +493,7 @@ class SQLBrickRepository(BricksRepository):
                     InventoryPartLink.quantity.label("quantity"),
                 )
                 .join(Inventory, User.inventory_id == Inventory.id)
+                .outerjoin(InventoryVersion, InventoryVersion.inventory_id == Inventory.id)
                 .outerjoin(
                     InventoryPartLink, Inventory.id == InventoryPartLink.inventory_id
                 )
@@ -428,19 +525,20 @@ class SQLBrickRepository(BricksRepository):
                 items.append(inventory_item)
 
             first_row = results[0]
-            inventory = DomainInventory(id=first_row.inventory_id, parts=items)
+            inventory = DomainInventory(id=first_row.inventory_id, parts=items, version=first_row.inventory_version or 0)
 
             return DomainUser(
                 id=first_row.user_id, name=first_row.user_name, inventory=inventory
             )
 
     def get_user_by_name(self, name: str) -> DomainUser | None:
-        with self.session as session:
+        with self.read_session as session:
             statement = (
                 select(
                     User.id.label("user_id"),
                     User.name.label("user_name"),
                     Inventory.id.label("inventory_id"),
+                    InventoryVersion.version.label("inventory_version"),
                     Part.id.label("part_id"),
                     Part.name.label("part_name"),
                     Colour.id.label("colour_id"),
@@ -450,6 +548,7 @@ class SQLBrickRepository(BricksRepository):
                     InventoryPartLink.quantity.label("quantity"),
                 )
                 .join(Inventory, User.inventory_id == Inventory.id)
+                .outerjoin(InventoryVersion, InventoryVersion.inventory_id == Inventory.id)
                 .outerjoin(
                     InventoryPartLink, Inventory.id == InventoryPartLink.inventory_id
                 )
@@ -481,56 +580,114 @@ class SQLBrickRepository(BricksRepository):
                 items.append(inventory_item)
 
             first_row = results[0]
-            inventory = DomainInventory(id=first_row.inventory_id, parts=items)
+            inventory = DomainInventory(id=first_row.inventory_id, parts=items, version=first_row.inventory_version or 0)
 
             return DomainUser(
                 id=first_row.user_id, name=first_row.user_name, inventory=inventory
             )
 
     def create_user(self, user: DomainUser) -> DomainUser:
+        """Create the user, their inventory, its usage statistics and change log entries in one transaction."""
         with self.session as session:
-            # Create inventory first
+            part_ids = {item.part.id for item in user.inventory.parts}
+            existing = set(session.exec(select(Part.id).where(Part.id.in_(part_ids))))
+            for item in user.inventory.parts:
+                if item.part.id not in existing:
+                    raise ValueError(f"Part with id {item.part.id} does not exist")
+
             db_inventory = Inventory()
             session.add(db_inventory)
-            session.commit()
-            session.refresh(db_inventory)
+            session.flush()
 
             # Create InventoryPartLink entries for each part
-            valid_items = []
-            for item in user.inventory.parts:
-                # Check if part exists
-                db_part = session.get(Part, item.part.id)
-                if db_part is None:
-                    raise ValueError(f"Part with id {item.part.id} does not exist")
-
-                inventory_part_link = InventoryPartLink(
+            valid_items = list(user.inventory.parts)
+            for item in valid_items:
+                session.add(InventoryPartLink(
                     inventory_id=db_inventory.id,
                     part_id=item.part.id,
                     quantity=item.quantity,
-                )
-                session.add(inventory_part_link)
-                valid_items.append(item)
-
-            session.commit()
+                ))
 
             # Create user with inventory
             db_user = User(name=user.name, inventory_id=db_inventory.id)
             session.add(db_user)
+            session.flush()
+
+            part_deltas = _part_deltas(valid_items)
+            self._update_usage(
+                session, db_inventory.id, [(part_id, 0, quantity) for part_id, quantity in part_deltas.items()], new_user=True
+            )
+            version = _log_change(session, "inventory", db_inventory.id, part_deltas)
+            _log_change(session, "user", db_user.id)
             session.commit()
-            session.refresh(db_user)
 
             # Return DomainUser with full inventory
-            inventory = DomainInventory(id=db_inventory.id, parts=valid_items)
+            inventory = DomainInventory(id=db_inventory.id, parts=valid_items, version=version)
 
             return DomainUser(id=db_user.id, name=db_user.name, inventory=inventory)
 
-    def get_all_users(self, offset: int = 0, limit: int = 100) -> list[User]:
+    def apply_inventory_deltas(self, inventory_id: int, part_deltas: dict[int, int]) -> int:
+        """Add ``part_deltas`` (part id -> quantity change) to an inventory in one transaction.
+
+        Quantities that drop to zero or below remove the part from the
+        inventory. The change log records the deltas actually applied, so a
+        removal larger than the quantity held is logged as that quantity.
+        Returns the inventory's new version, which is the change log version
+        of this write.
+        """
+        part_deltas = {part_id: delta for part_id, delta in part_deltas.items() if delta}
         with self.session as session:
+            if session.get(Inventory, inventory_id) is None:
+                raise ValueError(f"Inventory with id {inventory_id} does not exist")
+            existing = set(session.exec(select(Part.id).where(Part.id.in_(part_deltas))))
+            for part_id in part_deltas:
+                if part_id not in existing:
+                    raise ValueError(f"Part with id {part_id} does not exist")
+
+            before = dict(session.exec(
+                select(InventoryPartLink.part_id, InventoryPartLink.quantity).where(
+                    InventoryPartLink.inventory_id == inventory_id, InventoryPartLink.part_id.in_(part_deltas)
+                )
+            ).all())
+            applied = {}
+            for part_id, delta in part_deltas.items():
+                held = before.get(part_id, 0)
+                if max(held + delta, 0) != held:
+                    applied[part_id] = max(held + delta, 0) - held
+
+            rows = [
+                {"inventory_id": inventory_id, "part_id": part_id, "quantity": delta}
+                for part_id, delta in applied.items()
+            ]
+            for start in range(0, len(rows), _UPSERT_BATCH_ROWS):
+                statement = insert(InventoryPartLink).values(rows[start:start + _UPSERT_BATCH_ROWS])
+                session.exec(statement.on_conflict_do_update(
+                    index_elements=[InventoryPartLink.inventory_id, InventoryPartLink.part_id],
+                    set_={"quantity": InventoryPartLink.quantity + statement.excluded.quantity},
+                ))
+            session.exec(delete(InventoryPartLink).where(
+                InventoryPartLink.inventory_id == inventory_id, InventoryPartLink.quantity <= 0
+            ))
+            self._update_usage(session, inventory_id, [
+                (part_id, before.get(part_id, 0), before.get(part_id, 0) + delta)
+                for part_id, delta in applied.items()
+            ])
+            version = _log_change(session, "inventory", inventory_id, applied)
+            session.commit()
+            return version
+
+    def get_all_users(self, offset: int = 0, limit: int | None = None) -> list[DomainUser]:
+        """Users ordered by id, with their inventories; ``offset`` and ``limit`` count users, and no limit returns them all."""
+        with self.read_session as session:
+            page = select(User.id).order_by(User.id).offset(offset)
+            if limit is not None:
+                page = page.limit(limit)
             statement = (
                 select(
                     User.id.label("user_id"),
                     User.name.label("user_name"),
                     Inventory.id.label("inventory_id"),
+                    InventoryVersion.version.label("inventory_version"),
                     Part.id.label("part_id"),
                     Part.name.label("part_name"),
                     Colour.id.label("colour_id"),
@@ -540,13 +697,15 @@ class SQLBrickRepository(BricksRepository):
                     InventoryPartLink.quantity.label("quantity"),
                 )
                 .join(Inventory, User.inventory_id == Inventory.id)
-                .join(InventoryPartLink, Inventory.id == InventoryPartLink.inventory_id)
-                .join(Part, InventoryPartLink.part_id == Part.id)
-                .join(Colour, Part.colour_id == Colour.id)
-                .join(Shape, Part.shape_id == Shape.id)
-                .offset(offset)
-                .limit(limit)
+                .outerjoin(InventoryVersion, InventoryVersion.inventory_id == Inventory.id)
+                .outerjoin(InventoryPartLink, Inventory.id == InventoryPartLink.inventory_id)
+                .outerjoin(Part, InventoryPartLink.part_id == Part.id)
+                .outerjoin(Colour, Part.colour_id == Colour.id)
+                .outerjoin(Shape, Part.shape_id == Shape.id)
+                .order_by(User.id)
             )
+            if offset or limit is not None:
+                statement = statement.where(User.id.in_(page.scalar_subquery()))
 
             results = session.exec(statement).all()
 
@@ -559,9 +718,14 @@ class SQLBrickRepository(BricksRepository):
                         "user_id": row.user_id,
                         "user_name": row.user_name,
                         "inventory_id": row.inventory_id,
+                        "inventory_version": row.inventory_version or 0,
                         "items": [],
                     }
 
+                # Skip if no part (empty inventory)
+                if row.part_id is None:
+                    continue
+
                 colour = DomainColour(id=row.colour_id, name=row.colour_name)
                 shape = DomainShape(id=row.shape_id, name=row.shape_name)
                 part = DomainPart(
@@ -574,7 +738,7 @@ class SQLBrickRepository(BricksRepository):
             domain_users = []
             for user_data in users_dict.values():
                 inventory = DomainInventory(
-                    id=user_data["inventory_id"], parts=user_data["items"]
+                    id=user_data["inventory_id"], parts=user_data["items"], version=user_data["inventory_version"]
                 )
 
                 user = DomainUser(
@@ -587,3 +751,111 @@ class SQLBrickRepository(BricksRepository):
 
             return domain_users
 
+    def get_changes(self, since: int = 0, limit: int = 1000) -> list[DomainChange]:
+        """Change log entries with a version above ``since``, oldest first."""
+        with self.read_session as session:
+            changes = session.exec(
+                select(ChangeLog).where(ChangeLog.version > since).order_by(ChangeLog.version).limit(limit)
+            ).all()
+            if not changes:
+                return []
+            deltas: dict[int, dict[int, int]] = {}
+            rows = session.exec(
+                select(ChangeLogPart).where(
+                    ChangeLogPart.version > since, ChangeLogPart.version <= changes[-1].version
+                )
+            )
+            for row in rows:
+                deltas.setdefault(row.version, {})[row.part_id] = row.quantity_delta
+            return [
+                DomainChange(
+                    version=change.version,
+                    entity_type=change.entity_type,
+                    entity_id=change.entity_id,
+                    part_deltas=deltas.get(change.version, {}),
+                )
+                for change in changes
+            ]
+
+    def count_users(self) -> int:
+        with self.read_session as session:
+            return session.exec(select(func.count()).select_from(User)).one()
+
+    def get_pooled_inventory(self, user_ids: list[int]) -> dict[int, int]:
+        if not user_ids:
+            return {}
+        with self.read_session as session:
+            rows = session.exec(
+                select(InventoryPartLink.part_id, func.sum(InventoryPartLink.quantity))
+                .join(User, User.inventory_id == InventoryPartLink.inventory_id)
+                .where(User.id.in_(set(user_ids)), InventoryPartLink.quantity > 0)
+                .group_by(InventoryPartLink.part_id)
+            )
+            return dict(rows.all())
+
+    def get_set_demand(self, set_id: int) -> DomainSetDemand | None:
+        """Aggregated over the inventory links of the set's parts only, through the ``part_id`` index."""
+        with self.read_session as session:
+            if session.get(Set, set_id) is None:
+                return None
+            required = dict(session.exec(select(SetPartLink.part_id, SetPartLink.quantity).where(SetPartLink.set_id == set_id)).all())
+            user_count = session.exec(select(func.count()).select_from(User)).one()
+            demand = DomainSetDemand(set_id=set_id)
+            if not required:
+                demand.users_by_missing_pieces = {0: user_count} if user_count else {}
+                return demand
+
+            owned_links = (
+                select(
+                    InventoryPartLink.inventory_id,
+                    InventoryPartLink.part_id,
+                    func.min(InventoryPartLink.quantity, SetPartLink.quantity).label("covered"),
+                )
+                .join(SetPartLink, (SetPartLink.part_id == InventoryPartLink.part_id) & (SetPartLink.set_id == set_id))
+                .join(User, User.inventory_id == InventoryPartLink.inventory_id)
+                .where(InventoryPartLink.quantity > 0)
+                .subquery()
+            )
+            total = sum(required.values())
+            covered_by_user = (
+                select((total - func.sum(owned_links.c.covered)).label("missing"))
+                .group_by(owned_links.c.inventory_id)
+                .subquery()
+            )
+            histogram = dict(session.exec(
+                select(covered_by_user.c.missing, func.count()).group_by(covered_by_user.c.missing)
+            ).all())
+            covered_by_part = dict(session.exec(
+                select(owned_links.c.part_id, func.sum(owned_links.c.covered)).group_by(owned_links.c.part_id)
+            ).all())
+
+        # Users holding none of the set's parts miss all of it.
+        users_without_parts = user_count - sum(histogram.values())
+        if users_without_parts:
+            histogram[total] = histogram.get(total, 0) + users_without_parts
+        demand.users_by_missing_pieces = dict(sorted(histogram.items()))
+        for part_id, quantity in required.items():
+            missing = quantity * user_count - covered_by_part.get(part_id, 0)
+            if missing:
+                demand.missing_by_part[part_id] = missing
+        return demand
+
+    def get_part_usage(self, min_owners: int = 1) -> list[DomainPartUsage]:
+        """Usage statistics of parts owned by at least ``min_owners`` users, from the ``partusage`` table."""
+        with self.read_session as session:
+            rows = session.exec(
+                select(PartUsage).where(PartUsage.owner_count >= max(min_owners, 1)).order_by(PartUsage.part_id)
+            ).all()
+            return [
+                DomainPartUsage(
+                    part_id=row.part_id,
+                    owner_count=row.owner_count,
+                    total_quantity=row.total_quantity,
+                    min_quantity=row.min_quantity,
+                )
+                for row in rows
+            ]
+
+    def get_usage_sketches(self) -> UsageSketches:
+        with self.read_session as session:
+            return load_usage_sketches(session, self.sketch_settings)
@@ -15,7 +15,8 @@ class SetPartLink(SQLModel, table=True):
 
 class InventoryPartLink(SQLModel, table=True):
     inventory_id: int | None = Field(default=None, foreign_key="inventory.id", primary_key=True)
-    part_id: int | None = Field(default=None, foreign_key="part.id", primary_key=True)
+    # Indexed on its own so the owners of one part can be aggregated without a full scan.
+    part_id: int | None = Field(default=None, foreign_key="part.id", primary_key=True, index=True)
     quantity: int
 
 class Part(SQLModel, table=True):
@@ -38,4 +39,34 @@ class User(SQLModel, table=True):
 
 class Inventory(SQLModel, table=True):
     id: int | None = Field(default=None, primary_key=True)
-    parts: list[Part] = Relationship(back_populates="inventories", link_model=InventoryPartLink)
\ No newline at end of file
+    parts: list[Part] = Relationship(back_populates="inventories", link_model=InventoryPartLink)
+class ChangeLog(SQLModel, table=True):
+    # AUTOINCREMENT keeps versions strictly increasing even after rows are pruned.
+    __table_args__ = {"sqlite_autoincrement": True}
+    version: int | None = Field(default=None, primary_key=True)
+    entity_type: str
+    entity_id: int
+
+class ChangeLogPart(SQLModel, table=True):
+    version: int = Field(foreign_key="changelog.version", primary_key=True)
+    part_id: int = Field(primary_key=True)
+    quantity_delta: int
+
+class PartUsage(SQLModel, table=True):
+    """Per-part ownership statistics, kept up to date by every inventory write."""
+    part_id: int = Field(foreign_key="part.id", primary_key=True)
+    owner_count: int = Field(index=True)
+    total_quantity: int
+    min_quantity: int
+
+class UsageSketchCell(SQLModel, table=True):
+    """One non-zero HyperLogLog register or count-min counter of a stored sketch."""
+    sketch: str = Field(primary_key=True)
+    row: int = Field(primary_key=True)
+    column: int = Field(primary_key=True)
+    value: int
+
+class InventoryVersion(SQLModel, table=True):
+    """Change log version of each inventory's last write; inventories without a row are at version 0."""
+    inventory_id: int = Field(foreign_key="inventory.id", primary_key=True)
+    version: int
@@ -0,0 +1,87 @@
+import threading
+import time
+from collections.abc import Callable
+
+from sqlalchemy.engine import Engine
+
+from src.domain.entities.change import Change
+from src.ports.repositories.sql_brick_repository_schema import ChangeLog
+
+
+class ChangeLogPoller:
+    """Tails the ``changelog`` table and hands new entries to listeners.
+
+    Writers append a change log row in the same transaction as the change, so
+    any process can learn about any write without a broker. ``poll`` runs at
+    most once per ``poll_interval_seconds``. On SQLite it first asks
+    ``PRAGMA data_version``, which only changes when another connection
+    committed, so the table itself is read only after a write.
+    """
+
+    def __init__(self, engine: Engine, poll_interval_seconds: float = 1.0):
+        self.engine = engine
+        self.poll_interval_seconds = poll_interval_seconds
+        self._listeners: list[Callable[[list[Change]], None]] = []
+        self._lock = threading.Lock()
+        # data_version is per connection, so one connection is kept out of the pool for polling.
+        self._connection = engine.raw_connection()
+        self._connection.detach()
+        self._uses_data_version = engine.dialect.name == "sqlite"
+        self._data_version = self._read_data_version()
+        self._polled_at = time.monotonic()
+        self.last_version = self._execute(f"SELECT coalesce(max(version), 0) FROM {ChangeLog.__tablename__}")[0][0]
+
+    def add_listener(self, listener: Callable[[list[Change]], None]) -> None:
+        self._listeners.append(listener)
+
+    def poll(self) -> None:
+        """Deliver changes committed since the last poll, unless one ran recently."""
+        if time.monotonic() - self._polled_at < self.poll_interval_seconds:
+            return
+        # Another thread is already polling; its results reach the same listeners.
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            self._polled_at = time.monotonic()
+            self._poll()
+        finally:
+            self._lock.release()
+
+    def poll_now(self) -> None:
+        with self._lock:
+            self._polled_at = time.monotonic()
+            self._poll()
+
+    def _poll(self) -> None:
+        if self._uses_data_version:
+            data_version = self._read_data_version()
+            if data_version == self._data_version:
+                return
+            self._data_version = data_version
+
+        rows = self._execute(
+            f"SELECT version, entity_type, entity_id FROM {ChangeLog.__tablename__} WHERE version > ? ORDER BY version",
+            (self.last_version,),
+        )
+        if not rows:
+            return
+        changes = [Change(version, entity_type, entity_id) for version, entity_type, entity_id in rows]
+        self.last_version = changes[-1].version
+        for listener in self._listeners:
+            listener(changes)
+
+    def _read_data_version(self) -> int | None:
+        if not self._uses_data_version:
+            return None
+        return self._execute("PRAGMA data_version")[0][0]
+
+    def _execute(self, statement: str, parameters: tuple = ()) -> list[tuple]:
+        cursor = self._connection.cursor()
+        try:
+            cursor.execute(statement, parameters)
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+
+    def close(self) -> None:
+        self._connection.close()
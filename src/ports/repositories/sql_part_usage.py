@@ -0,0 +1,83 @@
+"""Maintenance of the ``partusage`` table.
+
+Writers call ``update_part_usage`` in the transaction that changes inventory
+links, so the statistics are always consistent with the links they describe.
+Only inventories owned by a user count, as the statistics are shares of users.
+Owner counts and totals are adjusted in place; a part's minimum quantity is
+only recomputed from its links when an inventory holding the minimum raises
+or gives up its share. ``rebuild_part_usage`` recomputes everything, for
+bulk-loaded databases and databases created before the table existed.
+
+    python -m src.scripts.rebuild_part_usage --database-url sqlite:///large.db
+"""
+from collections.abc import Iterable
+
+from sqlalchemy import Connection, delete, func, insert
+from sqlmodel import Session, select
+
+from src.ports.repositories.sql_brick_repository_schema import InventoryPartLink, PartUsage, User
+
+# (part id, quantity before the write, quantity after it); 0 means not owned.
+QuantityChange = tuple[int, int, int]
+
+
+def _aggregate(part_ids: Iterable[int] | None = None):
+    statement = (
+        select(
+            InventoryPartLink.part_id,
+            func.count(),
+            func.sum(InventoryPartLink.quantity),
+            func.min(InventoryPartLink.quantity),
+        )
+        .join(User, User.inventory_id == InventoryPartLink.inventory_id)
+        .where(InventoryPartLink.quantity > 0)
+        .group_by(InventoryPartLink.part_id)
+    )
+    if part_ids is not None:
+        statement = statement.where(InventoryPartLink.part_id.in_(part_ids))
+    return statement
+
+
+def update_part_usage(session: Session, changes: Iterable[QuantityChange]) -> None:
+    """Fold one user-owned inventory's quantity changes into ``partusage``; links must already be flushed."""
+    changes = [(part_id, max(before, 0), max(after, 0)) for part_id, before, after in changes if before != after]
+    if not changes:
+        return
+    rows = {
+        row.part_id: row
+        for row in session.exec(select(PartUsage).where(PartUsage.part_id.in_([change[0] for change in changes])))
+    }
+
+    stale_minimums = []
+    for part_id, before, after in changes:
+        row = rows.get(part_id)
+        if row is None:
+            # Owned by nobody until now.
+            if after:
+                session.add(PartUsage(part_id=part_id, owner_count=1, total_quantity=after, min_quantity=after))
+            continue
+        row.owner_count += (after > 0) - (before > 0)
+        row.total_quantity += after - before
+        if before == row.min_quantity and (after == 0 or after > before):
+            stale_minimums.append(part_id)
+        elif after and after < row.min_quantity:
+            row.min_quantity = after
+        if row.owner_count == 0:
+            session.delete(row)
+        else:
+            session.add(row)
+
+    if stale_minimums:
+        session.flush()
+        for part_id, _, _, min_quantity in session.exec(_aggregate(stale_minimums)):
+            rows[part_id].min_quantity = min_quantity
+            session.add(rows[part_id])
+
+
+def rebuild_part_usage(connection: Connection | Session) -> int:
+    """Recompute ``partusage`` from the links of every user's inventory; returns the number of parts owned."""
+    connection.execute(delete(PartUsage))
+    result = connection.execute(insert(PartUsage).from_select(
+        ["part_id", "owner_count", "total_quantity", "min_quantity"], _aggregate()
+    ))
+    return result.rowcount
@@ -0,0 +1,109 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger("lego.slow_queries")
+
+MAX_PARAMETERS_LENGTH = 500
+
+
+@dataclass
+class SlowQueryLog:
+    """Logs statements slower than ``threshold_seconds`` together with their SQLite query plan.
+
+    Each distinct SQL string is logged at most once per ``min_interval_seconds``;
+    occurrences in between are counted and reported with the next log line.
+    Only the ``max_statements`` most recently logged strings are remembered.
+    """
+    threshold_seconds: float
+    min_interval_seconds: float = 60.0
+    explain: bool = True
+    max_statements: int = 1024
+    _last_logged: OrderedDict[str, float] = field(default_factory=OrderedDict)
+    _suppressed: dict[str, int] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def install(self, engine: Engine) -> None:
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+        event.listen(engine, "handle_error", self._handle_error)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("slow_query_start_times", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        start_times = conn.info.get("slow_query_start_times")
+        if not start_times:
+            return
+        elapsed = time.perf_counter() - start_times.pop()
+        if elapsed < self.threshold_seconds:
+            return
+
+        suppressed = self._acquire(statement)
+        if suppressed is None:
+            return
+
+        plan = None
+        if self.explain and not executemany and conn.dialect.name == "sqlite" and statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            plan = self._explain_query_plan(conn, statement, parameters)
+
+        logger.warning(json.dumps({
+            "event": "slow_query",
+            "elapsed_ms": round(elapsed * 1000, 3),
+            "threshold_ms": round(self.threshold_seconds * 1000, 3),
+            "sql": statement,
+            "parameters": repr(parameters)[:MAX_PARAMETERS_LENGTH],
+            "plan": plan,
+            "suppressed_since_last_log": suppressed,
+        }))
+
+    @staticmethod
+    def _handle_error(exception_context):
+        # A failed statement never reaches after_cursor_execute: drop its start time.
+        connection = exception_context.connection
+        if connection is not None:
+            start_times = connection.info.get("slow_query_start_times")
+            if start_times:
+                start_times.pop()
+
+    def _acquire(self, statement: str) -> int | None:
+        """Return how many logs of ``statement`` were suppressed, or None if this one is too."""
+        now = time.monotonic()
+        with self._lock:
+            last_logged = self._last_logged.get(statement)
+            if last_logged is not None and now - last_logged < self.min_interval_seconds:
+                self._suppressed[statement] = self._suppressed.get(statement, 0) + 1
+                return None
+            self._last_logged[statement] = now
+            self._last_logged.move_to_end(statement)
+            while len(self._last_logged) > self.max_statements:
+                forgotten, _ = self._last_logged.popitem(last=False)
+                self._suppressed.pop(forgotten, None)
+            return self._suppressed.pop(statement, 0)
+
+    @staticmethod
+    def _explain_query_plan(conn, statement: str, parameters) -> list[str] | None:
+        # Use a raw DBAPI cursor so the EXPLAIN does not go through these hooks again.
+        try:
+            cursor = conn.connection.dbapi_connection.cursor()
+            try:
+                cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+                rows = cursor.fetchall()
+            finally:
+                cursor.close()
+        except Exception as e:
+            return [f"EXPLAIN QUERY PLAN failed: {e}"]
+
+        # Rows are (id, parent, notused, detail); indent each step under its parent.
+        depth = {0: -1}
+        lines = []
+        for node_id, parent_id, _, detail in rows:
+            depth[node_id] = depth.get(parent_id, -1) + 1
+            lines.append("  " * depth[node_id] + detail)
+        return lines
@@ -0,0 +1,74 @@
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+@dataclass
+class StatementStats:
+    """SQL activity collected while a ``collect_statement_stats`` block is active."""
+    statements: int = 0
+    rows: int = 0
+    seconds: float = 0.0
+
+
+_current_stats: ContextVar[StatementStats | None] = ContextVar("sql_statement_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    if stats is None:
+        return
+    conn.info.setdefault("statement_start_times", []).append(time.perf_counter())
+    # Cursors do not report fetched rows for SELECTs. sqlite3 cursors pass
+    # every fetched row through row_factory, so count rows there as the
+    # caller fetches them; cursors of other drivers report no rows.
+    if hasattr(cursor, "row_factory") and cursor.row_factory is None:
+        def count_row(cursor, row):
+            stats.rows += 1
+            return row
+
+        cursor.row_factory = count_row
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    if stats is None:
+        return
+    start_times = conn.info.get("statement_start_times")
+    if start_times:
+        stats.seconds += time.perf_counter() - start_times.pop()
+    stats.statements += 1
+
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute: drop its start time.
+    connection = exception_context.connection
+    if connection is not None and _current_stats.get() is not None:
+        start_times = connection.info.get("statement_start_times")
+        if start_times:
+            start_times.pop()
+
+
+def install_statement_stats() -> None:
+    """Register the cursor and session hooks globally; calling it again is a no-op."""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _handle_error)
+
+
+@contextmanager
+def collect_statement_stats() -> Iterator[StatementStats]:
+    """Count the statements executed by the current context (thread or task)."""
+    install_statement_stats()
+    stats = StatementStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
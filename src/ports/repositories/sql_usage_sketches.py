@@ -0,0 +1,184 @@
+"""``UsageSketches`` stored cell by cell in the ``usagesketchcell`` table.
+
+Sketches merge by taking the maximum of HyperLogLog registers and the sum of
+count-min counters, so an inventory write folds its own small sketch into the
+stored one with two upserts in its transaction: every worker reads the same
+sketches, and none has to rebuild them. Only non-zero cells are stored.
+
+The cell layout depends on ``SketchSettings``, so the settings are stored
+with the cells. When they differ from the configured ones, reads compute the
+sketches from the tables instead and the next inventory write rebuilds them.
+A rebuild can also be run by hand:
+
+    python -m src.scripts.rebuild_part_usage --database-url sqlite:///large.db
+"""
+import logging
+from collections.abc import Iterable
+
+from sqlalchemy import Connection, delete, func
+from sqlalchemy.dialects.sqlite import insert
+from sqlmodel import Session, select
+
+from src.domain.use_cases.sketches import CountMinSketch, HyperLogLog, SketchSettings, UsageSketches
+from src.ports.repositories.sql_brick_repository_schema import InventoryPartLink, Part, PartUsage, UsageSketchCell, User
+from src.ports.repositories.sql_part_usage import QuantityChange
+
+USERS = "users"
+PART_OWNERS = "part_owners"
+SHAPE_OWNERS = "shape_owners:"
+COLOUR_OWNERS = "colour_owners:"
+# Columns 0, 1 and 2 of row 0 hold the HyperLogLog precision, count-min width and count-min depth.
+SETTINGS = "settings"
+
+logger = logging.getLogger("lego.usage_sketches")
+
+
+def _layout(settings: SketchSettings) -> tuple[int, ...]:
+    return settings.hll_precision, settings.cms_width, settings.cms_depth
+
+
+def _stored_layout(connection: Connection) -> tuple[int, ...] | None:
+    """Layout the stored cells were built with: None if nothing is stored, () if it was never recorded."""
+    stored = connection.execute(
+        select(UsageSketchCell.column, UsageSketchCell.value).where(UsageSketchCell.sketch == SETTINGS).order_by(UsageSketchCell.column)
+    ).all()
+    if stored:
+        return tuple(value for _, value in stored)
+    if connection.execute(select(UsageSketchCell.sketch).limit(1)).first() is None:
+        return None
+    return ()
+
+
+def _upsert(session: Session, cells: list[dict], merge) -> None:
+    if not cells:
+        return
+    statement = insert(UsageSketchCell).values(cells)
+    session.exec(statement.on_conflict_do_update(
+        index_elements=[UsageSketchCell.sketch, UsageSketchCell.row, UsageSketchCell.column],
+        set_={"value": merge(UsageSketchCell.value, statement.excluded.value)},
+    ))
+
+
+def update_usage_sketches(
+    session: Session,
+    settings: SketchSettings,
+    inventory_id: int,
+    changes: Iterable[QuantityChange],
+    new_user: bool = False,
+) -> None:
+    """Fold one inventory write into the stored sketches, in the caller's transaction.
+
+    Sketches stored with other settings are rebuilt instead, this write included.
+    """
+    connection = session.connection()
+    stored_layout = _stored_layout(connection)
+    if stored_layout is not None and stored_layout != _layout(settings):
+        session.flush()
+        rebuild_usage_sketches(connection, settings)
+        return
+    if stored_layout is None:
+        _upsert(session, _settings_cells(settings), lambda stored, recorded: recorded)
+
+    gained, lost = [], []
+    for part_id, before, after in changes:
+        if before <= 0 < after:
+            gained.append(part_id)
+        elif after <= 0 < before:
+            lost.append(part_id)
+
+    # Every HyperLogLog gets the same value, the inventory id, so they all take the same register.
+    index, rank = HyperLogLog(settings.hll_precision).register_for(inventory_id)
+    registers = [USERS] if new_user else []
+    if gained:
+        for shape_id, colour_id in set(session.exec(select(Part.shape_id, Part.colour_id).where(Part.id.in_(gained)))):
+            registers += [f"{SHAPE_OWNERS}{shape_id}", f"{COLOUR_OWNERS}{colour_id}"]
+    _upsert(session, [{"sketch": sketch, "row": 0, "column": index, "value": rank} for sketch in set(registers)], func.max)
+
+    sketch = CountMinSketch(settings.cms_width, settings.cms_depth)
+    counters: dict[tuple[int, int], int] = {}
+    for part_ids, count in ((gained, 1), (lost, -1)):
+        for part_id in part_ids:
+            for row, column in enumerate(sketch.columns(part_id)):
+                counters[row, column] = counters.get((row, column), 0) + count
+    _upsert(
+        session,
+        [{"sketch": PART_OWNERS, "row": row, "column": column, "value": count} for (row, column), count in counters.items() if count],
+        lambda stored, added: stored + added,
+    )
+
+
+def load_usage_sketches(session: Session, settings: SketchSettings) -> UsageSketches:
+    connection = session.connection()
+    stored_layout = _stored_layout(connection)
+    if stored_layout is not None and stored_layout != _layout(settings):
+        logger.warning("Stored usage sketches have layout %s, not %s; computing them from the tables", stored_layout, _layout(settings))
+        return compute_usage_sketches(connection, settings)
+
+    sketches = UsageSketches(settings)
+    cells = session.exec(
+        select(UsageSketchCell.sketch, UsageSketchCell.row, UsageSketchCell.column, UsageSketchCell.value).where(UsageSketchCell.sketch != SETTINGS)
+    )
+    hyperloglogs: dict[str, HyperLogLog] = {USERS: sketches.users}
+    for name, row, column, value in cells:
+        if name == PART_OWNERS:
+            sketches.part_owners.counters[row][column] = value
+            continue
+        hyperloglog = hyperloglogs.get(name)
+        if hyperloglog is None:
+            by_key, prefix = (sketches.shape_owners, SHAPE_OWNERS) if name.startswith(SHAPE_OWNERS) else (sketches.colour_owners, COLOUR_OWNERS)
+            hyperloglog = hyperloglogs[name] = by_key[int(name.removeprefix(prefix))] = HyperLogLog(settings.hll_precision)
+        hyperloglog.registers[column] = value
+    return sketches
+
+
+def _settings_cells(settings: SketchSettings) -> list[dict]:
+    return [{"sketch": SETTINGS, "row": 0, "column": column, "value": value} for column, value in enumerate(_layout(settings))]
+
+
+def _cells(sketches: UsageSketches) -> Iterable[dict]:
+    hyperloglogs = [(USERS, sketches.users)]
+    hyperloglogs += [(f"{SHAPE_OWNERS}{shape_id}", sketch) for shape_id, sketch in sketches.shape_owners.items()]
+    hyperloglogs += [(f"{COLOUR_OWNERS}{colour_id}", sketch) for colour_id, sketch in sketches.colour_owners.items()]
+    for name, hyperloglog in hyperloglogs:
+        for column, rank in enumerate(hyperloglog.registers):
+            if rank:
+                yield {"sketch": name, "row": 0, "column": column, "value": rank}
+    for row, counters in enumerate(sketches.part_owners.counters):
+        for column, count in enumerate(counters):
+            if count:
+                yield {"sketch": PART_OWNERS, "row": row, "column": column, "value": count}
+
+
+def compute_usage_sketches(connection: Connection, settings: SketchSettings) -> UsageSketches:
+    """Compute the sketches from users, links and the ``partusage`` table, without storing them."""
+    sketches = UsageSketches(settings)
+    for (inventory_id,) in connection.execute(select(User.inventory_id)):
+        sketches.users.add(inventory_id)
+    for part_id, owner_count in connection.execute(select(PartUsage.part_id, PartUsage.owner_count)):
+        sketches.part_owners.add(part_id, owner_count)
+
+    registers: dict[int, tuple[int, int]] = {}
+    for attribute, by_key in ((Part.shape_id, sketches.shape_owners), (Part.colour_id, sketches.colour_owners)):
+        owners = (
+            select(attribute, InventoryPartLink.inventory_id)
+            .join(Part, Part.id == InventoryPartLink.part_id)
+            .join(User, User.inventory_id == InventoryPartLink.inventory_id)
+            .where(InventoryPartLink.quantity > 0)
+            .distinct()
+        )
+        for key, inventory_id in connection.execute(owners):
+            if inventory_id not in registers:
+                registers[inventory_id] = sketches.users.register_for(inventory_id)
+            index, rank = registers[inventory_id]
+            hyperloglog = by_key.setdefault(key, HyperLogLog(settings.hll_precision))
+            if rank > hyperloglog.registers[index]:
+                hyperloglog.registers[index] = rank
+    return sketches
+
+
+def rebuild_usage_sketches(connection: Connection, settings: SketchSettings) -> UsageSketches:
+    """Recompute the stored sketches and their settings from users, links and the ``partusage`` table (rebuild that first)."""
+    sketches = compute_usage_sketches(connection, settings)
+    connection.execute(delete(UsageSketchCell))
+    connection.execute(insert(UsageSketchCell), list(_cells(sketches)) + _settings_cells(settings))
+    return sketches
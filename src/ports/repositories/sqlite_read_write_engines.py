@@ -0,0 +1,61 @@
+import dataclasses
+from dataclasses import dataclass
+from pathlib import Path
+from urllib.parse import quote
+
+from sqlalchemy import URL, make_url
+from sqlalchemy.engine import Engine
+from sqlmodel import create_engine
+
+from src.ports.repositories.sqlite_storage_profiles import SQLiteStorageProfile, apply_storage_profile
+
+
+@dataclass(frozen=True)
+class ReadWriteEngines:
+    """A single-connection writer engine and a pooled engine for reads.
+
+    SQLite allows one writer at a time. Keeping one writer connection makes
+    concurrent writes queue on the pool instead of failing with
+    ``database is locked``. Under WAL, readers opened with ``mode=ro`` never
+    block the writer or each other.
+    """
+    writer: Engine
+    reader: Engine
+
+    @property
+    def is_split(self) -> bool:
+        return self.reader is not self.writer
+
+    def dispose(self) -> None:
+        self.writer.dispose()
+        if self.is_split:
+            self.reader.dispose()
+
+
+def _read_only_url(database_url: str) -> URL | None:
+    url = make_url(database_url)
+    if url.get_backend_name() != "sqlite" or url.database in (None, "", ":memory:") or url.query.get("uri"):
+        return None
+    path = quote(str(Path(url.database).resolve()))
+    return url.set(database=f"file:{path}", query={**url.query, "mode": "ro", "uri": "true"})
+
+
+def create_read_write_engines(database_url: str, profile: SQLiteStorageProfile, read_pool_size: int = 8) -> ReadWriteEngines:
+    """Create the writer and read-only engines for ``database_url``.
+
+    In-memory databases, URI filenames and other backends cannot be reopened
+    read-only, so the writer engine is used for both.
+    """
+    read_only_url = _read_only_url(database_url)
+    if read_only_url is None:
+        engine = create_engine(database_url, echo=False)
+        apply_storage_profile(engine, profile)
+        return ReadWriteEngines(writer=engine, reader=engine)
+
+    writer = create_engine(database_url, echo=False, pool_size=1, max_overflow=0)
+    apply_storage_profile(writer, profile)
+    # The journal mode is persistent and owned by the writer; a read-only
+    # connection cannot change it.
+    reader = create_engine(read_only_url, echo=False, pool_size=read_pool_size, max_overflow=0)
+    apply_storage_profile(reader, dataclasses.replace(profile, journal_mode=None))
+    return ReadWriteEngines(writer=writer, reader=reader)
@@ -0,0 +1,29 @@
+"""Export the tables used by the DuckDB analytics adapter to Parquet.
+
+    python -m src.scripts.export_analytics_snapshot :database.db: analytics/
+
+Point ``LEGO_ANALYTICS_SOURCE`` at the output directory to serve analytics
+from the export. Re-run it periodically; each file is replaced atomically.
+"""
+import time
+from pathlib import Path
+
+import typer
+
+from src.ports.repositories.duckdb_analytics_repository import export_parquet
+
+
+def main(
+    database_path: Path = typer.Argument(..., exists=True, dir_okay=False, help="SQLite database file to export"),
+    output_dir: Path = typer.Argument(Path("analytics"), help="Directory receiving one Parquet file per table"),
+):
+    """
+    Export users, inventories and sets to Parquet for analytics.
+    """
+    started = time.perf_counter()
+    written = export_parquet(database_path, output_dir)
+    typer.echo(f"Wrote {len(written)} tables to {output_dir} in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,39 @@
+"""Dump the catalogue and every inventory to a columnar snapshot file.
+
+    python -m src.scripts.export_columnar_snapshot --database-url sqlite:///large.db --output lego.snapshot
+
+Open the result with ``SnapshotBricksRepository(ColumnarSnapshot(path))``; the
+file is memory-mapped, so loading it does not depend on its size.
+"""
+import time
+from pathlib import Path
+
+import typer
+from sqlmodel import create_engine
+
+from src.ports.repositories.columnar_snapshot import export_snapshot
+
+DEFAULT_DATABASE_URL = "sqlite:///:database.db:"
+
+
+def main(
+    database_url: str = typer.Option(DEFAULT_DATABASE_URL, help="SQLAlchemy URL of the source database"),
+    output: Path = typer.Option(Path("lego.snapshot"), help="Snapshot file to write"),
+    catalog_only: bool = typer.Option(False, help="Only export the catalogue and its index, e.g. for LEGO_SHARED_CATALOG"),
+):
+    """
+    Export colours, shapes, parts, sets, inventories and users to a snapshot.
+    """
+    started = time.perf_counter()
+    engine = create_engine(database_url, echo=False)
+    with engine.connect() as connection:
+        summary = export_snapshot(connection, output, include_inventories=not catalog_only)
+    engine.dispose()
+    typer.echo(
+        f"Wrote {summary.users} users, {summary.inventories} inventories, {summary.sets} sets and {summary.parts} parts "
+        f"to {output} ({summary.bytes / 1024 / 1024:.1f} MiB, version {summary.version}) in {time.perf_counter() - started:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,244 @@
+"""Generate a synthetic LEGO dataset for scale and performance testing.
+
+Rows are written with bulk ``executemany`` inserts and explicit primary keys,
+so no per-row round trips through the repository are needed. Part popularity,
+inventory sizes, set sizes and quantities all follow Zipf distributions, and
+the same ``--seed`` always produces the same database.
+
+    python -m src.scripts.generate_large_dataset --users 1000000 --sets 20000 --parts 50000
+"""
+import bisect
+import itertools
+import random
+import time
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+
+import typer
+from sqlalchemy import Connection, Engine, func, select
+from sqlmodel import SQLModel, create_engine
+
+from src.ports.repositories.sqlite_storage_profiles import STORAGE_PROFILES
+from src.ports.repositories.sql_brick_repository_schema import (
+    Colour,
+    Shape,
+    SetPartLink,
+    InventoryPartLink,
+    Part,
+    Set,
+    User,
+    Inventory,
+)
+from src.domain.use_cases.sketches import SketchSettings
+from src.ports.repositories.sql_part_usage import rebuild_part_usage
+from src.ports.repositories.sql_usage_sketches import rebuild_usage_sketches
+
+DEFAULT_DATABASE_URL = "sqlite:///:database.db:"
+BATCH_SIZE = 50_000
+
+COLOUR_NAMES = [
+    "Red", "Blue", "Yellow", "Black", "White", "Green", "Orange", "Tan", "Brown", "Light Grey",
+    "Dark Grey", "Lime", "Azure", "Pink", "Purple", "Dark Red", "Dark Blue", "Sand Green",
+    "Olive", "Magenta", "Medium Blue", "Dark Tan", "Coral", "Teal", "Trans Clear",
+]
+SHAPE_NAMES = [
+    "Brick 1x1", "Brick 1x2", "Brick 1x4", "Brick 2x2", "Brick 2x4", "Plate 1x1", "Plate 1x2",
+    "Plate 2x2", "Plate 2x4", "Tile 1x1", "Tile 1x2", "Tile 2x2", "Slope 45 2x1", "Slope 45 2x2",
+    "Round Brick 1x1", "Round Plate 1x1", "Technic Pin", "Technic Beam 3", "Hinge Plate",
+    "Wedge Plate 2x3", "Arch 1x4", "Cone 1x1", "Bracket 1x2", "Jumper Plate", "Grille Tile",
+]
+
+
+@dataclass
+class DatasetSummary:
+    users: int
+    sets: int
+    parts: int
+    inventory_links: int
+    set_links: int
+    seconds: float
+
+
+class ZipfSampler:
+    """Draws values with probability proportional to ``1 / rank ** exponent``.
+
+    ``values`` are listed in rank order, so the first value is the most likely.
+    """
+
+    def __init__(self, values: list[int], exponent: float, rng: random.Random):
+        self.values = values
+        self.rng = rng
+        self.cum_weights = list(itertools.accumulate(1.0 / rank ** exponent for rank in range(1, len(values) + 1)))
+        self.total = self.cum_weights[-1]
+
+    def sample(self) -> int:
+        index = bisect.bisect_left(self.cum_weights, self.rng.random() * self.total)
+        return self.values[min(index, len(self.values) - 1)]
+
+    def sample_distinct(self, count: int) -> list[int]:
+        """Return up to ``count`` distinct values; popular values dominate small samples."""
+        count = min(count, len(self.values))
+        chosen = dict.fromkeys(self.rng.choices(self.values, cum_weights=self.cum_weights, k=count))
+        # Redraw to top up after collisions, bounded so very skewed exponents still finish.
+        for _ in range(3):
+            if len(chosen) >= count:
+                break
+            chosen.update(dict.fromkeys(self.rng.choices(self.values, cum_weights=self.cum_weights, k=count - len(chosen))))
+        return list(chosen)
+
+
+def _batched(rows: Iterable[tuple], size: int = BATCH_SIZE) -> Iterator[list[tuple]]:
+    iterator = iter(rows)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+def _bulk_insert(connection: Connection, table: str, columns: tuple[str, ...], rows: Iterable[tuple]) -> int:
+    statement = f'INSERT INTO "{table}" ({", ".join(columns)}) VALUES ({", ".join("?" for _ in columns)})'
+    inserted = 0
+    for batch in _batched(rows):
+        connection.exec_driver_sql(statement, batch)
+        inserted += len(batch)
+    return inserted
+
+
+def _table_is_empty(connection: Connection, model: type[SQLModel]) -> bool:
+    return connection.execute(select(func.count()).select_from(model)).scalar_one() == 0
+
+
+def generate_dataset(
+    engine: Engine,
+    users: int,
+    sets: int,
+    parts: int,
+    seed: int = 42,
+    zipf_exponent: float = 1.1,
+    max_inventory_parts: int = 200,
+    max_set_parts: int = 100,
+    max_quantity: int = 50,
+    sketch_settings: SketchSettings = SketchSettings(),
+) -> DatasetSummary:
+    """Fill an empty database with a reproducible synthetic dataset.
+
+    Inventory ``n`` belongs to user ``n``; part ids are ``1..parts`` and their
+    popularity ranks are shuffled so part id order carries no meaning. The
+    usage sketches are built with ``sketch_settings``, which should be the
+    ones the API runs with.
+    """
+    started = time.perf_counter()
+    rng = random.Random(seed)
+    SQLModel.metadata.create_all(engine)
+
+    part_ids = list(range(1, parts + 1))
+    popularity_order = part_ids[:]
+    rng.shuffle(popularity_order)
+    part_sampler = ZipfSampler(popularity_order, zipf_exponent, rng)
+    inventory_size_sampler = ZipfSampler(list(range(1, max_inventory_parts + 1)), zipf_exponent, rng)
+    set_size_sampler = ZipfSampler(list(range(1, max_set_parts + 1)), zipf_exponent, rng)
+    quantity_sampler = ZipfSampler(list(range(1, max_quantity + 1)), zipf_exponent, rng)
+
+    colour_count = len(COLOUR_NAMES)
+    shape_count = len(SHAPE_NAMES)
+
+    def part_rows() -> Iterator[tuple]:
+        for part_id in part_ids:
+            colour_id = (part_id - 1) % colour_count + 1
+            shape_id = (part_id - 1) // colour_count % shape_count + 1
+            name = f"{COLOUR_NAMES[colour_id - 1]} {SHAPE_NAMES[shape_id - 1]} #{part_id}"
+            yield (part_id, name, shape_id, colour_id)
+
+    def link_rows(owner_ids: Iterable[int], size_sampler: ZipfSampler) -> Iterator[tuple]:
+        for owner_id in owner_ids:
+            for part_id in part_sampler.sample_distinct(size_sampler.sample()):
+                yield (owner_id, part_id, quantity_sampler.sample())
+
+    with engine.begin() as connection:
+        for model in (Colour, Shape, Part, Set, User, Inventory):
+            if not _table_is_empty(connection, model):
+                raise ValueError(f"Table '{model.__tablename__}' is not empty; generate into a fresh database")
+
+        # Bulk loads are throwaway: skip the rollback journal and fsyncs.
+        for pragma in STORAGE_PROFILES["bulk_load"].pragma_statements():
+            connection.exec_driver_sql(pragma)
+
+        _bulk_insert(connection, Colour.__tablename__, ("id", "name"), enumerate(COLOUR_NAMES, start=1))
+        _bulk_insert(connection, Shape.__tablename__, ("id", "name"), enumerate(SHAPE_NAMES, start=1))
+        _bulk_insert(connection, Part.__tablename__, ("id", "name", "shape_id", "colour_id"), part_rows())
+
+        _bulk_insert(connection, Set.__tablename__, ("id", "name"), ((set_id, f"Set {set_id}") for set_id in range(1, sets + 1)))
+        set_links = _bulk_insert(
+            connection,
+            SetPartLink.__tablename__,
+            ("set_id", "part_id", "quantity"),
+            link_rows(range(1, sets + 1), set_size_sampler),
+        )
+
+        _bulk_insert(connection, Inventory.__tablename__, ("id",), ((inventory_id,) for inventory_id in range(1, users + 1)))
+        inventory_links = _bulk_insert(
+            connection,
+            InventoryPartLink.__tablename__,
+            ("inventory_id", "part_id", "quantity"),
+            link_rows(range(1, users + 1), inventory_size_sampler),
+        )
+        _bulk_insert(
+            connection,
+            User.__tablename__,
+            ("id", "name", "inventory_id"),
+            ((user_id, f"User {user_id}", user_id) for user_id in range(1, users + 1)),
+        )
+        # Bulk inserts bypass the repository, which otherwise maintains these statistics.
+        rebuild_part_usage(connection)
+        rebuild_usage_sketches(connection, sketch_settings)
+
+    return DatasetSummary(
+        users=users,
+        sets=sets,
+        parts=parts,
+        inventory_links=inventory_links,
+        set_links=set_links,
+        seconds=time.perf_counter() - started,
+    )
+
+
+def main(
+    users: int = typer.Option(1_000, min=1, help="Number of users (one inventory each)"),
+    sets: int = typer.Option(100, min=1, help="Number of sets in the catalogue"),
+    parts: int = typer.Option(500, min=1, help="Number of distinct parts"),
+    seed: int = typer.Option(42, help="Random seed; equal seeds give identical datasets"),
+    zipf_exponent: float = typer.Option(1.1, min=0.0, help="Skew of part popularity and sizes"),
+    max_inventory_parts: int = typer.Option(200, min=1, help="Upper bound of distinct parts per inventory"),
+    max_set_parts: int = typer.Option(100, min=1, help="Upper bound of distinct parts per set"),
+    max_quantity: int = typer.Option(50, min=1, help="Upper bound of the quantity of a single part"),
+    database_url: str = typer.Option(DEFAULT_DATABASE_URL, help="SQLAlchemy URL of the target database"),
+    relative_error: float = typer.Option(0.02, envvar="LEGO_SKETCH_RELATIVE_ERROR", help="Relative error of distinct user counts in the usage sketches"),
+    epsilon: float = typer.Option(0.001, envvar="LEGO_SKETCH_EPSILON", help="Per-part owner count error of the usage sketches, as a fraction of all ownerships"),
+):
+    """
+    Generate a synthetic dataset into an empty database.
+    """
+    engine = create_engine(database_url, echo=False)
+    try:
+        summary = generate_dataset(
+            engine,
+            users=users,
+            sets=sets,
+            parts=parts,
+            seed=seed,
+            zipf_exponent=zipf_exponent,
+            max_inventory_parts=max_inventory_parts,
+            max_set_parts=max_set_parts,
+            max_quantity=max_quantity,
+            sketch_settings=SketchSettings.from_error(relative_error, epsilon),
+        )
+    except ValueError as e:
+        typer.echo(f"Error: {e}", err=True)
+        raise typer.Exit(1)
+
+    typer.echo(
+        f"Generated {summary.users} users, {summary.sets} sets and {summary.parts} parts "
+        f"({summary.inventory_links} inventory rows, {summary.set_links} set rows) in {summary.seconds:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    typer.run(main)
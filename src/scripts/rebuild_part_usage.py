@@ -0,0 +1,43 @@
+"""Recompute the ``partusage`` statistics table and the usage sketches from the links of every user's inventory.
+
+    python -m src.scripts.rebuild_part_usage --database-url sqlite:///large.db
+
+Only needed for databases created before these tables existed, or after
+changing the sketch error bounds; the API keeps both up to date on every
+inventory write afterwards.
+"""
+import time
+
+import typer
+from sqlmodel import SQLModel, create_engine
+
+from src.domain.use_cases.sketches import SketchSettings
+from src.ports.repositories.sql_part_usage import rebuild_part_usage
+from src.ports.repositories.sql_usage_sketches import rebuild_usage_sketches
+
+DEFAULT_DATABASE_URL = "sqlite:///:database.db:"
+
+
+def main(
+    database_url: str = typer.Option(DEFAULT_DATABASE_URL, help="SQLAlchemy URL of the database"),
+    relative_error: float = typer.Option(0.02, envvar="LEGO_SKETCH_RELATIVE_ERROR", help="Relative error of distinct user counts"),
+    epsilon: float = typer.Option(0.001, envvar="LEGO_SKETCH_EPSILON", help="Per-part owner count error, as a fraction of all ownerships"),
+):
+    """
+    Rebuild the per-part owner count, total and minimum quantity, then the usage sketches.
+    """
+    started = time.perf_counter()
+    engine = create_engine(database_url, echo=False)
+    SQLModel.metadata.create_all(engine)
+    with engine.begin() as connection:
+        parts = rebuild_part_usage(connection)
+        sketches = rebuild_usage_sketches(connection, SketchSettings.from_error(relative_error, epsilon))
+    engine.dispose()
+    typer.echo(
+        f"Rebuilt usage statistics of {parts} parts and sketches of ~{sketches.users.count()} users "
+        f"in {time.perf_counter() - started:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    typer.run(main)
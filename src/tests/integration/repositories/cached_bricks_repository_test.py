@@ -0,0 +1,149 @@
+import pytest
+from sqlmodel import Session, SQLModel, select
+
+from src.domain.entities.colour import Colour
+from src.domain.entities.inventory import Inventory, InventoryItem
+from src.domain.entities.part import Part
+from src.domain.entities.set import Set, SetItem
+from src.domain.entities.shape import Shape
+from src.domain.entities.user import User
+from src.ports.repositories.cached_bricks_repository import CachedBricksRepository, RepositoryCache
+from src.ports.repositories.sql_brick_repository import SQLBrickRepository
+from src.ports.repositories.sql_brick_repository_schema import ChangeLog
+from src.ports.repositories.sql_change_log import ChangeLogPoller
+from src.ports.repositories.sqlite_read_write_engines import create_read_write_engines
+from src.ports.repositories.sqlite_storage_profiles import STORAGE_PROFILES
+
+
+@pytest.fixture
+def database_url(tmp_path):
+    return f"sqlite:///{tmp_path / 'changes.db'}"
+
+
+@pytest.fixture
+def workers(database_url):
+    """Two sets of engines on one file, standing in for two worker processes."""
+    first = create_read_write_engines(database_url, STORAGE_PROFILES["wal"], read_pool_size=2)
+    SQLModel.metadata.create_all(first.writer)
+    second = create_read_write_engines(database_url, STORAGE_PROFILES["wal"], read_pool_size=2)
+    yield first, second
+    first.dispose()
+    second.dispose()
+
+
+def _repository(engines, cache: RepositoryCache) -> CachedBricksRepository:
+    return CachedBricksRepository(
+        SQLBrickRepository(Session(engines.writer, expire_on_commit=False), Session(engines.reader, expire_on_commit=False)),
+        cache,
+    )
+
+
+def _part(repository) -> Part:
+    colour = repository.create_colour(Colour(name="Red"))
+    shape = repository.create_shape(Shape(name="2x4 Brick"))
+    return repository.create_part(Part(name="Red 2x4 Brick", colour=colour, shape=shape))
+
+
+def test_writes_append_to_the_change_log(workers):
+    engines, _ = workers
+    repository = SQLBrickRepository(Session(engines.writer, expire_on_commit=False))
+    part = _part(repository)
+    lego_set = repository.create_set(Set(name="House", parts=[SetItem(part=part, quantity=2)]))
+    user = repository.create_user(User(name="alice", inventory=Inventory(parts=[InventoryItem(part=part, quantity=1)])))
+
+    with Session(engines.writer) as session:
+        changes = [(change.entity_type, change.entity_id) for change in session.exec(select(ChangeLog).order_by(ChangeLog.version))]
+
+    assert changes == [
+        ("colour", part.colour.id),
+        ("shape", part.shape.id),
+        ("part", part.id),
+        ("set", lego_set.id),
+        ("inventory", user.inventory.id),
+        ("user", user.id),
+    ]
+
+
+def test_other_worker_write_invalidates_only_dependent_entries(workers):
+    first_engines, second_engines = workers
+    writer = _repository(second_engines, RepositoryCache())
+    part = _part(writer)
+    house = writer.create_set(Set(name="House", parts=[SetItem(part=part, quantity=2)]))
+
+    cache = RepositoryCache(poller=ChangeLogPoller(first_engines.reader, poll_interval_seconds=0))
+    reader = _repository(first_engines, cache)
+    assert [lego_set.name for lego_set in reader.get_all_sets()] == ["House"]
+    assert reader.get_set_by_id(house.id).name == "House"
+
+    writer.create_set(Set(name="Car", parts=[SetItem(part=part, quantity=4)]))
+
+    assert [lego_set.name for lego_set in reader.get_all_sets()] == ["House", "Car"]
+    hits = cache.hits
+    assert reader.get_set_by_id(house.id).name == "House"
+    assert cache.hits == hits + 1
+    cache.poller.close()
+
+
+def test_own_writes_are_visible_without_polling(workers):
+    engines, _ = workers
+    cache = RepositoryCache()
+    repository = _repository(engines, cache)
+
+    assert repository.get_all_colours() == []
+    red = repository.create_colour(Colour(name="Red"))
+
+    assert repository.get_all_colours() == [red]
+
+
+def test_set_demand_is_cached_until_an_inventory_changes(workers):
+    engines, _ = workers
+    cache = RepositoryCache()
+    repository = _repository(engines, cache)
+    part = _part(repository)
+    house = repository.create_set(Set(name="House", parts=[SetItem(part=part, quantity=2)]))
+    user = repository.create_user(User(name="alice", inventory=Inventory(parts=[InventoryItem(part=part, quantity=1)])))
+
+    assert repository.get_set_demand(house.id).users_by_missing_pieces == {1: 1}
+    hits = cache.hits
+    assert repository.get_set_demand(house.id).missing_by_part == {part.id: 1}
+    assert cache.hits == hits + 1
+
+    repository.apply_inventory_deltas(user.inventory.id, {part.id: 1})
+
+    assert repository.get_set_demand(house.id).users_by_missing_pieces == {0: 1}
+
+
+def test_cache_evicts_least_recently_used_entries():
+    cache = RepositoryCache(max_entries=2)
+    cache.get_or_load("a", lambda: 1, lambda value: [("set", 1)])
+    cache.get_or_load("b", lambda: 2, lambda value: [("set", 2)])
+    cache.get_or_load("a", lambda: 1, lambda value: [("set", 1)])
+    cache.get_or_load("c", lambda: 3, lambda value: [("set", 3)])
+
+    assert len(cache) == 2
+    assert cache.get_or_load("a", lambda: None, lambda value: []) == 1
+    assert cache.get_or_load("b", lambda: None, lambda value: []) is None
+
+
+def test_load_overtaken_by_an_invalidation_is_not_stored():
+    cache = RepositoryCache()
+
+    def load_then_change():
+        # Another request commits a write to the same inventory while this one is loading.
+        cache.invalidate("inventory", 7)
+        return "stale"
+
+    assert cache.get_or_load("inventory", load_then_change, lambda value: [("inventory", 7)]) == "stale"
+    assert cache.get_or_load("inventory", lambda: "fresh", lambda value: [("inventory", 7)]) == "fresh"
+    assert cache.get_or_load("inventory", lambda: None, lambda value: []) == "fresh"
+
+    cache.get_or_load("listing", load_then_change, lambda value: [("inventory", None)])
+    assert cache.get_or_load("listing", lambda: None, lambda value: []) is None
+
+
+def test_hits_share_the_cached_value():
+    cache = RepositoryCache()
+    loaded = cache.get_or_load("sets", lambda: [Set(name="House", parts=[])], lambda value: [("set", None)])
+
+    assert cache.get_or_load("sets", lambda: None, lambda value: []) is loaded
+    assert cache.get_or_load("sets", lambda: None, lambda value: []) is loaded
@@ -0,0 +1,56 @@
+import pytest
+
+from src.domain.entities.colour import Colour
+from src.domain.entities.inventory import Inventory, InventoryItem
+from src.domain.entities.part import Part
+from src.domain.entities.set import Set, SetItem
+from src.domain.entities.shape import Shape
+from src.domain.entities.user import User
+from src.ports.repositories.columnar_snapshot import ColumnarSnapshot, export_snapshot
+from src.ports.repositories.snapshot_bricks_repository import SnapshotBricksRepository
+
+
+@pytest.fixture
+def snapshot_repository(in_memory_session, brick_repository, tmp_path):
+    red = brick_repository.create_colour(Colour(name="Red"))
+    small = brick_repository.create_shape(Shape(name="Small Brick"))
+    brick = brick_repository.create_part(Part(name="Red Brick", colour=red, shape=small))
+    plate = brick_repository.create_part(Part(name="Red Plate Ünïcode", colour=red, shape=small))
+    brick_repository.create_set(Set(name="Small Set", parts=[SetItem(part=brick, quantity=4), SetItem(part=plate, quantity=1)]))
+    brick_repository.create_set(Set(name="Empty Set"))
+    brick_repository.create_user(User(name="User 1", inventory=Inventory(parts=[InventoryItem(part=brick, quantity=5)])))
+    brick_repository.create_user(User(name="User 2", inventory=Inventory()))
+
+    path = tmp_path / "lego.snapshot"
+    summary = export_snapshot(in_memory_session.connection(), path)
+    assert (summary.parts, summary.sets, summary.users) == (2, 2, 2)
+
+    snapshot = ColumnarSnapshot(path)
+    yield SnapshotBricksRepository(snapshot)
+    snapshot.close()
+
+
+def test_snapshot_matches_database(snapshot_repository, brick_repository):
+    assert snapshot_repository.get_all_sets() == brick_repository.get_all_sets()
+    assert snapshot_repository.get_all_parts() == brick_repository.get_all_parts()
+    assert snapshot_repository.get_all_colours() == brick_repository.get_all_colours()
+    assert snapshot_repository.get_user_by_id(1) == brick_repository.get_user_by_id(1)
+    assert snapshot_repository.get_user_by_name("User 2") == brick_repository.get_user_by_name("User 2")
+    assert snapshot_repository.get_set_by_name("Small Set") == brick_repository.get_set_by_name("Small Set")
+
+def test_missing_ids_return_none(snapshot_repository):
+    assert snapshot_repository.get_set_by_id(99) is None
+    assert snapshot_repository.get_user_by_id(0) is None
+    assert snapshot_repository.get_user_by_name("Nobody") is None
+    assert snapshot_repository.get_parts_by_set_id(99) == []
+
+def test_snapshot_is_read_only(snapshot_repository):
+    with pytest.raises(NotImplementedError):
+        snapshot_repository.create_colour(Colour(name="Blue"))
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "not.snapshot"
+    path.write_bytes(b"SQLite format 3\0" + b"\0" * 100)
+
+    with pytest.raises(ValueError, match="not a LEGO snapshot"):
+        ColumnarSnapshot(path)
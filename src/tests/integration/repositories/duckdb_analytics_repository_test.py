@@ -0,0 +1,51 @@
+import pytest
+
+duckdb = pytest.importorskip("duckdb")
+
+from src.ports.repositories.duckdb_analytics_repository import DuckDBAnalyticsRepository
+
+
+@pytest.fixture
+def analytics_repository(tmp_path):
+    # Same shape as the SQLite tables: users 1 and 2 can build set 1, nobody
+    # can build set 2 and everybody can build the empty set 3. Parts listed
+    # with quantity 0 are no requirement.
+    connection = duckdb.connect()
+    connection.execute("""
+        CREATE TABLE "user" AS SELECT * FROM (VALUES (1, 'User 1', 1), (2, 'User 2', 2), (3, 'User 3', 3), (4, 'User 4', 4)) t(id, name, inventory_id);
+        CREATE TABLE inventorypartlink AS SELECT * FROM (VALUES
+            (1, 1, 4), (1, 2, 2), (1, 3, 1),
+            (2, 1, 4), (2, 2, 2), (2, 3, 1),
+            (3, 4, 6), (3, 5, 4),
+            (4, 6, 10)
+        ) t(inventory_id, part_id, quantity);
+        CREATE TABLE "set" AS SELECT * FROM (VALUES (1, 'Small Set'), (2, 'Big Set'), (3, 'Empty Set')) t(id, name);
+        CREATE TABLE setpartlink AS SELECT * FROM (VALUES
+            (1, 1, 4), (1, 2, 2), (1, 3, 1), (1, 6, 0),
+            (2, 1, 5), (2, 2, 3), (2, 3, 2), (2, 4, 6), (2, 5, 4),
+            (3, 4, 0)
+        ) t(set_id, part_id, quantity);
+    """)
+    for table in ("user", "inventorypartlink", "set", "setpartlink"):
+        connection.execute(f"COPY \"{table}\" TO '{(tmp_path / f'{table}.parquet').as_posix()}' (FORMAT parquet)")
+    connection.close()
+
+    repository = DuckDBAnalyticsRepository.from_parquet(tmp_path)
+    yield repository
+    repository.close()
+
+
+def test_part_usage(analytics_repository):
+    assert analytics_repository.count_users() == 4
+    assert analytics_repository.get_part_usage() == {1: (2, 4), 2: (2, 2), 3: (2, 1), 4: (1, 6), 5: (1, 4), 6: (1, 10)}
+
+def test_buildable_user_counts(analytics_repository):
+    assert analytics_repository.get_buildable_user_counts() == {1: 2, 2: 0, 3: 4}
+
+def test_missing_part_demand(analytics_repository):
+    assert analytics_repository.get_missing_part_demand(2) == {1: 12, 2: 8, 3: 6, 4: 18, 5: 12}
+    assert analytics_repository.get_missing_part_demand(3) == {}
+
+def test_missing_export_file_is_rejected(tmp_path):
+    with pytest.raises(ValueError, match="missing"):
+        DuckDBAnalyticsRepository.from_parquet(tmp_path)
@@ -0,0 +1,73 @@
+import pytest
+
+from src.domain.entities.colour import Colour
+from src.domain.entities.part import Part
+from src.domain.entities.set import Set, SetItem
+from src.domain.entities.shape import Shape
+from src.domain.use_cases.catalog_index import CatalogIndex
+from src.ports.repositories.columnar_snapshot import export_snapshot
+from src.ports.repositories.shared_catalog import SharedCatalog
+
+
+@pytest.fixture
+def parts(brick_repository) -> list[Part]:
+    red = brick_repository.create_colour(Colour(name="Red"))
+    small = brick_repository.create_shape(Shape(name="Small Brick"))
+    return [brick_repository.create_part(Part(name=f"Part {index}", colour=red, shape=small)) for index in range(3)]
+
+
+def test_mapped_index_matches_in_memory_index(in_memory_session, brick_repository, parts, tmp_path):
+    brick_repository.create_set(Set(name="Small Set", parts=[SetItem(part=parts[0], quantity=2), SetItem(part=parts[1], quantity=1)]))
+    brick_repository.create_set(Set(name="Other Set", parts=[SetItem(part=parts[1], quantity=3), SetItem(part=parts[2], quantity=0)]))
+    brick_repository.create_set(Set(name="Empty Set"))
+    export_snapshot(in_memory_session.connection(), tmp_path / "catalog.snapshot", include_inventories=False)
+
+    mapped = SharedCatalog(tmp_path / "catalog.snapshot").current()
+    in_memory = CatalogIndex.from_sets(brick_repository.get_all_sets())
+
+    for inventory_parts in ({}, {parts[0].id: 2, parts[1].id: 1}, {parts[1].id: 5}, {parts[0].id: 9, parts[1].id: 9}):
+        assert mapped.buildable_sets(inventory_parts) == in_memory.buildable_sets(inventory_parts)
+        assert mapped.closest_set_indices(inventory_parts, 2) == in_memory.closest_set_indices(inventory_parts, 2)
+        assert mapped.buildable_copies(inventory_parts) == in_memory.buildable_copies(inventory_parts)
+    assert list(mapped.requirements) == [tuple(pairs) for pairs in in_memory.requirements]
+
+def test_remaps_when_a_newer_version_replaces_the_file(in_memory_session, brick_repository, parts, tmp_path):
+    path = tmp_path / "catalog.snapshot"
+    brick_repository.create_set(Set(name="Small Set", parts=[SetItem(part=parts[0], quantity=1)]))
+    export_snapshot(in_memory_session.connection(), path, include_inventories=False, version=1)
+    shared_catalog = SharedCatalog(path, check_interval_seconds=0)
+    first = shared_catalog.current()
+
+    brick_repository.create_set(Set(name="New Set", parts=[SetItem(part=parts[2], quantity=1)]))
+    export_snapshot(in_memory_session.connection(), path, include_inventories=False, version=2)
+    second = shared_catalog.current()
+
+    assert shared_catalog.version == 2
+    assert [lego_set.name for lego_set in second.buildable_sets({parts[0].id: 1, parts[2].id: 1})] == ["Small Set", "New Set"]
+    # Callers still holding the old index keep a working view of the old file.
+    assert [lego_set.name for lego_set in first.buildable_sets({parts[0].id: 1, parts[2].id: 1})] == ["Small Set"]
+
+def test_ignores_files_with_an_older_version(in_memory_session, brick_repository, parts, tmp_path):
+    path = tmp_path / "catalog.snapshot"
+    export_snapshot(in_memory_session.connection(), path, include_inventories=False, version=5)
+    shared_catalog = SharedCatalog(path, check_interval_seconds=0)
+    current = shared_catalog.current()
+
+    export_snapshot(in_memory_session.connection(), path, include_inventories=False, version=4)
+
+    assert shared_catalog.current() is current
+    assert shared_catalog.version == 5
+
+def test_missing_file_keeps_the_last_mapping(in_memory_session, brick_repository, parts, tmp_path):
+    path = tmp_path / "catalog.snapshot"
+    with pytest.raises(FileNotFoundError, match="export_columnar_snapshot"):
+        SharedCatalog(path).current()
+
+    brick_repository.create_set(Set(name="Small Set", parts=[SetItem(part=parts[0], quantity=1)]))
+    export_snapshot(in_memory_session.connection(), path, include_inventories=False, version=1)
+    shared_catalog = SharedCatalog(path, check_interval_seconds=0)
+    shared_catalog.current()
+    path.unlink()
+
+    assert [lego_set.name for lego_set in shared_catalog.current().buildable_sets({parts[0].id: 1})] == ["Small Set"]
+    assert shared_catalog.version == 1
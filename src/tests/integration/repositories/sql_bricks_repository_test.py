@@ -8,6 +8,7 @@ from src.domain.entities.set import Set as DomainSet
 from src.domain.entities.set import SetItem as DomainSetItem
 from src.domain.entities.colour import Colour as DomainColour
 from src.domain.entities.shape import Shape as DomainShape 
+from src.domain.entities.set_demand import summarise_set_demand
 from src.ports.repositories.bricks_repository import BricksRepository
 
 def test_create_sample_colour(brick_repository: BricksRepository):
@@ -269,6 +270,37 @@ def test_get_all_users(brick_repository: BricksRepository):
     assert user2_parts[db_blue_brick.id].part.colour.name == "Blue"
     assert user2_parts[db_blue_brick.id].part.shape.name == "2x4 Brick"
 
+def test_get_all_users_pages_by_user(brick_repository: BricksRepository):
+    db_colour = brick_repository.create_colour(DomainColour(name="Red"))
+    db_shape = brick_repository.create_shape(DomainShape(name="2x4 Brick"))
+    parts = [brick_repository.create_part(DomainPart(name=f"Part {i}", colour=db_colour, shape=db_shape)) for i in range(5)]
+    created = [
+        brick_repository.create_user(DomainUser(name=f"user{i}", inventory=DomainInventory(parts=[
+            DomainInventoryItem(part=part, quantity=i + 1) for part in parts[:i]
+        ])))
+        for i in range(6)
+    ]
+
+    users = brick_repository.get_all_users()
+    page = brick_repository.get_all_users(offset=2, limit=3)
+
+    assert [user.id for user in users] == [user.id for user in created]
+    assert [len(user.inventory.parts) for user in users] == [0, 1, 2, 3, 4, 5]
+    assert [user.id for user in page] == [user.id for user in created[2:5]]
+    assert page[2].inventory.parts == users[4].inventory.parts
+
+def test_get_all_sets_pages_by_set(brick_repository: BricksRepository):
+    db_colour = brick_repository.create_colour(DomainColour(name="Red"))
+    db_shape = brick_repository.create_shape(DomainShape(name="2x4 Brick"))
+    parts = [brick_repository.create_part(DomainPart(name=f"Part {i}", colour=db_colour, shape=db_shape)) for i in range(40)]
+    created = [
+        brick_repository.create_set(DomainSet(name=f"Set {i}", parts=[DomainSetItem(part=part, quantity=1) for part in parts]))
+        for i in range(4)
+    ]
+
+    assert [len(lego_set.parts) for lego_set in brick_repository.get_all_sets()] == [40] * 4
+    assert [lego_set.id for lego_set in brick_repository.get_all_sets(offset=1, limit=2)] == [s.id for s in created[1:3]]
+
 def test_get_user_by_name(brick_repository: BricksRepository):
     # Setup colour and shape
     colour = DomainColour(name="Red")
@@ -347,3 +379,137 @@ def test_get_all_parts(brick_repository: BricksRepository):
     assert parts_dict["Red Plate"].shape.name == "1x2 Plate"
 
 
+
+def test_create_user_writes_nothing_when_it_fails(brick_repository: BricksRepository, monkeypatch: pytest.MonkeyPatch):
+    db_colour = brick_repository.create_colour(DomainColour(name="Red"))
+    db_shape = brick_repository.create_shape(DomainShape(name="2x4 Brick"))
+    db_part = brick_repository.create_part(DomainPart(name="Red 2x4 Brick", colour=db_colour, shape=db_shape))
+    changes = brick_repository.get_changes()
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("sketch update failed")
+
+    monkeypatch.setattr(brick_repository, "_update_usage", fail)
+    with pytest.raises(RuntimeError):
+        brick_repository.create_user(DomainUser(
+            name="alice",
+            inventory=DomainInventory(parts=[DomainInventoryItem(part=db_part, quantity=5)]),
+        ))
+
+    assert brick_repository.get_changes() == changes
+    assert brick_repository.get_inventory_by_id(1) is None
+    assert brick_repository.get_part_usage() == []
+
+def test_get_changes_returns_part_deltas_after_cursor(brick_repository: BricksRepository):
+    db_colour = brick_repository.create_colour(DomainColour(name="Red"))
+    db_shape = brick_repository.create_shape(DomainShape(name="2x4 Brick"))
+    db_part = brick_repository.create_part(DomainPart(name="Red 2x4 Brick", colour=db_colour, shape=db_shape))
+    cursor = brick_repository.get_changes()[-1].version
+
+    db_set = brick_repository.create_set(DomainSet(name="House", parts=[DomainSetItem(part=db_part, quantity=3)]))
+    db_user = brick_repository.create_user(DomainUser(
+        name="alice",
+        inventory=DomainInventory(parts=[DomainInventoryItem(part=db_part, quantity=5)]),
+    ))
+
+    changes = brick_repository.get_changes(since=cursor)
+    assert [(c.entity_type, c.entity_id, c.part_deltas) for c in changes] == [
+        ("set", db_set.id, {db_part.id: 3}),
+        ("inventory", db_user.inventory.id, {db_part.id: 5}),
+        ("user", db_user.id, {}),
+    ]
+    assert [c.entity_type for c in brick_repository.get_changes(since=cursor, limit=1)] == ["set"]
+    assert brick_repository.get_changes(since=changes[-1].version) == []
+
+def test_apply_inventory_deltas_upserts_and_removes_parts(brick_repository: BricksRepository):
+    db_colour = brick_repository.create_colour(DomainColour(name="Red"))
+    db_shape = brick_repository.create_shape(DomainShape(name="2x4 Brick"))
+    brick = brick_repository.create_part(DomainPart(name="Red 2x4 Brick", colour=db_colour, shape=db_shape))
+    plate = brick_repository.create_part(DomainPart(name="Red Plate", colour=db_colour, shape=db_shape))
+    tile = brick_repository.create_part(DomainPart(name="Red Tile", colour=db_colour, shape=db_shape))
+    db_user = brick_repository.create_user(DomainUser(
+        name="alice",
+        inventory=DomainInventory(parts=[
+            DomainInventoryItem(part=brick, quantity=5),
+            DomainInventoryItem(part=plate, quantity=2),
+        ]),
+    ))
+
+    version = brick_repository.apply_inventory_deltas(db_user.inventory.id, {brick.id: 3, plate.id: -2, tile.id: 4})
+
+    inventory = brick_repository.get_inventory_by_id(db_user.inventory.id)
+    assert {item.part.id: item.quantity for item in inventory.parts} == {brick.id: 8, tile.id: 4}
+    assert inventory.version == version > db_user.inventory.version
+    assert brick_repository.get_user_by_id(db_user.id).inventory.version == version
+    change = brick_repository.get_changes()[-1]
+    assert change.version == version
+    assert change.part_deltas == {brick.id: 3, plate.id: -2, tile.id: 4}
+    assert brick_repository.apply_inventory_deltas(db_user.inventory.id, {brick.id: -1}) > version
+
+def test_apply_inventory_deltas_logs_the_applied_change(brick_repository: BricksRepository):
+    db_colour = brick_repository.create_colour(DomainColour(name="Red"))
+    db_shape = brick_repository.create_shape(DomainShape(name="2x4 Brick"))
+    brick = brick_repository.create_part(DomainPart(name="Red 2x4 Brick", colour=db_colour, shape=db_shape))
+    plate = brick_repository.create_part(DomainPart(name="Red Plate", colour=db_colour, shape=db_shape))
+    db_user = brick_repository.create_user(DomainUser(
+        name="alice",
+        inventory=DomainInventory(parts=[DomainInventoryItem(part=brick, quantity=3)]),
+    ))
+
+    brick_repository.apply_inventory_deltas(db_user.inventory.id, {brick.id: -10, plate.id: -4})
+
+    assert brick_repository.get_inventory_by_id(db_user.inventory.id).parts == []
+    assert brick_repository.get_changes()[-1].part_deltas == {brick.id: -3}
+
+def test_apply_inventory_deltas_rejects_unknown_parts(brick_repository: BricksRepository):
+    db_user = brick_repository.create_user(DomainUser(name="alice", inventory=DomainInventory(parts=[])))
+
+    with pytest.raises(ValueError, match="Part with id 9999"):
+        brick_repository.apply_inventory_deltas(db_user.inventory.id, {9999: 1})
+    assert brick_repository.get_changes()[-1].entity_type == "user"
+
+def test_get_pooled_inventory_sums_member_inventories(brick_repository: BricksRepository):
+    db_colour = brick_repository.create_colour(DomainColour(name="Red"))
+    db_shape = brick_repository.create_shape(DomainShape(name="2x4 Brick"))
+    brick = brick_repository.create_part(DomainPart(name="Red 2x4 Brick", colour=db_colour, shape=db_shape))
+    plate = brick_repository.create_part(DomainPart(name="Red Plate", colour=db_colour, shape=db_shape))
+    alice = brick_repository.create_user(DomainUser(name="alice", inventory=DomainInventory(parts=[
+        DomainInventoryItem(part=brick, quantity=5), DomainInventoryItem(part=plate, quantity=1),
+    ])))
+    bob = brick_repository.create_user(DomainUser(name="bob", inventory=DomainInventory(parts=[DomainInventoryItem(part=brick, quantity=2)])))
+    brick_repository.create_user(DomainUser(name="carol", inventory=DomainInventory(parts=[DomainInventoryItem(part=plate, quantity=9)])))
+
+    assert brick_repository.get_pooled_inventory([alice.id, bob.id, 9999]) == {brick.id: 7, plate.id: 1}
+    assert brick_repository.get_pooled_inventory([]) == {}
+
+def test_get_set_demand_matches_per_user_computation(brick_repository: BricksRepository):
+    db_colour = brick_repository.create_colour(DomainColour(name="Red"))
+    db_shape = brick_repository.create_shape(DomainShape(name="2x4 Brick"))
+    brick, plate, tile = (
+        brick_repository.create_part(DomainPart(name=name, colour=db_colour, shape=db_shape)) for name in ("Brick", "Plate", "Tile")
+    )
+    house = brick_repository.create_set(DomainSet(name="House", parts=[
+        DomainSetItem(part=brick, quantity=4), DomainSetItem(part=plate, quantity=2),
+    ]))
+    for name, parts in (("alice", [(brick, 5), (plate, 2)]), ("bob", [(brick, 1), (tile, 3)]), ("carol", [(tile, 1)]), ("dave", [(plate, 1)])):
+        brick_repository.create_user(DomainUser(name=name, inventory=DomainInventory(parts=[
+            DomainInventoryItem(part=part, quantity=quantity) for part, quantity in parts
+        ])))
+
+    demand = brick_repository.get_set_demand(house.id)
+
+    assert demand == summarise_set_demand(house, (user.inventory for user in brick_repository.get_all_users()))
+    assert demand.users_by_missing_pieces == {0: 1, 5: 2, 6: 1}
+    assert demand.missing_by_part == {brick.id: 11, plate.id: 5}
+    assert demand.users_within(5) == 2
+    assert brick_repository.get_set_demand(9999) is None
+
+def test_set_demand_sums_duplicate_inventory_parts():
+    brick = DomainPart(id=1, name="Brick", colour=DomainColour(id=1, name="Red"), shape=DomainShape(id=1, name="2x4 Brick"))
+    house = DomainSet(id=1, name="House", parts=[DomainSetItem(part=brick, quantity=4)])
+    inventory = DomainInventory(parts=[DomainInventoryItem(part=brick, quantity=3), DomainInventoryItem(part=brick, quantity=1)])
+
+    demand = summarise_set_demand(house, [inventory])
+
+    assert demand.users_by_missing_pieces == {0: 1}
+    assert demand.missing_by_part == {}
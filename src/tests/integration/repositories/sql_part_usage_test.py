@@ -0,0 +1,146 @@
+from sqlmodel import Session, SQLModel, create_engine
+
+from src.domain.entities.colour import Colour
+from src.domain.entities.inventory import Inventory, InventoryItem
+from src.domain.entities.part import Part
+from src.domain.entities.part_usage import PartUsage
+from src.domain.entities.shape import Shape
+from src.domain.entities.user import User
+from src.domain.use_cases.analyse_buildability import AnalyseBuildability
+from src.domain.use_cases.sketches import SketchSettings
+from src.ports.repositories.sql_brick_repository import SQLBrickRepository
+from src.ports.repositories.sql_part_usage import rebuild_part_usage
+from src.ports.repositories.sql_usage_sketches import _stored_layout, compute_usage_sketches, rebuild_usage_sketches
+
+
+def _user(repository: SQLBrickRepository, name: str, quantities: list[tuple[Part, int]]) -> User:
+    items = [InventoryItem(part=part, quantity=quantity) for part, quantity in quantities]
+    return repository.create_user(User(name=name, inventory=Inventory(parts=items)))
+
+
+def test_part_usage_is_maintained_by_inventory_writes(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'usage.db'}")
+    SQLModel.metadata.create_all(engine)
+    repository = SQLBrickRepository(Session(engine, expire_on_commit=False))
+    colour = repository.create_colour(Colour(name="Red"))
+    shape = repository.create_shape(Shape(name="2x4 Brick"))
+    brick, plate, tile = (repository.create_part(Part(name=name, colour=colour, shape=shape)) for name in ("Brick", "Plate", "Tile"))
+
+    alice = _user(repository, "alice", [(brick, 2), (plate, 5)])
+    bob = _user(repository, "bob", [(brick, 4), (plate, 1)])
+    assert repository.count_users() == 2
+    assert repository.get_part_usage() == [
+        PartUsage(part_id=brick.id, owner_count=2, total_quantity=6, min_quantity=2),
+        PartUsage(part_id=plate.id, owner_count=2, total_quantity=6, min_quantity=1),
+    ]
+
+    # alice raises the brick minimum, bob gives up the plate minimum, tile gets its first owner.
+    repository.apply_inventory_deltas(alice.inventory.id, {brick.id: 5, tile.id: 3})
+    repository.apply_inventory_deltas(bob.inventory.id, {plate.id: -1})
+
+    expected = [
+        PartUsage(part_id=brick.id, owner_count=2, total_quantity=11, min_quantity=4),
+        PartUsage(part_id=plate.id, owner_count=1, total_quantity=5, min_quantity=5),
+        PartUsage(part_id=tile.id, owner_count=1, total_quantity=3, min_quantity=3),
+    ]
+    assert repository.get_part_usage() == expected
+    assert repository.get_part_usage(min_owners=2) == expected[:1]
+
+    with engine.begin() as connection:
+        assert rebuild_part_usage(connection) == 3
+    assert repository.get_part_usage() == expected
+
+
+def test_part_usage_counts_only_inventories_owned_by_users(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'owned.db'}")
+    SQLModel.metadata.create_all(engine)
+    repository = SQLBrickRepository(Session(engine, expire_on_commit=False))
+    colour = repository.create_colour(Colour(name="Red"))
+    shape = repository.create_shape(Shape(name="2x4 Brick"))
+    brick = repository.create_part(Part(name="Brick", colour=colour, shape=shape))
+
+    loose = repository.create_inventory(Inventory(parts=[InventoryItem(part=brick, quantity=1)]))
+    repository.apply_inventory_deltas(loose.id, {brick.id: 2})
+    _user(repository, "alice", [(brick, 4)])
+
+    expected = [PartUsage(part_id=brick.id, owner_count=1, total_quantity=4, min_quantity=4)]
+    assert repository.get_part_usage() == expected
+    assert repository.get_usage_sketches().part_owners.estimate(brick.id) == 1
+    with engine.begin() as connection:
+        assert rebuild_part_usage(connection) == 1
+    assert repository.get_part_usage() == expected
+
+
+def test_parts_above_usage_reach_past_the_first_hundred_parts(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'many_parts.db'}")
+    SQLModel.metadata.create_all(engine)
+    repository = SQLBrickRepository(Session(engine, expire_on_commit=False))
+    colour = repository.create_colour(Colour(name="Red"))
+    shape = repository.create_shape(Shape(name="2x4 Brick"))
+    parts = [repository.create_part(Part(name=f"Part {index}", colour=colour, shape=shape)) for index in range(150)]
+
+    _user(repository, "alice", [(part, 2) for part in parts[95:]])
+    _user(repository, "bob", [(part, 1) for part in parts[120:]])
+
+    used = AnalyseBuildability(repository).get_parts_with_percentage_of_usage(0.5)
+    assert [(part.id, quantity) for part, quantity in used] == [(part.id, 2) for part in parts[95:120]] + [(part.id, 1) for part in parts[120:]]
+    assert [part.id for part, _ in AnalyseBuildability(repository).get_parts_with_percentage_of_usage(1.0)] == [part.id for part in parts[120:]]
+    approximate = AnalyseBuildability(repository).get_parts_with_percentage_of_usage(0.5, approximate=True)
+    assert [(part.id, owners) for part, owners in approximate] == [(part.id, 1) for part in parts[95:120]] + [(part.id, 2) for part in parts[120:]]
+
+
+def test_usage_sketches_are_maintained_by_inventory_writes(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'sketches.db'}")
+    SQLModel.metadata.create_all(engine)
+    repository = SQLBrickRepository(Session(engine, expire_on_commit=False))
+    red = repository.create_colour(Colour(name="Red"))
+    blue = repository.create_colour(Colour(name="Blue"))
+    shape = repository.create_shape(Shape(name="2x4 Brick"))
+    brick = repository.create_part(Part(name="Red Brick", colour=red, shape=shape))
+    plate = repository.create_part(Part(name="Blue Brick", colour=blue, shape=shape))
+
+    alice = _user(repository, "alice", [(brick, 2)])
+    _user(repository, "bob", [(brick, 1), (plate, 3)])
+    _user(repository, "carol", [])
+    repository.apply_inventory_deltas(alice.inventory.id, {brick.id: -2, plate.id: 1})
+
+    sketches = repository.get_usage_sketches()
+    assert sketches.users.count() == 3
+    assert sketches.part_owners.estimate(brick.id) == 1
+    assert sketches.part_owners.estimate(plate.id) == 2
+    assert {shape_id: sketch.count() for shape_id, sketch in sketches.shape_owners.items()} == {shape.id: 2}
+    # HyperLogLog cannot forget: alice still counts as a red owner until the sketches are rebuilt.
+    assert {colour_id: sketch.count() for colour_id, sketch in sketches.colour_owners.items()} == {red.id: 2, blue.id: 2}
+
+    with engine.begin() as connection:
+        rebuild_part_usage(connection)
+        rebuilt = rebuild_usage_sketches(connection, repository.sketch_settings)
+    assert rebuilt.part_owners.counters == sketches.part_owners.counters
+    assert rebuilt.colour_owners[red.id].count() == 1
+    assert repository.get_usage_sketches().users.registers == sketches.users.registers
+
+
+def test_sketches_stored_with_other_settings_are_rebuilt(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'resized.db'}")
+    SQLModel.metadata.create_all(engine)
+    small = SQLBrickRepository(Session(engine, expire_on_commit=False), sketch_settings=SketchSettings(hll_precision=10, cms_width=101, cms_depth=3))
+    colour = small.create_colour(Colour(name="Red"))
+    shape = small.create_shape(Shape(name="2x4 Brick"))
+    brick, plate = (small.create_part(Part(name=name, colour=colour, shape=shape)) for name in ("Brick", "Plate"))
+    alice = _user(small, "alice", [(brick, 2)])
+    _user(small, "bob", [(brick, 1), (plate, 3)])
+
+    large = SQLBrickRepository(Session(engine, expire_on_commit=False))
+    with engine.begin() as connection:
+        expected = compute_usage_sketches(connection, large.sketch_settings)
+    read = large.get_usage_sketches()
+    assert read.part_owners.counters == expected.part_owners.counters
+    assert read.users.registers == expected.users.registers
+
+    large.apply_inventory_deltas(alice.inventory.id, {plate.id: 1})
+    with engine.begin() as connection:
+        assert _stored_layout(connection) == (12, 2719, 5)
+        expected = compute_usage_sketches(connection, large.sketch_settings)
+    stored = large.get_usage_sketches()
+    assert stored.part_owners.counters == expected.part_owners.counters
+    assert stored.part_owners.estimate(plate.id) == 2
@@ -0,0 +1,65 @@
+import json
+import logging
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlmodel import SQLModel, Session, create_engine
+
+from src.domain.entities.colour import Colour as DomainColour
+from src.ports.repositories.sql_brick_repository import SQLBrickRepository
+from src.ports.repositories.sql_slow_query_log import SlowQueryLog
+
+
+@pytest.fixture
+def logged_repository() -> SQLBrickRepository:
+    engine = create_engine("sqlite:///:memory:", echo=False)
+    SQLModel.metadata.create_all(engine)
+    SlowQueryLog(threshold_seconds=0.0, min_interval_seconds=3600).install(engine)
+    with Session(engine, expire_on_commit=False) as session:
+        yield SQLBrickRepository(session)
+
+def _slow_query_records(caplog: pytest.LogCaptureFixture) -> list[dict]:
+    return [json.loads(r.getMessage()) for r in caplog.records if r.name == "lego.slow_queries"]
+
+def test_slow_query_is_logged_with_query_plan(logged_repository: SQLBrickRepository, caplog: pytest.LogCaptureFixture):
+    logged_repository.create_colour(DomainColour(name="Red"))
+    caplog.clear()
+
+    with caplog.at_level(logging.WARNING, logger="lego.slow_queries"):
+        logged_repository.get_user_by_id(1)
+
+    records = _slow_query_records(caplog)
+    assert len(records) == 1
+    assert records[0]["sql"].lstrip().startswith("SELECT")
+    assert records[0]["parameters"] == "(1,)"
+    assert any("user" in line for line in records[0]["plan"])
+
+def test_repeated_slow_query_is_rate_limited(logged_repository: SQLBrickRepository, caplog: pytest.LogCaptureFixture):
+    with caplog.at_level(logging.WARNING, logger="lego.slow_queries"):
+        logged_repository.get_all_colours()
+        logged_repository.get_all_colours()
+        logged_repository.get_all_colours()
+
+    statements = [record["sql"] for record in _slow_query_records(caplog)]
+    assert len(statements) == len(set(statements))
+
+def test_failed_statement_does_not_leak_its_start_time():
+    engine = create_engine("sqlite:///:memory:", echo=False)
+    SlowQueryLog(threshold_seconds=3600).install(engine)
+    with engine.connect() as connection:
+        with pytest.raises(OperationalError):
+            connection.execute(text("SELECT * FROM missing_table"))
+        connection.execute(text("SELECT 1")).all()
+
+        assert connection.info.get("slow_query_start_times") == []
+
+def test_only_the_most_recent_statements_are_remembered():
+    slow_query_log = SlowQueryLog(threshold_seconds=0.0, explain=False, max_statements=2)
+    engine = create_engine("sqlite:///:memory:", echo=False)
+    slow_query_log.install(engine)
+    with engine.connect() as connection:
+        for value in range(5):
+            connection.execute(text(f"SELECT {value}")).all()
+
+    assert list(slow_query_log._last_logged) == ["SELECT 3", "SELECT 4"]
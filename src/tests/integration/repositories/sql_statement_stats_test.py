@@ -0,0 +1,37 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlmodel import SQLModel, Session, create_engine
+
+from src.domain.entities.colour import Colour as DomainColour
+from src.ports.repositories.sql_brick_repository import SQLBrickRepository
+from src.ports.repositories.sql_statement_stats import collect_statement_stats
+
+
+def test_statements_and_fetched_rows_are_counted():
+    engine = create_engine("sqlite:///:memory:", echo=False)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine, expire_on_commit=False) as session:
+        repository = SQLBrickRepository(session)
+        for name in ("Red", "Blue", "Green"):
+            repository.create_colour(DomainColour(name=name))
+
+        with collect_statement_stats() as stats:
+            colours = repository.get_all_colours()
+
+    assert len(colours) == 3
+    assert stats.statements == 1
+    assert stats.rows == 3
+
+
+def test_failed_statement_does_not_leak_its_start_time():
+    engine = create_engine("sqlite:///:memory:", echo=False)
+    with engine.connect() as connection:
+        with collect_statement_stats() as stats:
+            with pytest.raises(OperationalError):
+                connection.execute(text("SELECT * FROM missing_table"))
+            connection.execute(text("SELECT 1")).all()
+
+        assert connection.info.get("statement_start_times") == []
+    assert stats.statements == 1
+    assert stats.rows == 1
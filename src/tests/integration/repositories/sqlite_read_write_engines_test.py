@@ -0,0 +1,43 @@
+import pytest
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session, SQLModel, text
+
+from src.domain.entities.colour import Colour
+from src.ports.repositories.sql_brick_repository import SQLBrickRepository
+from src.ports.repositories.sqlite_read_write_engines import create_read_write_engines
+from src.ports.repositories.sqlite_storage_profiles import STORAGE_PROFILES
+
+
+@pytest.fixture
+def engines(tmp_path):
+    engines = create_read_write_engines(f"sqlite:///{tmp_path / 'split.db'}", STORAGE_PROFILES["wal"], read_pool_size=2)
+    SQLModel.metadata.create_all(engines.writer)
+    yield engines
+    engines.dispose()
+
+
+def test_reader_engine_is_read_only(engines):
+    assert engines.is_split
+    assert engines.writer.pool.size() == 1
+
+    with engines.reader.connect() as connection:
+        assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        with pytest.raises(OperationalError, match="readonly database"):
+            connection.execute(text("INSERT INTO colour (name) VALUES ('Red')"))
+
+
+def test_repository_reads_see_committed_writes(engines):
+    with Session(engines.writer, expire_on_commit=False) as session, Session(engines.reader, expire_on_commit=False) as read_session:
+        repository = SQLBrickRepository(session, read_session)
+
+        assert repository.get_all_colours() == []
+        red = repository.create_colour(Colour(name="Red"))
+
+        assert repository.get_all_colours() == [red]
+
+
+def test_in_memory_database_shares_one_engine():
+    engines = create_read_write_engines("sqlite:///:memory:", STORAGE_PROFILES["default"])
+
+    assert not engines.is_split
+    assert engines.reader is engines.writer
@@ -0,0 +1,24 @@
+import pytest
+from sqlmodel import create_engine, text
+
+from src.ports.repositories.sqlite_storage_profiles import STORAGE_PROFILES, apply_storage_profile, get_storage_profile
+
+
+def test_wal_profile_is_applied_on_connect(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'profile.db'}", echo=False)
+    apply_storage_profile(engine, STORAGE_PROFILES["wal"])
+
+    with engine.connect() as connection:
+        assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        # synchronous NORMAL is reported as 1, temp_store MEMORY as 2
+        assert connection.execute(text("PRAGMA synchronous")).scalar() == 1
+        assert connection.execute(text("PRAGMA temp_store")).scalar() == 2
+        assert connection.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+        assert connection.execute(text("PRAGMA cache_size")).scalar() == -64 * 1024
+
+def test_default_profile_sets_no_pragmas():
+    assert STORAGE_PROFILES["default"].pragma_statements() == []
+
+def test_unknown_profile_is_rejected():
+    with pytest.raises(ValueError, match="Unknown SQLite storage profile 'fast'"):
+        get_storage_profile("fast")
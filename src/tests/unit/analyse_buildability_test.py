@@ -4,6 +4,7 @@ from src.domain.entities.part import Part
 from src.domain.entities.set import Set, SetItem
 from src.domain.entities.user import User
 from src.domain.entities.inventory import Inventory, InventoryItem
+from src.ports.repositories.analytics_repository import AnalyticsRepository
 from src.ports.repositories.bricks_repository import BricksRepository
 from src.domain.use_cases.analyse_buildability import AnalyseBuildability
 
@@ -118,4 +119,248 @@ def test_get_possible_sets_from_inventory_empty_inventory(
     possible_sets = analyse_buildability_use_case.get_possible_sets_from_inventory(inventory)
 
     # Then
-    assert len(possible_sets) == 0
\ No newline at end of file
+    assert len(possible_sets) == 0
+
+def test_get_possible_sets_for_users(
+    analyse_buildability_use_case: AnalyseBuildability,
+    basic_users: list[User]
+):
+    # When
+    possible_sets = analyse_buildability_use_case.get_possible_sets_for_users(basic_users)
+
+    # Then
+    assert [s.name for s in possible_sets[basic_users[0].id]] == ["Small Set"]
+    assert [s.name for s in possible_sets[basic_users[1].id]] == ["Small Set"]
+    assert possible_sets[basic_users[2].id] == []
+    assert possible_sets[basic_users[3].id] == []
+
+def test_content_hash_ignores_order_and_duplicate_items(basic_parts: list[Part]):
+    inventory = Inventory(parts=[InventoryItem(part=basic_parts[0], quantity=3), InventoryItem(part=basic_parts[1], quantity=1)])
+    reordered = Inventory(parts=[InventoryItem(part=basic_parts[1], quantity=1), InventoryItem(part=basic_parts[0], quantity=3)], id=99)
+    split = Inventory(parts=[
+        InventoryItem(part=basic_parts[0], quantity=1),
+        InventoryItem(part=basic_parts[1], quantity=1),
+        InventoryItem(part=basic_parts[0], quantity=2),
+    ])
+
+    assert inventory.content_hash() == reordered.content_hash() == split.content_hash()
+    assert inventory.content_hash() != Inventory(parts=[InventoryItem(part=basic_parts[0], quantity=3)]).content_hash()
+    assert Inventory().content_hash() == Inventory(parts=[InventoryItem(part=basic_parts[0], quantity=0)]).content_hash() == 0
+
+def test_get_possible_sets_for_users_analyses_identical_inventories_once(
+    monkeypatch: pytest.MonkeyPatch,
+    analyse_buildability_use_case: AnalyseBuildability,
+    basic_users: list[User]
+):
+    # Given
+    many_users = [
+        User(name=f"User {i}", inventory=Inventory(parts=list(basic_users[i % len(basic_users)].inventory.parts), id=i), id=i)
+        for i in range(1, 41)
+    ]
+    expected = {user.id: analyse_buildability_use_case.get_possible_sets_from_inventory(user.inventory) for user in many_users}
+    analysed = []
+    analyse = analyse_buildability_use_case.get_possible_sets_from_inventory
+    monkeypatch.setattr(
+        analyse_buildability_use_case,
+        "get_possible_sets_from_inventory",
+        lambda inventory, catalog_index=None: analysed.append(inventory.id) or analyse(inventory, catalog_index),
+    )
+
+    # When
+    possible_sets = analyse_buildability_use_case.get_possible_sets_for_users(many_users)
+
+    # Then
+    assert possible_sets == expected
+    assert list(possible_sets) == [user.id for user in many_users]
+    assert len(analysed) == len({user.inventory.content_hash() for user in basic_users})
+
+def test_hash_collisions_do_not_merge_different_inventories(
+    monkeypatch: pytest.MonkeyPatch,
+    analyse_buildability_use_case: AnalyseBuildability,
+    basic_users: list[User],
+    missing_parts_dict: dict[int, int]
+):
+    # Given
+    expected_sets = analyse_buildability_use_case.get_possible_sets_for_users(basic_users)
+    expected_counts = analyse_buildability_use_case.get_buildable_user_counts()
+    expected_common = analyse_buildability_use_case.get_other_users_with_common_parts(basic_users, None, missing_parts_dict)
+    monkeypatch.setattr("src.domain.use_cases.analyse_buildability.content_hash", lambda quantities: 0)
+
+    # Then
+    assert analyse_buildability_use_case.get_possible_sets_for_users(basic_users) == expected_sets
+    assert analyse_buildability_use_case.get_buildable_user_counts() == expected_counts
+    assert analyse_buildability_use_case.get_other_users_with_common_parts(basic_users, None, missing_parts_dict) == expected_common
+
+def test_get_other_users_with_common_parts_counts_identical_inventories_once(
+    monkeypatch: pytest.MonkeyPatch,
+    analyse_buildability_use_case: AnalyseBuildability,
+    missing_parts_dict: dict[int, int],
+    basic_users: list[User]
+):
+    # Given
+    many_users = [
+        User(name=f"User {i}", inventory=Inventory(parts=list(basic_users[i % len(basic_users)].inventory.parts), id=i), id=i)
+        for i in range(1, 41)
+    ]
+    expected = [
+        (user.id, len(user.inventory.quantities().keys() & missing_parts_dict.keys()))
+        for user in many_users[1:]
+        if user.inventory.quantities().keys() & missing_parts_dict.keys()
+    ]
+    encoded = []
+    inventory_bitmap = analyse_buildability_use_case.part_bitmaps.inventory
+    monkeypatch.setattr(
+        analyse_buildability_use_case.part_bitmaps,
+        "inventory",
+        lambda inventory: encoded.append(inventory.id) or inventory_bitmap(inventory),
+    )
+
+    # When
+    users_with_parts = analyse_buildability_use_case.get_other_users_with_common_parts(many_users, many_users[0], missing_parts_dict)
+
+    # Then
+    assert [(user.id, count) for user, count in users_with_parts] == sorted(expected, key=lambda x: x[1], reverse=True)
+    assert len(encoded) == len({user.inventory.content_hash() for user in basic_users})
+
+def test_get_other_users_with_common_parts_thread_parallel(
+    monkeypatch: pytest.MonkeyPatch,
+    bricks_repository: BricksRepository,
+    basic_parts: list[Part],
+    missing_parts_dict: dict[int, int],
+    basic_users: list[User]
+):
+    # Given
+    monkeypatch.setattr("src.domain.use_cases.thread_parallel.is_gil_disabled", lambda: True)
+    monkeypatch.setattr("src.domain.use_cases.thread_parallel.MIN_CHUNK_SIZE", 1)
+    many_users = [
+        User(name=f"User {i}", inventory=basic_users[i % len(basic_users)].inventory, id=i)
+        for i in range(1, 41)
+    ]
+    sequential = AnalyseBuildability(bricks_repository)
+    threaded = AnalyseBuildability(bricks_repository, max_workers=4)
+
+    # When
+    expected = sequential.get_other_users_with_common_parts(many_users, many_users[0], missing_parts_dict)
+    actual = threaded.get_other_users_with_common_parts(many_users, many_users[0], missing_parts_dict)
+
+    # Then
+    assert [(u.id, count) for u, count in actual] == [(u.id, count) for u, count in expected]
+
+def test_get_buildable_user_counts(analyse_buildability_use_case: AnalyseBuildability, basic_sets: list[Set]):
+    assert analyse_buildability_use_case.get_buildable_user_counts() == {basic_sets[0].id: 2, basic_sets[1].id: 0}
+
+def test_get_missing_part_demand(analyse_buildability_use_case: AnalyseBuildability, basic_parts: list[Part], basic_sets: list[Set]):
+    demand = analyse_buildability_use_case.get_missing_part_demand(basic_sets[1].id)
+
+    assert demand == {
+        basic_parts[0].id: 12,
+        basic_parts[1].id: 8,
+        basic_parts[2].id: 6,
+        basic_parts[3].id: 18,
+        basic_parts[4].id: 12,
+    }
+
+def test_get_parts_with_percentage_of_usage_uses_analytics_repository(bricks_repository: BricksRepository, basic_parts: list[Part]):
+    class FakeAnalyticsRepository(AnalyticsRepository):
+        def count_users(self) -> int:
+            return 4
+
+        def get_part_usage(self) -> dict[int, tuple[int, int]]:
+            return {basic_parts[0].id: (3, 2), basic_parts[5].id: (1, 10)}
+
+        def get_buildable_user_counts(self) -> dict[int, int]:
+            return {}
+
+        def get_missing_part_demand(self, set_id: int) -> dict[int, int]:
+            return {}
+
+    use_case = AnalyseBuildability(bricks_repository, analytics_repository=FakeAnalyticsRepository())
+
+    assert use_case.get_parts_with_percentage_of_usage(0.5) == [(basic_parts[0], 2)]
+
+def test_get_parts_with_percentage_of_usage_approximate(analyse_buildability_use_case: AnalyseBuildability, basic_parts: list[Part]):
+    exact = analyse_buildability_use_case.get_parts_with_percentage_of_usage(0.5)
+    approximate = analyse_buildability_use_case.get_parts_with_percentage_of_usage(0.5, approximate=True)
+
+    assert [part for part, _ in approximate] == [part for part, _ in exact]
+    assert approximate == [(basic_parts[0], 2), (basic_parts[1], 2), (basic_parts[2], 2)]
+    assert analyse_buildability_use_case.get_approximate_owner_counts("shape") == {1: 2, 2: 2}
+
+def test_get_similar_users(analyse_buildability_use_case: AnalyseBuildability, basic_users: list[User]):
+    # User 2 holds exactly User 1's parts; Users 3 and 4 share none of them.
+    assert [(user.id, similarity) for user, similarity in analyse_buildability_use_case.get_similar_users(basic_users[0].id)] == [(2, 1.0)]
+    assert analyse_buildability_use_case.get_similar_users(basic_users[3].id) == []
+    assert analyse_buildability_use_case.get_similar_users(999) == []
+
+def test_similar_users_follow_the_change_log_without_reloading_users(
+    monkeypatch: pytest.MonkeyPatch,
+    analyse_buildability_use_case: AnalyseBuildability,
+    bricks_repository: BricksRepository,
+    basic_users: list[User],
+    basic_parts: list[Part]
+):
+    # Given
+    assert [user.id for user, _ in analyse_buildability_use_case.get_similar_users(basic_users[0].id)] == [2]
+    monkeypatch.setattr(bricks_repository, "get_all_users", lambda offset=0, limit=None: pytest.fail("users reloaded"))
+
+    # When
+    bricks_repository.create_user(User(name="Copy", inventory=Inventory(parts=list(basic_users[0].inventory.parts), id=60), id=60))
+    bricks_repository.apply_inventory_deltas(basic_users[1].inventory.id, {part.id: -10 for part in basic_parts[:3]} | {basic_parts[5].id: 1})
+
+    # Then
+    assert [(user.id, similarity) for user, similarity in analyse_buildability_use_case.get_similar_users(basic_users[0].id)] == [(60, 1.0)]
+    assert [user.id for user, _ in analyse_buildability_use_case.get_similar_users(basic_users[3].id)] == [2]
+
+def test_get_almost_buildable_sets(analyse_buildability_use_case: AnalyseBuildability, basic_users: list[User], basic_sets: list[Set]):
+    # User 3 holds the big parts of Big Set (10 of 20 pieces) but none of Small Set (7 pieces).
+    assert analyse_buildability_use_case.get_almost_buildable_sets(basic_users[2].id) == [(basic_sets[0], 7), (basic_sets[1], 10)]
+    assert analyse_buildability_use_case.get_almost_buildable_sets(basic_users[2].id, k=1, by_ratio=True) == [(basic_sets[1], 10)]
+    # User 1 can build Small Set already.
+    assert analyse_buildability_use_case.get_almost_buildable_sets(basic_users[0].id) == [(basic_sets[1], 13)]
+
+def test_get_buildable_copies_and_build_plan(analyse_buildability_use_case: AnalyseBuildability, basic_users: list[User], basic_sets: list[Set]):
+    assert analyse_buildability_use_case.get_buildable_copies(basic_users[0].id) == [(basic_sets[0], 1)]
+    assert analyse_buildability_use_case.get_buildable_copies(basic_users[2].id) == []
+
+    plan = analyse_buildability_use_case.get_build_plan(basic_users[0].id)
+    assert plan.sets == (basic_sets[0],) and plan.pieces == 7 and plan.optimal
+    assert analyse_buildability_use_case.get_build_plan(999) is None
+
+def test_get_group_possible_sets(analyse_buildability_use_case: AnalyseBuildability, basic_users: list[User], basic_sets: list[Set]):
+    # Users 1 and 3 together hold only 1 of the 2 small yellow bricks Big Set needs.
+    assert analyse_buildability_use_case.get_group_possible_sets([basic_users[0].id, basic_users[2].id]) == [(basic_sets[0], {1: 7, 3: 0})]
+
+    group_sets = analyse_buildability_use_case.get_group_possible_sets([basic_users[0].id, basic_users[1].id, basic_users[2].id])
+    assert [(lego_set.name, contributions) for lego_set, contributions in group_sets] == [
+        ("Small Set", {1: 7, 2: 0, 3: 0}),
+        # Ties go to the earlier member: User 1 brings what Users 1 and 2 both hold.
+        ("Big Set", {1: 7, 2: 3, 3: 10}),
+    ]
+
+def test_pooled_inventory_sums_parts_listed_twice(bricks_repository: BricksRepository, basic_parts: list[Part]):
+    # Given
+    user = User(name="Split", inventory=Inventory(parts=[
+        InventoryItem(part=basic_parts[0], quantity=2),
+        InventoryItem(part=basic_parts[1], quantity=1),
+        InventoryItem(part=basic_parts[0], quantity=3),
+    ], id=50), id=50)
+    bricks_repository.users.append(user)
+
+    # Then
+    assert bricks_repository.get_pooled_inventory([user.id]) == {basic_parts[0].id: 5, basic_parts[1].id: 1}
+
+def test_in_memory_changes_record_writes_in_order(bricks_repository: BricksRepository, basic_parts: list[Part]):
+    # Given
+    user = bricks_repository.create_user(User(name="New", inventory=Inventory(parts=[InventoryItem(part=basic_parts[0], quantity=2)], id=50), id=50))
+
+    # When
+    version = bricks_repository.apply_inventory_deltas(user.inventory.id, {basic_parts[0].id: -5, basic_parts[1].id: 3})
+
+    # Then
+    assert [(change.entity_type, change.entity_id, change.part_deltas) for change in bricks_repository.get_changes()] == [
+        ("inventory", 50, {basic_parts[0].id: 2}),
+        ("user", 50, {}),
+        ("inventory", 50, {basic_parts[0].id: -2, basic_parts[1].id: 3}),
+    ]
+    assert user.inventory.version == version == 3
+    assert [change.version for change in bricks_repository.get_changes(since=1, limit=1)] == [2]
@@ -0,0 +1,35 @@
+from src.benchmarks.run_benchmarks import find_regressions
+from src.benchmarks.stats import LatencySummary, percentile
+
+
+def _report(p50_ms: float, ops_per_sec: float, queries_per_op: float = 1.0) -> dict:
+    return {"results": [{
+        "size": 1000,
+        "case": "repository.get_all_sets",
+        "p50_ms": p50_ms,
+        "ops_per_sec": ops_per_sec,
+        "queries_per_op": queries_per_op,
+    }]}
+
+def test_percentile_nearest_rank():
+    samples = [float(i) for i in range(1, 101)]
+
+    assert percentile(samples, 0.50) == 50.0
+    assert percentile(samples, 0.99) == 99.0
+    assert percentile([], 0.50) == 0.0
+
+def test_latency_summary_from_samples():
+    summary = LatencySummary.from_samples([0.001, 0.002, 0.003, 0.004])
+
+    assert summary.count == 4
+    assert summary.p50_ms == 2.0
+    assert summary.ops_per_sec == 400.0
+
+def test_find_regressions_within_threshold():
+    assert find_regressions(_report(1.0, 1000.0), _report(1.05, 960.0), threshold=0.10) == []
+
+def test_find_regressions_flags_slower_run_and_extra_queries():
+    regressions = find_regressions(_report(1.0, 1000.0), _report(2.0, 500.0, queries_per_op=3.0), threshold=0.10)
+
+    assert len(regressions) == 3
+    assert all("repository.get_all_sets @ 1000 users" in regression for regression in regressions)
@@ -0,0 +1,104 @@
+import itertools
+import random
+
+from src.domain.entities.colour import Colour
+from src.domain.entities.part import Part
+from src.domain.entities.set import Set, SetItem
+from src.domain.entities.shape import Shape
+from src.domain.use_cases.build_planner import plan_builds
+from src.domain.use_cases.catalog_index import CatalogIndex
+
+
+def _catalog(seed: int, set_count: int = 12, part_count: int = 8) -> CatalogIndex:
+    rng = random.Random(seed)
+    colour, shape = Colour(id=1, name="Red"), Shape(id=1, name="Brick")
+    parts = [Part(id=part_id, name=f"Part {part_id}", colour=colour, shape=shape) for part_id in range(1, part_count + 1)]
+    return CatalogIndex.from_sets(
+        Set(id=set_id, name=f"Set {set_id}", parts=[SetItem(part=part, quantity=rng.randint(1, 3)) for part in rng.sample(parts, rng.randint(1, 4))])
+        for set_id in range(1, set_count + 1)
+    )
+
+
+def _best_pieces(catalog_index: CatalogIndex, inventory_parts: dict[int, int]) -> int:
+    best = 0
+    for size in range(1, len(catalog_index.sets) + 1):
+        for combination in itertools.combinations(range(len(catalog_index.sets)), size):
+            used: dict[int, int] = {}
+            for set_index in combination:
+                for part_id, quantity in catalog_index.requirements[set_index]:
+                    used[part_id] = used.get(part_id, 0) + quantity
+            if all(inventory_parts.get(part_id, 0) >= quantity for part_id, quantity in used.items()):
+                best = max(best, sum(catalog_index.requirement_totals[set_index] for set_index in combination))
+    return best
+
+
+def test_plan_matches_exhaustive_search():
+    for seed in range(5):
+        catalog_index = _catalog(seed)
+        inventory_parts = {part_id: random.Random(seed).randint(0, 6) for part_id in range(1, 9)}
+
+        plan = plan_builds(catalog_index, inventory_parts)
+
+        assert plan.optimal
+        assert plan.pieces == _best_pieces(catalog_index, inventory_parts)
+        used: dict[int, int] = {}
+        for lego_set in plan.sets:
+            for item in lego_set.parts:
+                used[item.part.id] = used.get(item.part.id, 0) + item.quantity
+        assert all(inventory_parts[part_id] >= quantity for part_id, quantity in used.items())
+
+
+def test_plan_reports_when_the_node_budget_runs_out():
+    catalog_index = _catalog(1)
+    plan = plan_builds(catalog_index, dict.fromkeys(range(1, 9), 6), max_nodes=1)
+
+    assert not plan.optimal
+    assert len(plan.sets) == 1
+
+
+def test_copies_agree_between_postings_walk_and_set_scan():
+    catalog_index = _catalog(3, set_count=40)
+    for held in range(0, 12):
+        inventory_parts = {part_id: held + part_id % 3 for part_id in range(1, 9)}
+        small = {part_id: quantity for part_id, quantity in inventory_parts.items() if part_id <= 2}
+
+        assert catalog_index.buildable_copies(inventory_parts) == catalog_index._scan_copies(inventory_parts)
+        assert catalog_index.buildable_copies(small) == catalog_index._scan_copies(small)
+        assert list(catalog_index.buildable_copies(inventory_parts)) == catalog_index.buildable_set_indices(inventory_parts)
+
+
+def test_zero_quantity_requirements_are_ignored():
+    colour, shape = Colour(id=1, name="Red"), Shape(id=1, name="Brick")
+    brick, plate = (Part(id=part_id, name=f"Part {part_id}", colour=colour, shape=shape) for part_id in (1, 2))
+    catalog_index = CatalogIndex.from_sets([
+        Set(id=1, name="House", parts=[SetItem(part=brick, quantity=2), SetItem(part=plate, quantity=0)]),
+    ])
+
+    assert catalog_index.requirements[0] == ((brick.id, 2),)
+    assert catalog_index.buildable_copies({brick.id: 5}) == {0: 2}
+    assert catalog_index.buildable_copies({brick.id: 5, plate.id: 1}) == {0: 2}
+    assert plan_builds(catalog_index, {brick.id: 5}).pieces == 2
+
+
+def test_sparse_counting_matches_a_scan_of_every_set():
+    catalog_index = _catalog(4, set_count=40)
+    for seed in range(20):
+        rng = random.Random(seed)
+        inventory_parts = {part_id: rng.randint(1, 4) for part_id in rng.sample(range(1, 9), rng.randint(0, 4))}
+        missing = [
+            total - sum(min(inventory_parts.get(part_id, 0), quantity) for part_id, quantity in catalog_index.requirements[set_index])
+            for set_index, total in enumerate(catalog_index.requirement_totals)
+        ]
+
+        for k in (1, 5, 50):
+            for by_ratio in (False, True):
+                rank = (lambda set_index: (missing[set_index] / catalog_index.requirement_totals[set_index], set_index)) if by_ratio else (lambda set_index: (missing[set_index], set_index))
+                expected = sorted((set_index for set_index in range(len(missing)) if missing[set_index] > 0), key=rank)[:k]
+                assert catalog_index.closest_set_indices(inventory_parts, k, by_ratio) == [(set_index, missing[set_index]) for set_index in expected]
+        assert catalog_index.buildable_set_indices(inventory_parts) == [set_index for set_index, count in enumerate(missing) if count == 0]
+
+    colour, shape = Colour(id=1, name="Red"), Shape(id=1, name="Brick")
+    brick = Part(id=1, name="Brick", colour=colour, shape=shape)
+    with_empty = CatalogIndex.from_sets([Set(id=1, name="House", parts=[SetItem(part=brick, quantity=2)]), Set(id=2, name="Empty", parts=[])])
+    assert with_empty.buildable_set_indices({}) == [1]
+    assert with_empty.buildable_set_indices({brick.id: 2}) == [0, 1]
@@ -0,0 +1,46 @@
+from src.api.metrics import CallbackMetric, Counter, Histogram, MetricsRegistry
+
+
+def test_counter_renders_labelled_samples():
+    registry = MetricsRegistry()
+    counter = registry.register(Counter("calls_total", "Calls.", ("method",)))
+
+    counter.inc(method="get_all_sets")
+    counter.inc(2, method="get_all_sets")
+
+    assert registry.render() == (
+        "# HELP calls_total Calls.\n"
+        "# TYPE calls_total counter\n"
+        'calls_total{method="get_all_sets"} 3\n'
+    )
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+
+    histogram.observe(0.05)
+    histogram.observe(0.1)
+    histogram.observe(0.5)
+    histogram.observe(3.0)
+
+    assert list(histogram.samples()) == [
+        ("latency_seconds_bucket", '{le="0.1"}', 2),
+        ("latency_seconds_bucket", '{le="1"}', 3),
+        ("latency_seconds_bucket", '{le="+Inf"}', 4),
+        ("latency_seconds_sum", "", 3.65),
+        ("latency_seconds_count", "", 4),
+    ]
+
+def test_label_values_are_escaped():
+    counter = Counter("requests_total", "Requests.", ("route",))
+
+    counter.inc(route='/api/"quoted"')
+
+    assert 'requests_total{route="/api/\\"quoted\\""} 1' in counter.render()
+
+def test_callback_metric_reads_values_at_render_time():
+    hits = {"catalog": 0}
+    gauge = CallbackMetric("hits", "Hits.", "gauge", ("cache",), lambda: [((name,), value) for name, value in hits.items()])
+
+    hits["catalog"] = 7
+
+    assert 'hits{cache="catalog"} 7' in gauge.render()
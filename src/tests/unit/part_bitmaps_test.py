@@ -0,0 +1,43 @@
+import sys
+
+from src.domain.entities.colour import Colour
+from src.domain.entities.inventory import Inventory, InventoryItem
+from src.domain.entities.part import Part
+from src.domain.entities.shape import Shape
+from src.domain.use_cases.part_bitmaps import PartBitmaps
+
+
+def _inventory(inventory_id: int, part_ids: list[int], version: int = 0) -> Inventory:
+    colour, shape = Colour(id=1, name="Red"), Shape(id=1, name="Brick")
+    return Inventory(
+        id=inventory_id,
+        version=version,
+        parts=[InventoryItem(part=Part(id=part_id, name=f"Part {part_id}", colour=colour, shape=shape), quantity=1) for part_id in part_ids],
+    )
+
+
+def test_overlap_and_contains_all():
+    bitmaps = PartBitmaps()
+    inventory = bitmaps.encode([5, 900_000, 42])
+
+    assert PartBitmaps.overlap(inventory, bitmaps.encode([42, 7, 900_000])) == 2
+    assert PartBitmaps.contains_all(inventory, bitmaps.encode([42, 5]))
+    assert not PartBitmaps.contains_all(inventory, bitmaps.encode([42, 7]))
+    assert bitmaps.decode(inventory) == {5, 900_000, 42}
+
+
+def test_inventory_bitmap_is_cached_per_version():
+    bitmaps = PartBitmaps()
+
+    assert bitmaps.decode(bitmaps.inventory(_inventory(1, [1, 2], version=3))) == {1, 2}
+    # Same version: the cached bitmap wins, even if the parts passed in differ.
+    assert bitmaps.decode(bitmaps.inventory(_inventory(1, [1], version=3))) == {1, 2}
+    assert bitmaps.decode(bitmaps.inventory(_inventory(1, [1], version=4))) == {1}
+
+
+def test_cache_evicts_least_recently_used_inventories():
+    bitmaps = PartBitmaps(max_cached_bytes=sys.getsizeof(1 << 1))
+    bitmaps.inventory(_inventory(1, [1], version=1))
+    bitmaps.inventory(_inventory(2, [2], version=1))
+
+    assert bitmaps.decode(bitmaps.inventory(_inventory(1, [3], version=1))) == {3}
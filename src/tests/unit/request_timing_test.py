@@ -0,0 +1,27 @@
+from src.api.request_timing import RequestTiming, TimedRepository, _current_timing, format_server_timing
+from src.ports.repositories.bricks_repository import BricksRepository
+
+
+def test_timed_repository_records_calls_for_current_request(bricks_repository: BricksRepository):
+    # Given
+    timing = RequestTiming()
+    token = _current_timing.set(timing)
+    repository = TimedRepository(bricks_repository)
+
+    # When
+    try:
+        user = repository.get_user_by_id(1)
+        repository.get_set_by_id(1)
+    finally:
+        _current_timing.reset(token)
+
+    # Then
+    assert user.name == "User 1"
+    assert timing.repository_calls == 2
+    assert timing.repository_seconds > 0
+    assert repository.users is bricks_repository.users
+
+def test_format_server_timing():
+    header = format_server_timing(0.0125, RequestTiming(repository_calls=3, repository_seconds=0.008), 5, 120, 0.006)
+
+    assert header == 'total;dur=12.50, repo;dur=8.00;desc="3 calls", db;dur=6.00;desc="5 statements, 120 rows"'
@@ -0,0 +1,56 @@
+import random
+
+import pytest
+
+from src.domain.entities.colour import Colour
+from src.domain.entities.inventory import Inventory, InventoryItem
+from src.domain.entities.part import Part
+from src.domain.entities.shape import Shape
+from src.domain.use_cases.similarity_index import InventorySimilarityIndex
+
+
+def _inventory(inventory_id: int, part_ids, version: int = 0) -> Inventory:
+    colour, shape = Colour(id=1, name="Red"), Shape(id=1, name="Brick")
+    return Inventory(
+        id=inventory_id,
+        version=version,
+        parts=[InventoryItem(part=Part(id=part_id, name=f"Part {part_id}", colour=colour, shape=shape), quantity=1) for part_id in part_ids],
+    )
+
+
+def test_signature_agreement_estimates_jaccard_similarity():
+    index = InventorySimilarityIndex(bands=64, rows=4)
+    parts, other = set(range(0, 600)), set(range(200, 800))
+    signature, other_signature = index.signature(parts), index.signature(other)
+
+    agreement = sum(a == b for a, b in zip(signature, other_signature)) / len(signature)
+
+    assert agreement == pytest.approx(InventorySimilarityIndex.jaccard(dict.fromkeys(parts, 1), dict.fromkeys(other, 1)), abs=0.1)
+
+
+def test_candidates_find_similar_inventories_only():
+    rng = random.Random(7)
+    index = InventorySimilarityIndex()
+    mine = set(rng.sample(range(10_000), 200))
+    near = set(list(mine)[:180]) | set(rng.sample(range(10_000, 20_000), 20))
+    index.update(_inventory(1, near))
+    for inventory_id in range(2, 200):
+        index.update(_inventory(inventory_id, rng.sample(range(20_000, 100_000), 200)))
+
+    assert index.candidates(mine) == {1}
+
+
+def test_update_replaces_older_versions():
+    index = InventorySimilarityIndex()
+    index.update(_inventory(1, range(50), version=1))
+    index.update(_inventory(1, range(1000, 1050), version=2))
+
+    assert len(index) == 1
+    assert index.candidates(range(50)) == set()
+    assert index.candidates(range(1000, 1050)) == {1}
+    index.remove(1)
+    assert index.candidates(range(1000, 1050)) == set()
+
+
+def test_weighted_jaccard():
+    assert InventorySimilarityIndex.weighted_jaccard({1: 4, 2: 2}, {1: 2, 3: 2}) == 2 / 8
@@ -0,0 +1,52 @@
+import pytest
+
+from src.domain.use_cases.sketches import CountMinSketch, HyperLogLog, SketchSettings
+
+
+def test_settings_from_error_match_defaults():
+    assert SketchSettings.from_error(relative_error=0.02, epsilon=0.001, delta=0.01) == SketchSettings()
+
+
+def test_hyperloglog_estimates_distinct_values_within_error():
+    sketch = HyperLogLog(precision=12)
+    for value in range(50_000):
+        sketch.add(value)
+        sketch.add(value)
+
+    assert sketch.count() == pytest.approx(50_000, rel=3 * sketch.relative_error)
+
+
+def test_hyperloglog_counts_small_sets_exactly_enough():
+    sketch = HyperLogLog(precision=12)
+    for value in range(100):
+        sketch.add(value)
+
+    assert sketch.count() == pytest.approx(100, abs=2)
+
+
+def test_merged_hyperloglog_is_the_sketch_of_the_union():
+    left, right, union = HyperLogLog(10), HyperLogLog(10), HyperLogLog(10)
+    for value in range(0, 6000):
+        (left if value < 4000 else right).add(value)
+        union.add(value)
+    for value in range(2000, 4000):
+        right.add(value)
+
+    left.merge(right)
+
+    assert left.registers == union.registers
+    with pytest.raises(ValueError):
+        left.merge(HyperLogLog(11))
+
+
+def test_count_min_sketch_never_underestimates():
+    sketch = CountMinSketch(width=272, depth=5)
+    counts = {key: key % 7 + 1 for key in range(1000)}
+    for key, count in counts.items():
+        sketch.add(key, count)
+    sketch.add(3, -2)
+    counts[3] -= 2
+
+    total = sum(counts.values())
+    for key, count in counts.items():
+        assert count <= sketch.estimate(key) <= count + 0.05 * total